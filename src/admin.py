@@ -1,7 +1,7 @@
 from django.contrib import admin, messages
 from django.contrib.auth import get_user_model
 from .decorators import log_function_call
-from .models import Committee, ParliamentUser, Legislation, Vote, Attendance, CommitteeDocument, Role, Announcement, ChatChannel, ChatChannelPermission, ChatMessage, ChatReadReceipt
+from .models import Committee, ParliamentUser, Legislation, Vote, Attendance, CommitteeDocument, Role, Announcement, ChatChannel, ChatChannelPermission, ChatMessage, ChatReadReceipt, AuditEvent
 import logging
 from django.db.models.signals import post_save, pre_delete
 from django.dispatch import receiver
@@ -9,6 +9,7 @@ from django.http import HttpResponse
 import csv
 from django.contrib.auth.decorators import user_passes_test
 import os
+from django.conf import settings
 from django.contrib.admin.models import LogEntry
 from django.urls import reverse
 from django.shortcuts import redirect
@@ -276,37 +277,23 @@ from django.shortcuts import render
 
 @user_passes_test(lambda u: hasattr(u, 'is_admin') and u.is_admin)
 def view_logs(request):
-    log_path = os.path.join('logs', 'django_actions.log')
-    logs = []
+    # Same indexed AuditEvent search as the officer audit log page; ?source=file tails the raw log
+    from .view.officer.view_logs import audit_search_context, log_tail_context, LOG_FILE_PATH
 
-    try:
-        with open(log_path, 'r') as f:
-            for line in f.readlines()[-200:][::-1]:  # Show last 200 lines, most recent first
-                logs.append(line.strip())
-    except Exception as e:
-        logs.append(f"Error reading log file: {e}")
-
-    return render(request, 'admin/view_logs.html', {
-        'logs': logs,
-        'title': 'View Logs',
-    })
+    if request.GET.get('source') == 'file':
+        context = log_tail_context(request, LOG_FILE_PATH, parse=False)
+    else:
+        context = audit_search_context(request)
+    context['title'] = 'View Logs'
+    return render(request, 'admin/view_logs.html', context)
 
 @user_passes_test(lambda u: hasattr(u, 'is_admin') and u.is_admin)
 def view_error_logs(request):
-    log_path = os.path.join('logs', 'django_errors.log')
-    logs = []
-
-    try:
-        with open(log_path, 'r') as f:
-            for line in f.readlines()[-200:][::-1]:
-                logs.append(line.strip())
-    except Exception as e:
-        logs.append(f"Error reading log file: {e}")
+    from .view.officer.view_logs import log_tail_context
 
-    return render(request, 'admin/view_error_logs.html', {
-        'logs': logs,
-        'title': 'View Error Logs',
-    })
+    context = log_tail_context(request, os.path.join(settings.BASE_DIR, 'logs', 'django_errors.log'), parse=False)
+    context['title'] = 'View Error Logs'
+    return render(request, 'admin/view_error_logs.html', context)
 
 
 # === CHAT CHANNEL ADMIN ===
@@ -353,6 +340,25 @@ class ChatReadReceiptAdmin(admin.ModelAdmin):
     readonly_fields = ('last_read_at',)
 
 
+@admin.register(AuditEvent)
+class AuditEventAdmin(admin.ModelAdmin):
+    list_display = ('timestamp', 'username', 'action', 'resource_type', 'resource_id', 'status')
+    list_filter = ('status', 'resource_type', 'logger_name')
+    search_fields = ('username', 'user_id', 'action', 'resource_id')
+    date_hierarchy = 'timestamp'
+    ordering = ('-timestamp',)
+
+    # Audit history is append-only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
 original_get_urls = admin.site.get_urls
 
 def custom_admin_urls():
@@ -0,0 +1,126 @@
+"""
+Plumbing for the versioned read-only JSON API (views in src/view/api.py).
+
+Each resource has a CacheNamespace whose version is bumped by post_save/post_delete (and
+m2m_changed for committee membership) on the models it reads. A response's weak ETag is a hash of
+those versions, the API version, the caller's visibility scope and the query string, so:
+
+- a conditional GET whose ETag still matches gets a 304 without touching the database;
+- a 200 body is cached under its ETag, so other callers with the same scope reuse it until the
+  next write.
+
+The models have no updated_at columns to take a max() over, which is why versions come from
+signals rather than from the rows. Endpoints whose results depend on the clock (open bills,
+upcoming events, scheduled announcements) also mix in a time bucket.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.http import HttpResponse, JsonResponse
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_GET
+
+from src.caching import CacheNamespace, namespace_versions
+from src.models import (
+    Announcement, Committee, CommitteeDocument, CommitteePermissions, Event, Legislation,
+    PassedResolution, ResolutionSectionImpact, Vote,
+)
+
+API_VERSION = 'v1'
+
+API_PAGE_SIZE = 50
+
+# Resource -> models whose writes change it
+API_RESOURCES = {
+    'legislation': (Legislation, Vote),
+    'committees': (Committee,),
+    'events': (Event,),
+    'announcements': (Announcement,),
+    'documents': (Legislation, CommitteeDocument, PassedResolution, CommitteePermissions),
+    'resolutions': (PassedResolution, ResolutionSectionImpact),
+}
+
+API_NAMESPACES = {name: CacheNamespace(f'api.{name}') for name in API_RESOURCES}
+
+
+class ApiError(Exception):
+    """Raised by an endpoint to answer with a JSON error instead of a body"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _strip_weak(etag):
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def api_endpoint(resource, scope=lambda request: 'all', time_bucket=None):
+    """
+    Serve build(request) -> dict as a conditional, cached JSON response.
+
+    scope(request) names who may see the same data (e.g. a member_type); time_bucket is a number
+    of seconds after which the ETag changes even without writes. Unauthenticated calls get a
+    401 JSON error rather than a login redirect.
+    """
+    namespace = API_NAMESPACES[resource]
+
+    def decorator(build):
+        @require_GET
+        @wraps(build)
+        def view(request, *args, **kwargs):
+            if not request.user.is_authenticated:
+                return JsonResponse({'error': 'Authentication required'}, status=401)
+
+            parts = [API_VERSION, resource, namespace_versions(namespace)[namespace.name],
+                     scope(request), request.get_full_path()]
+            if time_bucket:
+                parts.append(int(time.time() // time_bucket))
+            etag = 'W/"%s"' % hashlib.sha256(':'.join(str(part) for part in parts).encode()).hexdigest()[:32]
+            headers = {'ETag': etag, 'Cache-Control': 'private, no-cache', 'Vary': 'Cookie'}
+
+            # If-None-Match uses the weak comparison (RFC 9110 13.1.2)
+            if_none_match = request.headers.get('If-None-Match')
+            if if_none_match and (
+                if_none_match.strip() == '*'
+                or _strip_weak(etag) in {_strip_weak(tag) for tag in parse_etags(if_none_match)}
+            ):
+                return HttpResponse(status=304, headers=headers)
+
+            try:
+                payload = namespace.get_or_set(('response', etag), lambda: build(request, *args, **kwargs))
+            except ApiError as e:
+                return JsonResponse({'error': str(e)}, status=e.status)
+            return JsonResponse(payload, headers=headers)
+        return view
+    return decorator
+
+
+def _bump(resources):
+    for resource in resources:
+        API_NAMESPACES[resource].invalidate()
+
+
+def _invalidate_on_change(sender, **kwargs):
+    resources = [name for name, models in API_RESOURCES.items() if sender in models]
+    # After commit, so a concurrent request can't cache the rows as they were before the change
+    transaction.on_commit(lambda: _bump(resources))
+
+
+def _invalidate_committees(sender, **kwargs):
+    # Membership also decides which committee documents a member can see
+    transaction.on_commit(lambda: _bump(['committees', 'documents']))
+
+
+for _model in {model for models in API_RESOURCES.values() for model in models}:
+    post_save.connect(_invalidate_on_change, sender=_model, dispatch_uid=f'api_save_{_model.__name__}')
+    post_delete.connect(_invalidate_on_change, sender=_model, dispatch_uid=f'api_delete_{_model.__name__}')
+
+for _field in ('chairs', 'members'):
+    m2m_changed.connect(
+        _invalidate_committees, sender=getattr(Committee, _field).through,
+        dispatch_uid=f'api_committee_{_field}',
+    )
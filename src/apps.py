@@ -5,7 +5,23 @@ class SrcConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'src'
 
-def ready(self):
-    import src.models
-    import src.signals.admin_logging
-    import src.admin
\ No newline at end of file
+    def ready(self):
+        # Route audit logging through a background queue once LOGGING has been configured
+        from src.logging_utils import install_audit_queue
+        install_audit_queue()
+
+        # Registers the shared-cache and session system checks, and the user cache invalidation hooks
+        import src.caching  # noqa: F401
+        import src.user_cache  # noqa: F401
+
+        # Connects the post_save/post_delete hooks that keep blob reference counts, document
+        # search, previews, the cached dashboard widgets, the JSON API's ETags, live vote tallies,
+        # the meeting display and the resolution index up to date
+        import src.blob_references  # noqa: F401
+        import src.document_search  # noqa: F401
+        import src.document_previews  # noqa: F401
+        import src.dashboard_cache  # noqa: F401
+        import src.api  # noqa: F401
+        import src.live_tally  # noqa: F401
+        import src.meeting_display  # noqa: F401
+        import src.resolution_index  # noqa: F401
@@ -0,0 +1,270 @@
+"""
+Meeting-night benchmark harness for Parliament
+Seeds a chapter-sized meeting (members, open bills, attendance, a chat channel) and drives
+the voting and chat poll endpoints through the Django test client, recording latency,
+queries per request and throughput so results can be compared across commits.
+"""
+import json
+import os
+import subprocess
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from src.models import Attendance, ChatChannel, ChatMessage, Legislation, ParliamentUser
+
+BENCHMARK_PREFIX = 'bench_'
+BENCHMARK_PASSWORD = 'BenchmarkPass123!'
+
+
+def percentile(samples, pct):
+    """Return the pct-th percentile of samples using linear interpolation"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * (pct / 100)
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(timings, queries, elapsed):
+    """Summarize per-request timings (seconds) and query counts for one endpoint"""
+    return {
+        'requests': len(timings),
+        'p50_ms': round(percentile(timings, 50) * 1000, 3),
+        'p95_ms': round(percentile(timings, 95) * 1000, 3),
+        'p99_ms': round(percentile(timings, 99) * 1000, 3),
+        'max_ms': round(max(timings) * 1000, 3) if timings else 0.0,
+        'queries_avg': round(sum(queries) / len(queries), 2) if queries else 0.0,
+        'queries_max': max(queries) if queries else 0,
+        'throughput_rps': round(len(timings) / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+
+
+class EndpointRecorder:
+    """Collects timings and query counts for a single named endpoint"""
+
+    def __init__(self, name):
+        self.name = name
+        self.timings = []
+        self.queries = []
+        self.statuses = {}
+        self.elapsed = 0.0
+
+    def request(self, client, method, url, data=None):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = getattr(client, method)(url, data or {})
+            duration = time.perf_counter() - start
+
+        self.timings.append(duration)
+        self.queries.append(len(captured.captured_queries))
+        self.elapsed += duration
+        self.statuses[response.status_code] = self.statuses.get(response.status_code, 0) + 1
+        return response
+
+    def summary(self):
+        result = summarize(self.timings, self.queries, self.elapsed)
+        result['status_codes'] = {str(code): count for code, count in sorted(self.statuses.items())}
+        return result
+
+
+def seed_meeting(users=60, bills=3, messages=50):
+    """
+    Create an in-progress chapter meeting
+
+    Args:
+        users: Number of present, voting members
+        bills: Number of open bills (a mix of percentage, piecewise and plurality)
+        messages: Number of existing messages in the meeting chat channel
+
+    Returns:
+        Dict with the seeded chair, voters, bills and channel
+    """
+    password_hash = make_password(BENCHMARK_PASSWORD)
+
+    chair = ParliamentUser(
+        user_id=f'{BENCHMARK_PREFIX}chair',
+        name='Benchmark Chair',
+        username=f'{BENCHMARK_PREFIX}chair',
+        member_type='Officer',
+        password=password_hash,
+    )
+    voters = [
+        ParliamentUser(
+            user_id=f'{BENCHMARK_PREFIX}{i}',
+            name=f'Benchmark Member {i}',
+            username=f'{BENCHMARK_PREFIX}{i}',
+            member_type='Member',
+            password=password_hash,
+        )
+        for i in range(users)
+    ]
+    ParliamentUser.objects.bulk_create([chair] + voters)
+    Attendance.objects.bulk_create([Attendance(user=voter, present=True) for voter in voters])
+
+    available_at = timezone.now() - timedelta(minutes=5)
+    modes = ['percentage', 'piecewise', 'plurality']
+    legislation = []
+    for i in range(bills):
+        vote_mode = modes[i % len(modes)]
+        legislation.append(Legislation(
+            title=f'Benchmark Bill {i}',
+            description='Meeting-night benchmark legislation',
+            document=f'legislation_docs/{BENCHMARK_PREFIX}{i}.pdf' if vote_mode != 'plurality' else None,
+            posted_by=chair,
+            available_at=available_at,
+            vote_mode=vote_mode,
+            required_number=max(1, users // 2) if vote_mode == 'piecewise' else None,
+            plurality_options=['Option A', 'Option B', 'Option C'] if vote_mode == 'plurality' else None,
+        ))
+    Legislation.objects.bulk_create(legislation)
+
+    channel = ChatChannel.objects.create(
+        name=f'{BENCHMARK_PREFIX}meeting',
+        channel_type='custom',
+        access_type='open',
+        created_by=chair,
+    )
+    ChatMessage.objects.bulk_create([
+        ChatMessage(channel=channel, sender=voters[i % len(voters)] if voters else chair, message=f'Message {i}')
+        for i in range(messages)
+    ])
+
+    return {
+        'chair': chair,
+        'voters': voters,
+        'legislation': list(Legislation.objects.filter(posted_by=chair).order_by('id')),
+        'channel': channel,
+    }
+
+
+def _ballot_for(leg, index):
+    if leg.vote_mode == 'plurality':
+        return leg.plurality_options[index % len(leg.plurality_options)]
+    return ['yes', 'yes', 'no', 'abstain'][index % 4]
+
+
+def run_meeting_benchmark(users=60, bills=3, messages=50, polls=3):
+    """
+    Seed a meeting and drive it end to end through the Django test client
+
+    Every member opens /vote/, casts a ballot on each open bill and polls the meeting
+    chat `polls` times; the chair then closes every bill.
+
+    Returns:
+        Dict of endpoint name -> summary (see summarize())
+    """
+    meeting = seed_meeting(users=users, bills=bills, messages=messages)
+    channel = meeting['channel']
+
+    recorders = {name: EndpointRecorder(name) for name in (
+        'vote_page', 'cast_vote', 'chat_messages_poll', 'chat_active_users_poll', 'end_vote',
+    )}
+
+    vote_url = reverse('vote')
+    messages_url = reverse('get_channel_messages', args=[channel.id])
+    active_url = reverse('get_channel_active_users', args=[channel.id])
+
+    client = Client()
+    for index, voter in enumerate(meeting['voters']):
+        client.force_login(voter)
+        recorders['vote_page'].request(client, 'get', vote_url)
+        for leg in meeting['legislation']:
+            recorders['cast_vote'].request(client, 'post', vote_url, {
+                'legislation_id': leg.id,
+                'vote_choice': _ballot_for(leg, index),
+                'password': BENCHMARK_PASSWORD,
+            })
+        for _ in range(polls):
+            recorders['chat_messages_poll'].request(client, 'get', messages_url)
+            recorders['chat_active_users_poll'].request(client, 'get', active_url)
+
+    client.force_login(meeting['chair'])
+    for leg in meeting['legislation']:
+        recorders['end_vote'].request(client, 'post', reverse('end_vote', args=[leg.id]))
+
+    return {name: recorder.summary() for name, recorder in recorders.items()}
+
+
+def benchmark_rate_limit(iterations=1000, store=None):
+    """
+    Time RateLimit.hit() on its own, with the configured counter store unless one is given
+
+    Every hit uses a fresh identifier half the time and a repeated one otherwise, so both the
+    first-hit (add) and increment paths are measured.
+
+    Returns:
+        Summary dict (see summarize()); p95_ms is the per-request overhead of one limit
+    """
+    from src.rate_limit import RateLimit
+
+    limit = RateLimit(f'{BENCHMARK_PREFIX}rate_limit', limit=iterations * 2, window=60, store=store)
+    timings = []
+    queries = []
+    elapsed = 0.0
+    for i in range(iterations):
+        identifier = f'{BENCHMARK_PREFIX}{i // 2}'
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            limit.hit(identifier)
+            duration = time.perf_counter() - start
+        timings.append(duration)
+        queries.append(len(captured.captured_queries))
+        elapsed += duration
+    for i in range(iterations // 2 + 1):
+        limit.reset(f'{BENCHMARK_PREFIX}{i}')
+    return summarize(timings, queries, elapsed)
+
+
+def current_commit():
+    """Return the current git commit hash, or None outside a git checkout"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path, endpoints, parameters):
+    """Write a benchmark run to path as JSON and return the written document"""
+    document = {
+        'commit': current_commit(),
+        'recorded_at': timezone.now().isoformat(),
+        'parameters': parameters,
+        'endpoints': endpoints,
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2)
+    return document
+
+
+def compare_results(baseline, current):
+    """
+    Compare two benchmark documents
+
+    Returns:
+        Dict of endpoint name -> {metric: (baseline, current, percent change)}
+    """
+    comparison = {}
+    for name, metrics in current.get('endpoints', {}).items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if not previous:
+            continue
+        comparison[name] = {}
+        for metric in ('p50_ms', 'p95_ms', 'p99_ms', 'queries_avg', 'throughput_rps'):
+            old, new = previous.get(metric, 0), metrics.get(metric, 0)
+            change = ((new - old) / old) * 100 if old else 0.0
+            comparison[name][metric] = (old, new, round(change, 1))
+    return comparison
@@ -0,0 +1,78 @@
+"""
+Keeps DocumentBlob.ref_count in step with the rows that point at each blob.
+
+DualLocationStorage counts a reference when a file is saved and releases one through
+FieldFile.delete(). Rows can also stop using a blob without either: a document replaced on an
+existing row, or a row removed by a queryset delete, a cascade or the admin's bulk delete. The
+pre_save/post_delete hooks here release the old blob in those cases, once the change commits.
+
+Anything that still slips through (e.g. a row save that failed after its file was stored
+outside a transaction) is corrected by `manage.py reconcile_blobs`, which recomputes every
+ref_count from the referencing rows.
+"""
+from collections import Counter
+
+from django.apps import apps
+from django.db import models, transaction
+from django.db.models.signals import post_delete, pre_save
+
+from src.storage import BLOB_DIRECTORY, DualLocationStorage, is_blob_name
+
+
+def blob_fields():
+    """[(model, field name)] for every FileField stored with DualLocationStorage"""
+    return [
+        (model, field.name)
+        for model in apps.get_app_config('src').get_models()
+        for field in model._meta.get_fields()
+        if isinstance(field, models.FileField) and isinstance(field.storage, DualLocationStorage)
+    ]
+
+
+def count_blob_references():
+    """{blob name: number of rows pointing at it}, from the document tables"""
+    counts = Counter()
+    for model, field_name in blob_fields():
+        counts.update(
+            model._base_manager.filter(**{f'{field_name}__startswith': f'{BLOB_DIRECTORY}/'})
+            .values_list(field_name, flat=True)
+        )
+    return counts
+
+
+# model -> names of its DualLocationStorage file fields
+BLOB_FIELDS = {}
+for _model, _field_name in blob_fields():
+    BLOB_FIELDS.setdefault(_model, []).append(_field_name)
+
+
+def _release_after_commit(storage, name):
+    transaction.on_commit(lambda: storage.release_reference(name))
+
+
+def _release_replaced_files(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    field_names = BLOB_FIELDS[sender]
+    if update_fields is not None:
+        field_names = [name for name in field_names if name in update_fields]
+    if not field_names:
+        return
+
+    stored = sender._base_manager.filter(pk=instance.pk).values(*field_names).first() or {}
+    for field_name in field_names:
+        old_name = stored.get(field_name)
+        if is_blob_name(old_name) and old_name != getattr(instance, field_name).name:
+            _release_after_commit(sender._meta.get_field(field_name).storage, old_name)
+
+
+def _release_deleted_files(sender, instance, **kwargs):
+    for field_name in BLOB_FIELDS[sender]:
+        name = getattr(instance, field_name).name
+        if is_blob_name(name):
+            _release_after_commit(sender._meta.get_field(field_name).storage, name)
+
+
+for _model in BLOB_FIELDS:
+    pre_save.connect(_release_replaced_files, sender=_model, dispatch_uid=f'blob_references_save_{_model.__name__}')
+    post_delete.connect(_release_deleted_files, sender=_model, dispatch_uid=f'blob_references_delete_{_model.__name__}')
@@ -0,0 +1,33 @@
+"""
+CACHES configuration for settings.py.
+
+Imported from settings, so it must not import Django models or the cache itself.
+
+    from src.cache_settings import default_caches
+    CACHES = default_caches(BASE_DIR)
+
+Without CACHE_REDIS_URL the default cache is file-based under BASE_DIR/cache, which every
+gunicorn worker on the host shares and needs no extra service. Setting CACHE_REDIS_URL (e.g.
+redis://127.0.0.1:6379/1, requires the `redis` package) switches to Django's Redis backend,
+which also shares state across hosts and has atomic incr.
+"""
+import os
+
+DEFAULT_FILE_CACHE_MAX_ENTRIES = 10000
+
+
+def default_caches(base_dir, redis_url=None):
+    redis_url = redis_url or os.environ.get('CACHE_REDIS_URL')
+    if redis_url:
+        default = {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': redis_url,
+            'KEY_PREFIX': 'parliament',
+        }
+    else:
+        default = {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR') or os.path.join(base_dir, 'cache'),
+            'OPTIONS': {'MAX_ENTRIES': DEFAULT_FILE_CACHE_MAX_ENTRIES},
+        }
+    return {'default': default}
@@ -0,0 +1,228 @@
+"""
+Namespaced caching on top of django.core.cache.
+
+Every key belongs to a CacheNamespace and carries that namespace's version, so a whole
+namespace is invalidated at once by bumping the version (one shared incr) instead of hunting
+down its keys; the old entries simply stop being read and age out. Versions start from the
+current time rather than 1, so a version key the backend evicted can't bring stale entries back.
+
+Hits and misses are counted per namespace in-process and added to shared counters every
+STATS_FLUSH_INTERVAL seconds, so the officer cache stats page sees every worker's traffic
+without an extra cache write on each lookup.
+
+The backend itself is configured in settings (see src.cache_settings). A system check warns
+when the default cache is per-process, which would make rate limits and invalidation per-worker.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+
+logger = logging.getLogger('function_calls')
+
+DEFAULT_CACHE_TIMEOUT = 300
+
+# Keys are hashed past this length so they stay valid for memcached and readable elsewhere
+MAX_KEY_LENGTH = 200
+
+STATS_FLUSH_INTERVAL = 10
+STATS_KEY_PREFIX = 'cache_stats'
+
+# Distinguishes a cached None from a miss
+_MISSING = object()
+
+_namespaces = {}
+
+
+def default_cache_timeout():
+    return getattr(settings, 'CACHE_DEFAULT_TIMEOUT', DEFAULT_CACHE_TIMEOUT)
+
+
+class CacheNamespace:
+    """A group of cache entries that is invalidated together"""
+
+    def __init__(self, name, timeout=None):
+        self.name = name
+        self.timeout = timeout
+        self._version_key = f'ns:{name}:version'
+        _namespaces[name] = self
+
+    def version(self):
+        version = cache.get(self._version_key)
+        if version is None:
+            # add() so concurrent workers agree on one starting version
+            cache.add(self._version_key, time.time_ns() // 1000, None)
+            version = cache.get(self._version_key, 0)
+        return version
+
+    def key(self, *parts, version=None):
+        raw = ':'.join(str(part) for part in parts)
+        if len(raw) > MAX_KEY_LENGTH:
+            raw = hashlib.sha256(raw.encode()).hexdigest()
+        return f'ns:{self.name}:{self.version() if version is None else version}:{raw}'
+
+    def invalidate(self):
+        """Make every entry in the namespace unreachable"""
+        try:
+            cache.incr(self._version_key)
+        except ValueError:
+            cache.set(self._version_key, time.time_ns() // 1000, None)
+
+    def get(self, *parts, default=None):
+        value = cache.get(self.key(*parts), _MISSING)
+        _record(self.name, value is not _MISSING)
+        return default if value is _MISSING else value
+
+    def set(self, parts, value, timeout=None):
+        cache.set(self.key(*parts), value, self._timeout(timeout))
+
+    def get_or_set(self, parts, compute, timeout=None):
+        """Cached value for parts, calling compute() and storing its result on a miss"""
+        key = self.key(*parts)
+        value = cache.get(key, _MISSING)
+        _record(self.name, value is not _MISSING)
+        if value is _MISSING:
+            value = compute()
+            cache.set(key, value, self._timeout(timeout))
+        return value
+
+    def memoize_queryset(self, name, queryset, *vary_on, timeout=None):
+        """
+        The rows of a queryset as a list, cached under name and vary_on.
+
+        Only fetch what the page renders (slice it, use only()/values()): the list is pickled
+        whole, including any select_related objects. Each miss evaluates a fresh clone, so a
+        queryset kept at module level is not served from its own result cache after invalidate().
+        """
+        return self.get_or_set((name, *vary_on), lambda: list(queryset.all()), timeout)
+
+    def fragment(self, name, render, *vary_on, timeout=None):
+        """Rendered HTML from render(), cached under name and vary_on"""
+        return self.get_or_set(('fragment', name, *vary_on), render, timeout)
+
+    def _timeout(self, timeout):
+        if timeout is not None:
+            return timeout
+        return self.timeout if self.timeout is not None else default_cache_timeout()
+
+
+def get_namespace(name):
+    return _namespaces.get(name)
+
+
+def namespace_versions(*namespaces):
+    """{name: version} for several namespaces in one cache round trip (for {% cache %} vary_on)"""
+    versions = cache.get_many([ns._version_key for ns in namespaces])
+    return {
+        ns.name: versions[ns._version_key] if ns._version_key in versions else ns.version()
+        for ns in namespaces
+    }
+
+
+# In-process hit/miss counts, flushed to the shared cache periodically
+_stats_lock = threading.Lock()
+_pending_stats = {}
+_last_flush = time.monotonic()
+
+
+def _record(namespace, hit):
+    global _last_flush
+    with _stats_lock:
+        counts = _pending_stats.setdefault(namespace, [0, 0])
+        counts[0 if hit else 1] += 1
+        if time.monotonic() - _last_flush < STATS_FLUSH_INTERVAL:
+            return
+        pending = dict(_pending_stats)
+        _pending_stats.clear()
+        _last_flush = time.monotonic()
+    flush_stats(pending)
+
+
+def flush_stats(pending=None):
+    """Add hit/miss counts to the shared counters; approximate on backends without atomic incr"""
+    if pending is None:
+        with _stats_lock:
+            pending = dict(_pending_stats)
+            _pending_stats.clear()
+    try:
+        for namespace, (hits, misses) in pending.items():
+            for kind, count in (('hits', hits), ('misses', misses)):
+                if not count:
+                    continue
+                key = f'{STATS_KEY_PREFIX}:{namespace}:{kind}'
+                if not cache.add(key, count, None):
+                    cache.incr(key, count)
+    except Exception:
+        # Stats must never break a page
+        logger.warning("Could not record cache statistics", exc_info=True)
+
+
+def cache_stats():
+    """Per-namespace hit/miss counts and versions for the cache stats page"""
+    flush_stats()
+    names = sorted(_namespaces)
+    counters = cache.get_many(
+        [f'{STATS_KEY_PREFIX}:{name}:{kind}' for name in names for kind in ('hits', 'misses')]
+    )
+    versions = namespace_versions(*(_namespaces[name] for name in names))
+    rows = []
+    for name in names:
+        hits = counters.get(f'{STATS_KEY_PREFIX}:{name}:hits', 0)
+        misses = counters.get(f'{STATS_KEY_PREFIX}:{name}:misses', 0)
+        rows.append({
+            'name': name,
+            'version': versions[name],
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else None,
+        })
+    return rows
+
+
+def reset_cache_stats():
+    cache.delete_many([
+        f'{STATS_KEY_PREFIX}:{name}:{kind}' for name in _namespaces for kind in ('hits', 'misses')
+    ])
+
+
+def backend_info():
+    """Describe the default cache backend, with entry count and size for file-based caches"""
+    config = settings.CACHES.get('default', {})
+    backend = config.get('BACKEND', 'django.core.cache.backends.locmem.LocMemCache')
+    info = {
+        'backend': backend.rsplit('.', 1)[-1],
+        'location': config.get('LOCATION', ''),
+        'shared': not backend.endswith(('LocMemCache', 'DummyCache')),
+        'entries': None,
+        'size': None,
+    }
+    if backend.endswith('FileBasedCache') and info['location']:
+        entries = size = 0
+        try:
+            with os.scandir(info['location']) as it:
+                for entry in it:
+                    if entry.name.endswith('.djcache'):
+                        entries += 1
+                        size += entry.stat().st_size
+        except OSError:
+            pass
+        info['entries'], info['size'] = entries, size
+    return info
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Rate limits and cache invalidation only work across gunicorn workers with a shared backend"""
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if backend.endswith(('LocMemCache', 'DummyCache')):
+        return [checks.Warning(
+            'The default cache is per-process, so rate limits and cache invalidation apply per worker.',
+            hint="Use src.cache_settings.default_caches() (file-based, or Redis via CACHE_REDIS_URL).",
+            id='src.W001',
+        )]
+    return []
@@ -0,0 +1,61 @@
+"""
+Fragment caching for the home and officer home dashboards.
+
+Each dashboard widget is wrapped in a {% cache %} block keyed by its fragment name, the
+viewer's member_type and the version of the widget's cache namespace. The view passes lazy
+querysets, so a cache hit runs no queries for the widget. Saving or deleting a model a widget
+shows bumps that widget's namespace version once the transaction commits. DASHBOARD_CACHE_TIMEOUT
+bounds staleness from things no signal covers, such as events passing or scheduled announcements
+going live.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from src.caching import CacheNamespace, namespace_versions
+from src.models import Announcement, CommitteeDocument, CommitteeLegislation, Event, Legislation
+
+DEFAULT_DASHBOARD_CACHE_TIMEOUT = 300
+
+# Fragment name -> models whose changes invalidate it. Closing a vote saves its Legislation,
+# so individual ballots never invalidate anything.
+DASHBOARD_FRAGMENTS = {
+    'home_announcements': (Announcement,),
+    'officer_recent_reports': (CommitteeDocument,),
+    'officer_upcoming_events': (Event,),
+    'officer_recent_activity': (Legislation, CommitteeLegislation, CommitteeDocument),
+}
+
+
+def dashboard_cache_timeout():
+    return getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', DEFAULT_DASHBOARD_CACHE_TIMEOUT)
+
+
+# One namespace per widget, so a change only re-renders the widgets that show it
+DASHBOARD_NAMESPACES = {name: CacheNamespace(f'dashboard.{name}') for name in DASHBOARD_FRAGMENTS}
+
+
+def dashboard_versions(*fragment_names):
+    """Namespace versions for the {% cache %} vary_on of the given fragments"""
+    versions = namespace_versions(*(DASHBOARD_NAMESPACES[name] for name in fragment_names))
+    return {name: versions[f'dashboard.{name}'] for name in fragment_names}
+
+
+def invalidate_dashboard_fragments(*fragment_names):
+    for name in fragment_names:
+        DASHBOARD_NAMESPACES[name].invalidate()
+
+
+def _fragments_for(model):
+    return [name for name, models in DASHBOARD_FRAGMENTS.items() if model in models]
+
+
+def _invalidate_on_change(sender, **kwargs):
+    fragment_names = _fragments_for(sender)
+    # After commit, so a concurrent request can't re-cache the rows as they were before the change
+    transaction.on_commit(lambda: invalidate_dashboard_fragments(*fragment_names))
+
+
+for _model in {model for models in DASHBOARD_FRAGMENTS.values() for model in models}:
+    post_save.connect(_invalidate_on_change, sender=_model, dispatch_uid=f'dashboard_cache_save_{_model.__name__}')
+    post_delete.connect(_invalidate_on_change, sender=_model, dispatch_uid=f'dashboard_cache_delete_{_model.__name__}')
@@ -0,0 +1,190 @@
+"""
+First-page thumbnails for uploaded PDFs.
+
+Previews are PNGs rendered with poppler's pdftoppm by a background thread and cached in the
+media folder under previews/, keyed by the document's content (see preview_name), so they
+survive restarts and identical uploads share one image. A missing preview is generated lazily
+the first time it is requested, and new uploads are queued as soon as they are saved.
+
+The cache is bounded by DOCUMENT_PREVIEW_CACHE_MAX_BYTES: once it grows past the limit the least
+recently served previews are deleted (serving refreshes a preview's mtime).
+"""
+import hashlib
+import logging
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save
+
+from src.models import CommitteeDocument, CommitteeMinutes, Legislation
+from src.storage import is_blob_name
+
+logger = logging.getLogger('function_calls')
+
+PREVIEW_DIRECTORY = 'previews'
+PREVIEW_WIDTH = 320
+PREVIEWABLE_EXTENSIONS = ('.pdf',)
+PREVIEW_RENDER_TIMEOUT = 30
+
+DEFAULT_PREVIEW_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# Serving a preview bumps its mtime at most this often, which is enough resolution for eviction
+PREVIEW_TOUCH_INTERVAL = 3600
+
+
+def can_preview(file):
+    return bool(file) and os.path.splitext(file.name)[1].lower() in PREVIEWABLE_EXTENSIONS
+
+
+def preview_name(file):
+    """
+    Deterministic cache key for a file's preview.
+
+    Content-addressed files use their hash. Older files use their name, mtime and size, which is
+    a stat instead of hashing the whole PDF on every list page.
+    """
+    if is_blob_name(file.name):
+        key = os.path.splitext(os.path.basename(file.name))[0]
+    else:
+        stat = os.stat(file.path)
+        key = hashlib.sha256(f"{file.name}:{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()
+    return f"{PREVIEW_DIRECTORY}/{key[:2]}/{key}-{PREVIEW_WIDTH}.png"
+
+
+def preview_path(file):
+    # Previews are always written to (and read from) the regular media folder
+    return os.path.join(file.storage.location, preview_name(file))
+
+
+def render_preview(source_path, dest_path, width=PREVIEW_WIDTH):
+    """Render page 1 of a PDF to a PNG `width` pixels wide, replacing dest_path atomically"""
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(dest_path), prefix='.render-') as tmp:
+        prefix = os.path.join(tmp, 'page')
+        subprocess.run(
+            ['pdftoppm', '-png', '-f', '1', '-l', '1', '-singlefile',
+             '-scale-to-x', str(width), '-scale-to-y', '-1', source_path, prefix],
+            check=True, timeout=PREVIEW_RENDER_TIMEOUT,
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        os.replace(f"{prefix}.png", dest_path)
+
+
+def touch_preview(path):
+    """Mark a preview as recently used for eviction"""
+    try:
+        if time.time() - os.stat(path).st_mtime > PREVIEW_TOUCH_INTERVAL:
+            os.utime(path)
+    except OSError:
+        pass
+
+
+def evict_previews(root, max_bytes):
+    """Delete the least recently used previews under root until the cache fits in 90% of max_bytes"""
+    previews = []
+    total = 0
+    for directory, _, files in os.walk(root):
+        for filename in files:
+            if not filename.endswith('.png'):
+                continue
+            path = os.path.join(directory, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            previews.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+    if total <= max_bytes:
+        return 0
+
+    removed = 0
+    target = max_bytes * 0.9
+    for _, size, path in sorted(previews):
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+class PreviewWorker:
+    """Single background thread that renders queued previews; needs no database access"""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self._pending = set()
+        self._failed = set()   # sources that couldn't be rendered, so requests don't retry them forever
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='document-previews', daemon=True)
+        self._thread.start()
+
+    def put(self, source_path, dest_path):
+        with self._lock:
+            if dest_path in self._pending or dest_path in self._failed:
+                return
+            self._pending.add(dest_path)
+        self.queue.put((source_path, dest_path))
+
+    def _run(self):
+        while True:
+            source_path, dest_path = self.queue.get()
+            try:
+                if not os.path.exists(dest_path):
+                    render_preview(source_path, dest_path)
+                    cache_root = os.path.dirname(os.path.dirname(dest_path))
+                    evict_previews(cache_root, getattr(
+                        settings, 'DOCUMENT_PREVIEW_CACHE_MAX_BYTES', DEFAULT_PREVIEW_CACHE_MAX_BYTES
+                    ))
+            except (OSError, subprocess.SubprocessError) as e:
+                logger.warning(f"Preview rendering failed for {source_path}: {e}")
+                with self._lock:
+                    self._failed.add(dest_path)
+            finally:
+                with self._lock:
+                    self._pending.discard(dest_path)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def schedule_preview(file):
+    """Queue a preview for rendering unless it already exists; returns its path or None"""
+    if not can_preview(file):
+        return None
+    try:
+        dest_path = preview_path(file)
+        source_path = file.path
+    except OSError:
+        return None
+    if os.path.exists(dest_path):
+        return dest_path
+
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = PreviewWorker()
+    _worker.put(source_path, dest_path)
+    return dest_path
+
+
+def _preview_on_save(sender, instance, **kwargs):
+    if not getattr(settings, 'DOCUMENT_PREVIEW_ON_SAVE', True):
+        return
+    file = instance.document
+    transaction.on_commit(lambda: schedule_preview(file))
+
+
+for _model in (Legislation, CommitteeDocument, CommitteeMinutes):
+    post_save.connect(_preview_on_save, sender=_model, dispatch_uid=f'document_preview_{_model.__name__}')
@@ -0,0 +1,258 @@
+"""
+Full-text search over uploaded documents.
+
+Text is extracted from PDF and Office (DOCX/XLSX/PPTX) files into DocumentText rows, whose
+search_vector is a weighted Postgres tsvector (title A, description B, file text C) behind a GIN
+index. Indexing is incremental: a row is only re-extracted when the file's SHA-256 changes.
+
+Saves are indexed by a background thread after the transaction commits; the index_documents
+management command (re)builds everything and can be run from cron to catch anything missed.
+"""
+import hashlib
+import logging
+import os
+import queue
+import threading
+import zipfile
+from xml.etree import ElementTree
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.db.models.signals import post_delete, post_save
+
+from src.models import (
+    Committee, CommitteeDocument, CommitteeMinutes, DocumentText, Legislation, PassedResolution,
+)
+from src.storage import is_blob_name
+
+logger = logging.getLogger('function_calls')
+
+SEARCH_CONFIG = 'english'
+
+# Postgres rejects tsvectors over 1 MB; this much text stays well under it
+MAX_INDEXED_TEXT = 500_000
+
+# Office parts larger than this are skipped rather than parsed (zip bombs)
+MAX_OOXML_PART_SIZE = 50 * 1024 * 1024
+
+# kind -> (model, file field, description field); kinds match the download_document URL
+INDEXED_DOCUMENTS = {
+    'legislation': (Legislation, 'document', 'description'),
+    'committee_document': (CommitteeDocument, 'document', 'description'),
+    'committee_minutes': (CommitteeMinutes, 'document', 'content'),
+    'passed_resolution': (PassedResolution, 'document', 'description'),
+}
+
+# Zip members holding the visible text of each Office format
+OOXML_TEXT_PARTS = {
+    '.docx': ('word/document.xml', 'word/header', 'word/footer', 'word/footnotes.xml'),
+    '.pptx': ('ppt/slides/slide',),
+    '.xlsx': ('xl/sharedStrings.xml',),
+}
+
+
+def _extract_pdf_text(path):
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    return '\n'.join(page.extract_text() or '' for page in reader.pages)
+
+
+def _extract_ooxml_text(path, prefixes):
+    parts = []
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if not info.filename.startswith(prefixes) or not info.filename.endswith('.xml'):
+                continue
+            if info.file_size > MAX_OOXML_PART_SIZE:
+                continue
+            root = ElementTree.fromstring(archive.read(info))
+            # <w:t>, <a:t> and <t> elements hold the text runs in all three formats
+            parts.append(' '.join(el.text for el in root.iter() if el.tag.rsplit('}', 1)[-1] == 't' and el.text))
+    return '\n'.join(parts)
+
+
+def extract_text(path):
+    """Return the text of a PDF or Office file, or '' for formats that can't be searched"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.pdf':
+        text = _extract_pdf_text(path)
+    elif extension in OOXML_TEXT_PARTS:
+        text = _extract_ooxml_text(path, OOXML_TEXT_PARTS[extension])
+    else:
+        return ''
+    return text.replace('\x00', '')[:MAX_INDEXED_TEXT]
+
+
+def document_sha256(file):
+    """Hash of a stored file; content-addressed names already are the hash"""
+    if is_blob_name(file.name):
+        return os.path.splitext(os.path.basename(file.name))[0]
+
+    digest = hashlib.sha256()
+    with open(file.path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def index_document(kind, obj, force=False):
+    """
+    Bring the DocumentText row for obj up to date.
+
+    Returns 'indexed', 'unchanged' or 'missing' (the file isn't on disk).
+    """
+    model, file_field, description_field = INDEXED_DOCUMENTS[kind]
+    file = getattr(obj, file_field)
+    title = obj.title
+    description = getattr(obj, description_field) or ''
+
+    sha256 = ''
+    if file:
+        try:
+            sha256 = document_sha256(file)
+        except OSError:
+            return 'missing'
+
+    entry = DocumentText.objects.filter(kind=kind, object_id=obj.pk).first()
+    if entry is not None and not force and entry.sha256 == sha256:
+        if entry.title == title and entry.description == description:
+            return 'unchanged'
+        # Only the metadata changed: keep the extracted text
+        text, error = entry.text, entry.extraction_error
+    else:
+        text, error = '', ''
+        if file:
+            try:
+                text = extract_text(file.path)
+            except Exception as e:
+                # Corrupt or encrypted files still get a title/description entry
+                logger.warning(f"Text extraction failed for {kind} {obj.pk} ({file.name}): {e}")
+                error = str(e)[:255]
+
+    with transaction.atomic():
+        entry, _ = DocumentText.objects.update_or_create(
+            kind=kind, object_id=obj.pk,
+            defaults={
+                'title': title[:200], 'description': description, 'text': text,
+                'sha256': sha256, 'extraction_error': error,
+            },
+        )
+        DocumentText.objects.filter(pk=entry.pk).update(search_vector=(
+            SearchVector('title', weight='A', config=SEARCH_CONFIG)
+            + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+            + SearchVector('text', weight='C', config=SEARCH_CONFIG)
+        ))
+    return 'indexed'
+
+
+def index_documents(kinds=None, force=False):
+    """Index every document of the given kinds, yielding (kind, obj, status); drops rows for deleted documents"""
+    for kind in kinds or INDEXED_DOCUMENTS:
+        model = INDEXED_DOCUMENTS[kind][0]
+        DocumentText.objects.filter(kind=kind).exclude(object_id__in=model.objects.values('pk')).delete()
+        for obj in model.objects.order_by('pk').iterator():
+            yield kind, obj, index_document(kind, obj, force=force)
+
+
+def viewable_committees(user):
+    """Committees whose documents and minutes the user may open (members, chairs, can_view_docs)"""
+    return Committee.objects.filter(
+        Q(members=user) | Q(chairs=user)
+        | Q(committeepermissions__user=user, committeepermissions__can_view_docs=True)
+    ).values('pk')
+
+
+def visible_document_texts(user):
+    """DocumentText rows whose source document the user may open (mirrors download_document's checks)"""
+    texts = DocumentText.objects.all()
+    if user.can_view_officer_pages:
+        return texts
+
+    committees = viewable_committees(user)
+    return texts.filter(
+        Q(kind__in=['legislation', 'passed_resolution'])
+        | Q(kind='committee_document', object_id__in=CommitteeDocument.objects.filter(
+            Q(published_to_chapter=True) | Q(committee__in=committees)
+        ).values('pk'))
+        | Q(kind='committee_minutes', object_id__in=CommitteeMinutes.objects.filter(
+            committee__in=committees
+        ).values('pk'))
+    )
+
+
+def search_documents(user, query, kinds=None):
+    """Documents matching a web-style query (quotes, OR, -word), best match first, with a highlighted excerpt"""
+    search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+    results = visible_document_texts(user).filter(search_vector=search_query)
+    if kinds:
+        results = results.filter(kind__in=kinds)
+    # ts_headline is only evaluated for the rows of the page that is fetched
+    return results.annotate(
+        rank=SearchRank(F('search_vector'), search_query),
+        headline=SearchHeadline(
+            'text', search_query, config=SEARCH_CONFIG,
+            start_sel='<mark>', stop_sel='</mark>', max_words=35, min_words=15, max_fragments=2,
+        ),
+    ).order_by('-rank', '-indexed_at').defer('text', 'search_vector')
+
+
+class DocumentIndexWorker:
+    """Single background thread that indexes documents queued by post_save"""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='document-indexer', daemon=True)
+        self._thread.start()
+
+    def put(self, kind, pk):
+        self.queue.put((kind, pk))
+
+    def _run(self):
+        while True:
+            kind, pk = self.queue.get()
+            close_old_connections()
+            try:
+                obj = INDEXED_DOCUMENTS[kind][0].objects.filter(pk=pk).first()
+                if obj is not None:
+                    index_document(kind, obj)
+            except Exception:
+                logger.exception(f"Background indexing failed for {kind} {pk}")
+            finally:
+                close_old_connections()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def schedule_document_index(kind, pk):
+    """Index a document in the background once the current transaction commits"""
+    if not getattr(settings, 'DOCUMENT_INDEX_ON_SAVE', True):
+        return
+
+    def enqueue():
+        global _worker
+        with _worker_lock:
+            if _worker is None:
+                _worker = DocumentIndexWorker()
+        _worker.put(kind, pk)
+    transaction.on_commit(enqueue)
+
+
+def _index_on_save(sender, instance, **kwargs):
+    kind = _KIND_BY_MODEL[sender]
+    schedule_document_index(kind, instance.pk)
+
+
+def _drop_on_delete(sender, instance, **kwargs):
+    DocumentText.objects.filter(kind=_KIND_BY_MODEL[sender], object_id=instance.pk).delete()
+
+
+_KIND_BY_MODEL = {model: kind for kind, (model, _, _) in INDEXED_DOCUMENTS.items()}
+
+for _model in _KIND_BY_MODEL:
+    post_save.connect(_index_on_save, sender=_model, dispatch_uid=f'document_search_index_{_model.__name__}')
+    post_delete.connect(_drop_on_delete, sender=_model, dispatch_uid=f'document_search_drop_{_model.__name__}')
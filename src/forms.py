@@ -1,7 +1,7 @@
 from django import forms
 from django.conf import settings
 from .models import Legislation, Announcement, Event, CommitteeDocument, Committee, PassedResolution, ResolutionSectionImpact, KaiReport
-import magic  # python-magic for MIME type detection
+from .upload_handlers import detect_upload_mime
 
 class LegislationForm(forms.ModelForm):
     class Meta:
@@ -11,6 +11,10 @@ class LegislationForm(forms.ModelForm):
     def clean_document(self):
         file = self.cleaned_data.get('document')
         if file:
+            # Rejected by ValidatingUploadHandler while streaming
+            if getattr(file, 'upload_error', None):
+                raise forms.ValidationError(file.upload_error)
+
             # Check file extension
             if not file.name.lower().endswith(('.pdf', '.docx')):
                 raise forms.ValidationError('Only PDF and DOCX files are allowed.')
@@ -21,8 +25,7 @@ class LegislationForm(forms.ModelForm):
 
             # Check MIME type to prevent file extension spoofing
             try:
-                mime = magic.from_buffer(file.read(2048), mime=True)
-                file.seek(0)  # Reset file pointer
+                mime = detect_upload_mime(file)
 
                 allowed_mimes = [
                     'application/pdf',
@@ -205,6 +208,10 @@ class CommitteeDocumentForm(forms.ModelForm):
         """Validate uploaded committee documents for security"""
         file = self.cleaned_data.get('document')
         if file:
+            # Rejected by ValidatingUploadHandler while streaming
+            if getattr(file, 'upload_error', None):
+                raise forms.ValidationError(file.upload_error)
+
             # Allowed extensions
             allowed_extensions = ('.pdf', '.docx', '.doc', '.xlsx', '.xls', '.pptx', '.ppt')
             if not file.name.lower().endswith(allowed_extensions):
@@ -218,8 +225,7 @@ class CommitteeDocumentForm(forms.ModelForm):
 
             # Check MIME type to prevent file extension spoofing
             try:
-                mime = magic.from_buffer(file.read(2048), mime=True)
-                file.seek(0)  # Reset file pointer
+                mime = detect_upload_mime(file)
 
                 allowed_mimes = getattr(settings, 'ALLOWED_DOCUMENT_TYPES', [
                     'application/pdf',
@@ -470,6 +476,10 @@ class KaiReportForm(forms.ModelForm):
         """Validate uploaded attachment for security"""
         file = self.cleaned_data.get('attachment')
         if file:
+            # Rejected by ValidatingUploadHandler while streaming
+            if getattr(file, 'upload_error', None):
+                raise forms.ValidationError(file.upload_error)
+
             # Allowed extensions
             allowed_extensions = ('.pdf', '.docx', '.doc', '.xlsx', '.xls', '.jpg', '.jpeg', '.png')
             if not file.name.lower().endswith(allowed_extensions):
@@ -483,8 +493,7 @@ class KaiReportForm(forms.ModelForm):
 
             # Check MIME type
             try:
-                mime = magic.from_buffer(file.read(2048), mime=True)
-                file.seek(0)  # Reset file pointer
+                mime = detect_upload_mime(file)
 
                 allowed_mimes = [
                     'application/pdf',
@@ -0,0 +1,129 @@
+"""
+Live vote tallies pushed to the uploader and chairs while a vote is open.
+
+Each bill has a TallyChannel in the shared cache: a sequence number and the last
+LIVE_TALLY_EVENT_LIMIT events. When a ballot is committed, one GROUP BY computes the bill's
+counts and the event (the choice, the voter's name unless the bill is anonymous, and the
+counts) is published on the channel. Streams (src/view/vote_stream.py) only poll the sequence
+number in the cache, so any number of open result pages cost one query per ballot rather than
+one per page per refresh.
+
+Because every event carries the full counts, a missed or duplicated event (an evicted key, or
+two workers taking the same sequence number on a cache without atomic incr) is corrected by
+the next one.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_save
+
+from src.models import CommitteeLegislation, CommitteeVote, Legislation, Vote
+
+# kind (as in download_document) -> (bill model, ballot model)
+LIVE_TALLY_SOURCES = {
+    'legislation': (Legislation, Vote),
+    'committee_legislation': (CommitteeLegislation, CommitteeVote),
+}
+
+# How long events and sequence numbers are kept; a meeting is well within a day
+LIVE_TALLY_TTL = 24 * 60 * 60
+
+# Events a reconnecting stream can catch up on before it needs a fresh tally
+LIVE_TALLY_EVENT_LIMIT = 100
+
+
+def tally_counts(kind, bill):
+    """{choice: count} for a bill, with every option present (one query)"""
+    vote_model = LIVE_TALLY_SOURCES[kind][1]
+    counts = dict(
+        vote_model.objects.filter(legislation_id=bill.pk)
+        .values_list('vote_choice').annotate(count=Count('id'))
+    )
+    options = list(bill.plurality_options or []) if bill.vote_mode == 'plurality' else ['yes', 'no', 'abstain']
+    return {**{option: 0 for option in options}, **counts}
+
+
+def tally_payload(kind, bill):
+    counts = tally_counts(kind, bill)
+    return {'type': 'tally', 'counts': counts, 'total': sum(counts.values()), 'closed': bill.voting_closed}
+
+
+class TallyChannel:
+    """The cached event sequence for one bill"""
+
+    def __init__(self, kind, pk):
+        self._prefix = f'live_tally:{kind}:{pk}'
+        self._seq_key = f'{self._prefix}:seq'
+
+    def _event_key(self, seq):
+        return f'{self._prefix}:event:{seq}'
+
+    def seq(self):
+        return cache.get(self._seq_key, 0)
+
+    def publish(self, event):
+        cache.add(self._seq_key, 0, LIVE_TALLY_TTL)
+        try:
+            seq = cache.incr(self._seq_key)
+        except ValueError:
+            # Expired between add() and incr()
+            seq = 1
+            cache.set(self._seq_key, seq, LIVE_TALLY_TTL)
+        cache.set(self._event_key(seq), event, LIVE_TALLY_TTL)
+        return seq
+
+    def events_since(self, last_seq, seq=None):
+        """[(seq, event)] after last_seq, or None if some of them are no longer cached"""
+        seq = self.seq() if seq is None else seq
+        if last_seq > seq or seq - last_seq > LIVE_TALLY_EVENT_LIMIT:
+            return None
+        wanted = range(last_seq + 1, seq + 1)
+        events = cache.get_many([self._event_key(n) for n in wanted])
+        if len(events) != len(wanted):
+            return None
+        return [(n, events[self._event_key(n)]) for n in wanted]
+
+
+def _publish_ballot(kind, bill, choice, voter_name):
+    event = tally_payload(kind, bill)
+    event.update({
+        'type': 'vote',
+        'choice': choice,
+        'voter': None if bill.anonymous_vote else voter_name,
+    })
+    TallyChannel(kind, bill.pk).publish(event)
+
+
+def _on_ballot_saved(sender, instance, created, **kwargs):
+    if not created:
+        return
+    kind = 'legislation' if sender is Vote else 'committee_legislation'
+    bill, choice, voter_name = instance.legislation, instance.vote_choice, instance.user.name
+    # After commit, so the counts include this ballot and a rolled-back ballot is never shown
+    transaction.on_commit(lambda: _publish_ballot(kind, bill, choice, voter_name))
+
+
+def _on_ballot_deleted(sender, instance, **kwargs):
+    kind = 'legislation' if sender is Vote else 'committee_legislation'
+    bill_model = LIVE_TALLY_SOURCES[kind][0]
+    pk = instance.legislation_id
+
+    def publish():
+        bill = bill_model.objects.filter(pk=pk).first()
+        if bill is not None:
+            TallyChannel(kind, pk).publish(tally_payload(kind, bill))
+    transaction.on_commit(publish)
+
+
+def _on_bill_saved(sender, instance, created, **kwargs):
+    """Closing (or reopening) a vote is pushed as a fresh tally with its closed flag"""
+    if created:
+        return
+    kind = 'legislation' if sender is Legislation else 'committee_legislation'
+    transaction.on_commit(lambda: TallyChannel(kind, instance.pk).publish(tally_payload(kind, instance)))
+
+
+for _kind, (_bill_model, _vote_model) in LIVE_TALLY_SOURCES.items():
+    post_save.connect(_on_ballot_saved, sender=_vote_model, dispatch_uid=f'live_tally_save_{_kind}')
+    post_delete.connect(_on_ballot_deleted, sender=_vote_model, dispatch_uid=f'live_tally_delete_{_kind}')
+    post_save.connect(_on_bill_saved, sender=_bill_model, dispatch_uid=f'live_tally_bill_{_kind}')
@@ -2,10 +2,22 @@
 Enhanced logging utilities for Parliament application
 Provides detailed, structured logging for all user actions and system events
 """
+import atexit
+import gzip
+import collections
 import logging
 import json
-from datetime import datetime
+import mmap
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone as dt_timezone
 from functools import wraps
+from logging.handlers import BaseRotatingHandler, QueueHandler
+from django.conf import settings
+from django.db import close_old_connections, connections
 from django.http import HttpRequest
 
 # Configure loggers
@@ -93,7 +105,7 @@ def log_document_action(action, document, user, committee=None, details=None):
     if hasattr(document, 'published_to_chapter'):
         doc_details['published_to_chapter'] = document.published_to_chapter
 
-    log_entry = LogContext.format_log_entry(
+    log_entry = AuditLogEntry(
         user=user,
         action=f"DOCUMENT_{action}",
         resource_type='CommitteeDocument',
@@ -117,7 +129,7 @@ def log_security_event(event_type, user, details=None, ip_address=None, severity
     """
     logger = logging.getLogger('security')
 
-    log_entry = LogContext.format_log_entry(
+    log_entry = AuditLogEntry(
         user=user,
         action=event_type,
         details=details,
@@ -128,3 +140,418 @@ def log_security_event(event_type, user, details=None, ip_address=None, severity
     # Log at appropriate level
     log_method = getattr(logger, severity.lower(), logger.info)
     log_method(log_entry)
+
+
+class AuditLogEntry:
+    """
+    Deferred audit log message.
+
+    Holds the arguments for LogContext.format_log_entry() and only formats them when a
+    handler renders the record, which with the audit queue installed happens on the
+    listener thread instead of the request thread.
+    """
+    __slots__ = ('kwargs',)
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    def __str__(self):
+        return LogContext.format_log_entry(**self.kwargs)
+
+    def event_fields(self):
+        """Fields for an AuditEvent row, resolved the same way format_log_entry() does"""
+        kwargs = self.kwargs
+        user = kwargs.get('user')
+        resource_id = kwargs.get('resource_id')
+        return {
+            'username': str(getattr(user, 'username', user))[:150],
+            'user_id': str(getattr(user, 'user_id', 'unknown'))[:50],
+            'action': str(kwargs.get('action'))[:100],
+            'resource_type': str(kwargs.get('resource_type') or '')[:100],
+            'resource_id': '' if resource_id is None else str(resource_id)[:100],
+            'status': str(kwargs.get('status', 'success'))[:20],
+            'ip_address': kwargs.get('ip_address') or None,
+            # Round-trip through JSON so model instances/dates in details are stored as strings
+            'details': json.loads(json.dumps(kwargs['details'], default=str)) if kwargs.get('details') else None,
+        }
+
+
+def audit_sample_rate(model):
+    """
+    Fraction of save/delete events to audit for a model (0.0 = off, 1.0 = every event)
+
+    Models declare a default with an `audit_log_sample_rate` class attribute; the
+    AUDIT_LOG_SAMPLE_RATES setting ({'ModelName': rate}) overrides it per deployment.
+    """
+    overrides = getattr(settings, 'AUDIT_LOG_SAMPLE_RATES', {})
+    if model.__name__ in overrides:
+        return overrides[model.__name__]
+    return getattr(model, 'audit_log_sample_rate', 1.0)
+
+
+def should_audit(model):
+    """Decide whether this save/delete event of model should be written to the audit log"""
+    rate = audit_sample_rate(model)
+    if rate >= 1:
+        return True
+    if rate <= 0:
+        return False
+    return random.random() < rate
+
+
+class BatchingQueueListener:
+    """
+    Drains queued log records on a background thread and hands them to the real handlers
+    in batches, so file handlers write and flush once per batch instead of once per record
+    """
+
+    _sentinel = None
+
+    def __init__(self, record_queue, handlers, batch_size=200, flush_interval=0.5):
+        self.queue = record_queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='audit-log-listener', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread and self._thread.is_alive():
+            self.queue.put(self._sentinel)
+            self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stopping = self._sentinel in batch
+            # AuditEventHandler writes on this thread's own connection; recycle it like a request would
+            close_old_connections()
+            try:
+                self.handle_batch([record for record in batch if record is not self._sentinel])
+            finally:
+                close_old_connections()
+            if stopping:
+                # Don't leave the connection open for the life of the process (or the test database)
+                connections.close_all()
+                return
+
+    def handle_batch(self, records):
+        for handler in self.handlers:
+            matching = [record for record in records if record.levelno >= handler.level]
+            if not matching:
+                continue
+
+            # Handlers that can write a whole batch at once (AuditEventHandler) get it in one call
+            if hasattr(handler, 'emit_batch'):
+                matching = [record for record in matching if handler.filter(record)]
+                if matching:
+                    handler.emit_batch(matching)
+                continue
+
+            # Plain stream/file handlers get one write+flush per batch; anything else (rotating
+            # files, email, unopened delayed files) goes through its normal handle() path
+            batchable = (
+                isinstance(handler, logging.StreamHandler)
+                and not isinstance(handler, BaseRotatingHandler)
+                and handler.stream is not None
+            )
+            if not batchable:
+                for record in matching:
+                    handler.handle(record)
+                continue
+
+            handler.acquire()
+            try:
+                for record in matching:
+                    if not handler.filter(record):
+                        continue
+                    try:
+                        handler.stream.write(handler.format(record) + handler.terminator)
+                    except Exception:
+                        handler.handleError(record)
+                handler.flush()
+            finally:
+                handler.release()
+
+
+class AuditEventHandler(logging.Handler):
+    """
+    Writes AuditLogEntry records to the AuditEvent table.
+
+    Records with plain string messages (e.g. log_function_call output) are ignored; they
+    stay in the log files only. Behind the audit queue each batch is one bulk INSERT.
+    """
+
+    def emit(self, record):
+        self.emit_batch([record])
+
+    def emit_batch(self, records):
+        from src.models import AuditEvent
+
+        events = [
+            AuditEvent(
+                timestamp=datetime.fromtimestamp(record.created, tz=dt_timezone.utc),
+                logger_name=record.name[:50],
+                **record.msg.event_fields()
+            )
+            for record in records
+            if isinstance(record.msg, AuditLogEntry)
+        ]
+        if not events:
+            return
+
+        try:
+            AuditEvent.objects.bulk_create(events)
+        except Exception:
+            self.handleError(records[0])
+
+
+class AuditQueueHandler(QueueHandler):
+    """
+    QueueHandler for the audit loggers.
+
+    Records are enqueued unformatted (AuditLogEntry messages are rendered by the listener),
+    the listener is started lazily in each process so it survives gunicorn forking, and
+    records are dropped rather than blocking the request if the queue is full.
+    """
+
+    def __init__(self, handlers, max_queue_size=10000, batch_size=200, flush_interval=0.5):
+        super().__init__(queue.Queue(maxsize=max_queue_size))
+        self.target_handlers = handlers
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._listener = None
+        self._listener_pid = None
+        self._listener_lock = threading.Lock()
+
+    def _ensure_listener(self):
+        if self._listener_pid == os.getpid():
+            return
+        with self._listener_lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener = BatchingQueueListener(
+                self.queue, self.target_handlers, batch_size=self.batch_size, flush_interval=self.flush_interval
+            )
+            self._listener.start()
+            self._listener_pid = os.getpid()
+            atexit.register(self.stop)
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record):
+        self._ensure_listener()
+        super().emit(record)
+
+    def stop(self):
+        """Flush everything queued so far and stop the listener"""
+        if self._listener and self._listener_pid == os.getpid():
+            self._listener.stop()
+        self._listener = None
+        self._listener_pid = None
+
+
+def _running_tests():
+    """manage.py test or pytest, where audit rows must be written inside each test's transaction"""
+    return (len(sys.argv) > 1 and sys.argv[1] == 'test') or 'pytest' in sys.modules
+
+
+def install_audit_queue():
+    """
+    Attach the AuditEvent store to the audit loggers and move their handlers behind an
+    AuditQueueHandler so model save/delete logging never does file or database I/O on the
+    request thread.
+
+    Controlled by settings:
+        AUDIT_EVENT_STORE: write structured entries to the AuditEvent table (default True)
+        AUDIT_EVENT_LOGGERS: loggers whose entries are stored (default ['function_calls', 'security'])
+        AUDIT_LOG_ASYNC: enable the queue (default True, except under the test runner, where
+            the listener thread's own connection would write outside the test transaction)
+        AUDIT_LOG_QUEUE_LOGGERS: logger names to route through the queue (default ['function_calls', 'security'])
+        AUDIT_LOG_BATCH_SIZE / AUDIT_LOG_FLUSH_INTERVAL / AUDIT_LOG_QUEUE_SIZE: listener tuning
+    """
+    if getattr(settings, 'AUDIT_EVENT_STORE', True):
+        for name in getattr(settings, 'AUDIT_EVENT_LOGGERS', ['function_calls', 'security']):
+            audit_logger = logging.getLogger(name)
+            if not any(isinstance(handler, (AuditEventHandler, AuditQueueHandler)) for handler in audit_logger.handlers):
+                audit_logger.addHandler(AuditEventHandler())
+                if audit_logger.level == logging.NOTSET:
+                    audit_logger.setLevel(logging.INFO)
+
+    if not getattr(settings, 'AUDIT_LOG_ASYNC', not _running_tests()):
+        return
+
+    for name in getattr(settings, 'AUDIT_LOG_QUEUE_LOGGERS', ['function_calls', 'security']):
+        audit_logger = logging.getLogger(name)
+        if any(isinstance(handler, AuditQueueHandler) for handler in audit_logger.handlers):
+            continue
+
+        handlers = list(audit_logger.handlers)
+        if not handlers:
+            continue
+
+        queue_handler = AuditQueueHandler(
+            handlers,
+            max_queue_size=getattr(settings, 'AUDIT_LOG_QUEUE_SIZE', 10000),
+            batch_size=getattr(settings, 'AUDIT_LOG_BATCH_SIZE', 200),
+            flush_interval=getattr(settings, 'AUDIT_LOG_FLUSH_INTERVAL', 0.5),
+        )
+        for handler in handlers:
+            audit_logger.removeHandler(handler)
+        audit_logger.addHandler(queue_handler)
+
+
+LOG_TAIL_BLOCK_SIZE = 64 * 1024
+
+
+def rotated_log_files(path):
+    """
+    The log file followed by its rotated predecessors, newest first: path, path.1, path.2.gz, ...
+
+    Both RotatingFileHandler (path.N) and logrotate with compress (path.N.gz) naming are understood.
+    """
+    files = [path] if os.path.exists(path) else []
+    index = 1
+    while True:
+        for candidate in (f"{path}.{index}", f"{path}.{index}.gz"):
+            if os.path.exists(candidate):
+                files.append(candidate)
+                break
+        else:
+            return files
+        index += 1
+
+
+def _lines_before(buffer, end, limit, partial_head=False):
+    """
+    Walk buffer backwards from end and return (lines, stop) with up to limit non-blank lines,
+    newest first. stop is the offset of the oldest line consumed (0 once the start is reached).
+    With partial_head, the bytes before the first newline may be a cut-off line and are not returned.
+    """
+    lines = []
+    pos = end
+    if pos > 0 and buffer[pos - 1:pos] == b'\n':
+        pos -= 1
+
+    while pos > 0 and len(lines) < limit:
+        start = buffer.rfind(b'\n', 0, pos) + 1
+        if start == 0 and partial_head:
+            break
+        line = bytes(buffer[start:pos]).rstrip(b'\r')
+        if line.strip():
+            lines.append(line.decode('utf-8', errors='replace'))
+        pos = start - 1 if start else 0
+        if start == 0:
+            return lines, 0
+
+    return lines, pos + 1 if pos > 0 else 0
+
+
+def _read_plain_lines_before(path, end, limit, block_size):
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        end = size if end is None else min(end, size)
+        if end == 0:
+            return [], 0
+
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                return _lines_before(buffer, end, limit)
+        except (ValueError, OSError):
+            pass
+
+        # mmap unavailable (e.g. some network filesystems): read fixed blocks backwards until
+        # there are enough newlines for limit complete lines
+        pos = end
+        chunks = []
+        newlines = 0
+        while pos > 0 and newlines <= limit:
+            read_size = min(block_size, pos)
+            pos -= read_size
+            f.seek(pos)
+            chunk = f.read(read_size)
+            chunks.append(chunk)
+            newlines += chunk.count(b'\n')
+
+        buffer = b''.join(reversed(chunks))
+        lines, stop = _lines_before(buffer, len(buffer), limit, partial_head=pos > 0)
+        return lines, pos + stop
+
+
+def _read_gzip_lines_before(path, end, limit):
+    # Compressed rotations can't be read backwards; stream them once keeping only the last lines
+    tail = collections.deque(maxlen=limit)
+    offset = 0
+    with gzip.open(path, 'rb') as f:
+        for raw in f:
+            if end is not None and offset >= end:
+                break
+            if raw.strip():
+                tail.append((offset, raw.rstrip(b'\r\n').decode('utf-8', errors='replace')))
+            offset += len(raw)
+
+    lines = [line for _, line in reversed(tail)]
+    return lines, tail[0][0] if len(tail) == limit else 0
+
+
+def read_log_tail(path, limit=200, before=None, block_size=LOG_TAIL_BLOCK_SIZE):
+    """
+    Return (lines, next_before): the last `limit` lines of a log, newest first, without reading
+    the whole file.
+
+    Reading starts at EOF (or at the `before` position returned by a previous call, for paging
+    further back) and continues into rotated files (.1, .2.gz, ...) when the current one runs out.
+    next_before is None when there is nothing older.
+    """
+    files = rotated_log_files(path)
+    index, offset = 0, None
+    if before:
+        try:
+            index_part, _, offset_part = str(before).partition(':')
+            index, offset = int(index_part), int(offset_part) if offset_part else None
+        except ValueError:
+            index, offset = 0, None
+
+    lines = []
+    while index < len(files) and len(lines) < limit:
+        if files[index].endswith('.gz'):
+            found, offset = _read_gzip_lines_before(files[index], offset, limit - len(lines))
+        else:
+            found, offset = _read_plain_lines_before(files[index], offset, limit - len(lines), block_size)
+        lines.extend(found)
+        if offset == 0:
+            index, offset = index + 1, None
+
+    if index >= len(files):
+        return lines, None
+    return lines, f"{index}:{offset}" if offset is not None else str(index)
+
+
+def parse_log_line(line):
+    """Split a '<timestamp> - <logger> - <message>' log line into its parts"""
+    parts = line.split(" - ")
+    if len(parts) >= 3:
+        return {'timestamp': parts[0], 'logger': parts[1], 'message': " - ".join(parts[2:])}
+    return {'timestamp': '', 'logger': '', 'message': line}
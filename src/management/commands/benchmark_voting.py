@@ -0,0 +1,67 @@
+import json
+import os
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+from src.benchmarking import benchmark_rate_limit, run_meeting_benchmark, write_results, compare_results
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks meeting-night voting (vote page, ballots, chat polling, end vote) and saves results as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=60, help='Number of present voting members to seed')
+        parser.add_argument('--bills', type=int, default=3, help='Number of open bills to seed')
+        parser.add_argument('--messages', type=int, default=50, help='Number of existing chat messages to seed')
+        parser.add_argument('--polls', type=int, default=3, help='Chat polls per member')
+        parser.add_argument('--output', help='Path to write JSON results (default: benchmarks/voting-<timestamp>.json)')
+        parser.add_argument('--compare', help='Path to a previous results file to compare against')
+        parser.add_argument('--keep-data', action='store_true', help='Keep the seeded data instead of rolling it back')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['bills'] < 1:
+            raise CommandError('--users and --bills must be at least 1.')
+
+        parameters = {key: options[key] for key in ('users', 'bills', 'messages', 'polls')}
+        self.stdout.write(
+            f"Benchmarking meeting with {parameters['users']} members and {parameters['bills']} open bills..."
+        )
+
+        # Seeded rows are rolled back unless --keep-data is passed, so the command is safe to run
+        # against a development database. The test client always sends Host: testserver.
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            with transaction.atomic():
+                endpoints = run_meeting_benchmark(**parameters)
+                # Overhead of one shared rate limit check, which login, chat and ballots all pay
+                endpoints['rate_limit_hit'] = benchmark_rate_limit()
+                if not options['keep_data']:
+                    transaction.set_rollback(True)
+
+        output = options['output'] or os.path.join(
+            'benchmarks', f"voting-{timezone.now().strftime('%Y%m%d-%H%M%S')}.json"
+        )
+        document = write_results(output, endpoints, parameters)
+
+        self.stdout.write(f"{'endpoint':<26}{'reqs':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}{'req/s':>9}")
+        for name, metrics in endpoints.items():
+            self.stdout.write(
+                f"{name:<26}{metrics['requests']:>6}{metrics['p50_ms']:>10.2f}{metrics['p95_ms']:>10.2f}"
+                f"{metrics['p99_ms']:>10.2f}{metrics['queries_avg']:>9.1f}{metrics['throughput_rps']:>9.1f}"
+            )
+
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read comparison file: {e}")
+
+            self.stdout.write(f"\nCompared with {baseline.get('commit') or options['compare']}:")
+            for name, metrics in compare_results(baseline, document).items():
+                changes = ', '.join(
+                    f"{metric} {old} -> {new} ({change:+}%)" for metric, (old, new, change) in metrics.items()
+                )
+                self.stdout.write(f"  {name}: {changes}")
+
+        self.stdout.write(self.style.SUCCESS(f'Results written to {output}'))
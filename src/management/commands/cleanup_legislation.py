@@ -1,7 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from src.models import Legislation
-import os
+from src.models import Legislation, CommitteeLegislation
+from src.storage import is_blob_name
 
 class Command(BaseCommand):
     help = 'Delete legislation and files older than 30 days'
@@ -11,10 +11,23 @@ class Command(BaseCommand):
         old_legislation = Legislation.objects.filter(created_at__lt=threshold)
 
         for leg in old_legislation:
-            file_path = leg.document.path
-            self.stdout.write(f"Deleting: {leg.title} ({file_path})")
-            if os.path.exists(file_path):
-                os.remove(file_path)
+            self.stdout.write(f"Deleting: {leg.title} ({leg.document.name})")
+            if leg.document:
+                if is_blob_name(leg.document.name):
+                    # Releases one reference; the blob is only unlinked when no document uses it
+                    leg.document.delete(save=False)
+                elif self.is_shared(leg):
+                    self.stdout.write(f"  Keeping file still used by other legislation: {leg.document.name}")
+                else:
+                    leg.document.delete(save=False)
             leg.delete()
 
         self.stdout.write(self.style.SUCCESS("Old legislation cleanup complete."))
+
+    def is_shared(self, leg):
+        # Files uploaded before content-addressed storage have no refcount (e.g. pushed committee legislation)
+        name = leg.document.name
+        return (
+            Legislation.objects.filter(document=name).exclude(pk=leg.pk).exists()
+            or CommitteeLegislation.objects.filter(document=name).exists()
+        )
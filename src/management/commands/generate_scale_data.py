@@ -0,0 +1,339 @@
+"""
+Management command to generate large, deterministic synthetic datasets for scale testing.
+Everything is written with bulk_create, so signals (audit logging) do not fire and
+hundreds of thousands of rows can be produced in a few minutes.
+
+All generated rows hang off users whose user_id starts with "scale_" (and channels/folders
+whose names start with "scale_"), so they can be removed again with --flush.
+
+The same --seed always produces the same users, votes, messages, reports, events and
+documents; timestamps are laid out backwards from --end-date (default: today).
+
+Usage:
+    python manage.py restore_committees_and_roles
+    python manage.py generate_scale_data --users 3000 --years 6 --messages 300000 --seed 7
+    python manage.py generate_scale_data --flush
+"""
+
+import random
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from src.models import (
+    ParliamentUser, Legislation, Vote, Committee, CommitteeDocument, ChapterFolder,
+    ChatChannel, ChatMessage, KaiReport, Event
+)
+
+PREFIX = 'scale_'
+SCALE_PASSWORD = 'ScaleData123!'
+
+FIRST_NAMES = ['James', 'John', 'Robert', 'Michael', 'William', 'David', 'Richard', 'Joseph', 'Thomas', 'Charles',
+               'Daniel', 'Matthew', 'Anthony', 'Mark', 'Andrew', 'Joshua', 'Ryan', 'Nathan', 'Tyler', 'Samuel']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Miller', 'Davis', 'Wilson', 'Anderson', 'Taylor',
+              'Thomas', 'Moore', 'Martin', 'Jackson', 'White', 'Harris', 'Clark', 'Lewis', 'Walker', 'Hall']
+BILL_TOPICS = ['Budget Amendment', 'Bylaws Revision', 'Social Calendar', 'Recruitment Policy', 'Housing Resolution',
+               'Philanthropy Allocation', 'Risk Management Update', 'Election Procedure', 'Dues Adjustment',
+               'Committee Charter']
+EVENT_TYPES = ['Chapter Meeting', 'Philanthropy Event', 'Brotherhood Retreat', 'Study Hall', 'Alumni Dinner',
+               'Recruitment Night', 'Formal', 'Community Service']
+MESSAGE_SNIPPETS = ['Sounds good', 'Can we move this to next week?', 'I will bring the agenda', 'Thanks everyone',
+                    'See the attached minutes', 'Who is handling setup?', 'Motion to approve', 'Seconded',
+                    'Reminder: dues are due Friday', 'Great turnout last night']
+
+
+@contextmanager
+def explicit_timestamps(model, *field_names):
+    """Temporarily disable auto_now/auto_now_add so bulk_create keeps the timestamps we assign"""
+    fields = [model._meta.get_field(name) for name in field_names]
+    previous = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, previous):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = 'Generate deterministic, large-volume synthetic data (users, legislation, votes, chat, Kai reports, events, documents)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (same seed = same data)')
+        parser.add_argument('--end-date', help='Date (YYYY-MM-DD) generated history ends at (default: today)')
+        parser.add_argument('--users', type=int, default=2000, help='Number of members across all years')
+        parser.add_argument('--years', type=int, default=5, help='Years of history to generate')
+        parser.add_argument('--bills-per-year', type=int, default=60, help='Chapter legislation per year')
+        parser.add_argument('--open-bills', type=int, default=3, help='Bills left open for voting')
+        parser.add_argument('--channels', type=int, default=20, help='Chat channels to create')
+        parser.add_argument('--messages', type=int, default=200000, help='Total chat messages')
+        parser.add_argument('--kai-reports', type=int, default=2000, help='Kai reports')
+        parser.add_argument('--events-per-year', type=int, default=150, help='Calendar events per year')
+        parser.add_argument('--folders', type=int, default=12, help='Chapter document folders')
+        parser.add_argument('--documents', type=int, default=3000, help='Committee documents')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk_create batch')
+        parser.add_argument('--flush', action='store_true', help='Delete previously generated scale data and exit')
+
+    def handle(self, *args, **options):
+        if options['flush']:
+            self.flush()
+            return
+
+        if ParliamentUser.objects.filter(user_id__startswith=PREFIX).exists():
+            raise CommandError('Scale data already exists. Run with --flush first to regenerate it.')
+
+        committees = list(Committee.objects.order_by('id'))
+        if not committees:
+            raise CommandError('No committees found. Run restore_committees_and_roles first.')
+
+        if options['end_date']:
+            end_date = parse_date(options['end_date'])
+            if not end_date:
+                raise CommandError('--end-date must be in YYYY-MM-DD format.')
+        else:
+            end_date = timezone.localdate()
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.end = timezone.make_aware(datetime.combine(end_date, time(20, 0)))
+        self.start = self.end - timedelta(days=365 * options['years'])
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"Generating {options['years']} years of scale data (seed {options['seed']}, ending {end_date})..."
+        ))
+
+        with transaction.atomic():
+            users, cohorts = self.generate_users(options['users'], options['years'])
+            self.generate_legislation(users, cohorts, options['years'], options['bills_per_year'], options['open_bills'])
+            self.generate_chat(users, options['channels'], options['messages'])
+            self.generate_kai_reports(users, options['kai_reports'])
+            self.generate_events(users, options['years'], options['events_per_year'])
+            self.generate_documents(users, committees, options['folders'], options['documents'])
+
+        self.stdout.write(self.style.SUCCESS(f'\nDone. Generated users can log in with password "{SCALE_PASSWORD}".'))
+
+    def flush(self):
+        with transaction.atomic():
+            # Legislation, votes, messages, reports, events and documents cascade from their users
+            channels, _ = ChatChannel.objects.filter(name__startswith=PREFIX).delete()
+            folders, _ = ChapterFolder.objects.filter(name__startswith=PREFIX).delete()
+            users, _ = ParliamentUser.objects.filter(user_id__startswith=PREFIX).delete()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {users + channels + folders} generated rows.'))
+
+    def report(self, label, count):
+        self.stdout.write(f'  ✓ {label}: {count}')
+
+    def random_time(self, start, end):
+        span = int((end - start).total_seconds())
+        return start + timedelta(seconds=self.rng.randint(0, max(span, 0)))
+
+    def generate_users(self, count, years):
+        """Users join in yearly cohorts and stay active for four years, then become alumni"""
+        password_hash = make_password(SCALE_PASSWORD)
+        end_year = self.end.year
+        first_cohort = end_year - years - 3
+
+        users = []
+        cohorts = {}
+        for i in range(count):
+            cohort = self.rng.randint(first_cohort, end_year)
+            active = cohort + 3 >= end_year
+            if active and cohort == end_year:
+                member_type = 'Pledge'
+            elif active:
+                member_type = self.rng.choices(['Member', 'Chair', 'Officer'], weights=[85, 10, 5])[0]
+            else:
+                member_type = 'Member'
+
+            user_id = f'{PREFIX}{i:06d}'
+            users.append(ParliamentUser(
+                user_id=user_id,
+                name=f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}',
+                username=user_id,
+                member_type=member_type,
+                member_status='Active' if active else 'Alumni',
+                password=password_hash,
+            ))
+            cohorts[user_id] = cohort
+
+        ParliamentUser.objects.bulk_create(users, batch_size=self.batch_size)
+        self.report('Users', len(users))
+        return users, cohorts
+
+    def generate_legislation(self, users, cohorts, years, bills_per_year, open_bills):
+        posters = [u for u in users if u.member_type in ('Chair', 'Officer')] or users
+        total = years * bills_per_year
+        step = (self.end - self.start) / max(total, 1)
+
+        bills = []
+        for i in range(total):
+            available_at = self.start + step * i
+            vote_mode = self.rng.choices(['percentage', 'piecewise', 'plurality'], weights=[80, 10, 10])[0]
+            is_open = i >= total - open_bills
+            bills.append(Legislation(
+                title=f'{self.rng.choice(BILL_TOPICS)} {available_at.year}-{i:04d}',
+                description='Synthetic legislation generated for scale testing.',
+                document=f'legislation_docs/{PREFIX}{i:05d}.pdf' if vote_mode != 'plurality' else None,
+                posted_by=self.rng.choice(posters),
+                available_at=available_at,
+                created_at=available_at - timedelta(days=self.rng.randint(1, 7)),
+                voting_closed=not is_open,
+                voting_ended_at=None if is_open else available_at + timedelta(hours=1),
+                anonymous_vote=self.rng.random() < 0.2,
+                vote_mode=vote_mode,
+                required_percentage=self.rng.choice(['51', '51', '60', '67', '75']),
+                required_number=self.rng.randint(20, 60) if vote_mode == 'piecewise' else None,
+                plurality_options=['Option A', 'Option B', 'Option C', 'Option D'] if vote_mode == 'plurality' else None,
+            ))
+
+        # Votes are generated before insert so pass/fail can be frozen without a recount per bill
+        votes_by_bill = []
+        for bill in bills:
+            year = bill.available_at.year
+            eligible = [u for u in users if cohorts[u.user_id] <= year <= cohorts[u.user_id] + 3
+                        and u.member_type != 'Pledge']
+            turnout = self.rng.randint(len(eligible) * 6 // 10, len(eligible) * 9 // 10) if eligible else 0
+            voters = self.rng.sample(eligible, turnout)
+
+            if bill.vote_mode == 'plurality':
+                weights = [self.rng.random() for _ in bill.plurality_options]
+                choices = [self.rng.choices(bill.plurality_options, weights=weights)[0] for _ in voters]
+            else:
+                yes_weight = self.rng.uniform(0.3, 0.9)
+                choices = [self.rng.choices(['yes', 'no', 'abstain'], weights=[yes_weight, 1 - yes_weight, 0.08])[0]
+                           for _ in voters]
+            votes_by_bill.append(list(zip(voters, choices)))
+
+            if bill.voting_closed:
+                bill.passed = bill.decide_passed(Counter(choices))
+                bill.status = 'passed' if bill.passed else 'removed'
+
+        with explicit_timestamps(Legislation, 'created_at'):
+            Legislation.objects.bulk_create(bills, batch_size=self.batch_size)
+        self.report('Legislation', len(bills))
+
+        votes = [
+            Vote(user=voter, legislation=bill, vote_choice=choice)
+            for bill, ballots in zip(bills, votes_by_bill)
+            for voter, choice in ballots
+        ]
+        Vote.objects.bulk_create(votes, batch_size=self.batch_size)
+        self.report('Votes', len(votes))
+
+    def generate_chat(self, users, channel_count, message_count):
+        active = [u for u in users if u.member_status == 'Active'] or users
+        channels = ChatChannel.objects.bulk_create([
+            ChatChannel(
+                name=f'{PREFIX}channel_{i:03d}',
+                description='Synthetic channel generated for scale testing.',
+                channel_type='custom',
+                access_type='open',
+                created_by=self.rng.choice(active),
+            )
+            for i in range(channel_count)
+        ])
+        self.report('Chat channels', len(channels))
+        if not channels:
+            return
+
+        # Messages are built and inserted one batch at a time to keep memory flat
+        created = 0
+        with explicit_timestamps(ChatMessage, 'created_at'):
+            while created < message_count:
+                size = min(self.batch_size, message_count - created)
+                ChatMessage.objects.bulk_create([
+                    ChatMessage(
+                        channel=self.rng.choice(channels),
+                        sender=self.rng.choice(active),
+                        message=self.rng.choice(MESSAGE_SNIPPETS),
+                        created_at=self.random_time(self.start, self.end),
+                        is_deleted=self.rng.random() < 0.01,
+                    )
+                    for _ in range(size)
+                ])
+                created += size
+        self.report('Chat messages', created)
+
+    def generate_kai_reports(self, users, count):
+        categories = [code for code, _ in KaiReport.CATEGORY_CHOICES]
+        reports = []
+        for i in range(count):
+            submitted_at = self.random_time(self.start, self.end)
+            status = self.rng.choices(['pending', 'reviewed', 'archived'], weights=[15, 50, 35])[0]
+            reviewer = self.rng.choice(users) if status != 'pending' else None
+            reports.append(KaiReport(
+                title=f'Report {i:05d}',
+                category=self.rng.choice(categories),
+                description='Synthetic Kai report generated for scale testing.',
+                attachment=f'kai_reports/{PREFIX}{i:05d}.pdf' if self.rng.random() < 0.2 else None,
+                submitted_by=self.rng.choice(users),
+                submitted_at=submitted_at,
+                targeted_to=self.rng.choice(users) if self.rng.random() < 0.5 else None,
+                status=status,
+                reviewed_by=reviewer,
+                reviewed_at=submitted_at + timedelta(days=self.rng.randint(1, 14)) if reviewer else None,
+                deliberation_outcome=self.rng.choice(['pending', 'thrown_out', 'heard']),
+            ))
+
+        with explicit_timestamps(KaiReport, 'submitted_at'):
+            KaiReport.objects.bulk_create(reports, batch_size=self.batch_size)
+        self.report('Kai reports', len(reports))
+
+    def generate_events(self, users, years, per_year):
+        creators = [u for u in users if u.member_type == 'Officer'] or users
+        archive_cutoff = self.end - timedelta(days=365)
+        # Events run from the start of history to a few months past the end date
+        event_end = self.end + timedelta(days=120)
+        events = []
+        for i in range(years * per_year + per_year // 3):
+            date_time = self.random_time(self.start, event_end)
+            events.append(Event(
+                title=self.rng.choice(EVENT_TYPES),
+                description='Synthetic event generated for scale testing.',
+                date_time=date_time,
+                location=self.rng.choice(['Chapter House', 'Student Center', 'Library', 'Zoom']),
+                created_by=self.rng.choice(creators),
+                created_at=date_time - timedelta(days=self.rng.randint(1, 30)),
+                archived=date_time < archive_cutoff,
+                visible_to=None if self.rng.random() < 0.8 else ['Officer', 'Chair'],
+            ))
+
+        with explicit_timestamps(Event, 'created_at'):
+            Event.objects.bulk_create(events, batch_size=self.batch_size)
+        self.report('Events', len(events))
+
+    def generate_documents(self, users, committees, folder_count, document_count):
+        folder_owner = next((u for u in users if u.member_type == 'Officer'), users[0])
+        folders = ChapterFolder.objects.bulk_create([
+            ChapterFolder(name=f'{PREFIX}folder_{i:03d}', created_by=folder_owner)
+            for i in range(folder_count)
+        ])
+        self.report('Chapter folders', len(folders))
+
+        doc_types = [code for code, _ in CommitteeDocument.DOCUMENT_TYPES]
+        documents = []
+        for i in range(document_count):
+            uploaded_at = self.random_time(self.start, self.end)
+            doc_type = self.rng.choice(doc_types)
+            published = self.rng.random() < 0.4
+            documents.append(CommitteeDocument(
+                committee=self.rng.choice(committees),
+                title=f'{doc_type.title()} {uploaded_at.date()} #{i:05d}',
+                document=f'committee_documents/{PREFIX}{i:05d}.pdf',
+                uploaded_by=self.rng.choice(users),
+                uploaded_at=uploaded_at,
+                document_type=doc_type,
+                published_to_chapter=published,
+                chapter_folder=self.rng.choice(folders) if published and folders and self.rng.random() < 0.6 else None,
+                meeting_date=uploaded_at.date() if doc_type in ('minutes', 'agenda') else None,
+            ))
+
+        with explicit_timestamps(CommitteeDocument, 'uploaded_at'):
+            CommitteeDocument.objects.bulk_create(documents, batch_size=self.batch_size)
+        self.report('Committee documents', len(documents))
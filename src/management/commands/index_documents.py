@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from src.document_search import INDEXED_DOCUMENTS, index_documents
+
+
+class Command(BaseCommand):
+    help = 'Extract text from uploaded documents into the full-text search index (only changed files are re-read)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind',
+            action='append',
+            choices=list(INDEXED_DOCUMENTS),
+            help='Only index this kind of document (can be repeated)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-extract every file even if its hash has not changed',
+        )
+
+    def handle(self, *args, **options):
+        counts = {'indexed': 0, 'unchanged': 0, 'missing': 0}
+
+        for kind, obj, status in index_documents(kinds=options['kind'], force=options['force']):
+            counts[status] += 1
+            if status == 'indexed':
+                self.stdout.write(f"  Indexed {kind} {obj.pk}: {obj.title}")
+            elif status == 'missing':
+                self.stdout.write(self.style.WARNING(f"  File missing for {kind} {obj.pk}: {obj.title}"))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {counts['indexed']} documents, {counts['unchanged']} unchanged, {counts['missing']} missing files"
+        ))
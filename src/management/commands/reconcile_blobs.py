@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from src.blob_references import count_blob_references
+from src.models import DocumentBlob
+from src.storage import DualLocationStorage
+
+# Blobs this new may belong to an upload whose row hasn't been saved yet
+RECONCILE_GRACE = timedelta(hours=1)
+
+
+class Command(BaseCommand):
+    help = 'Recompute DocumentBlob reference counts from the document rows and remove unreferenced blobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the counts that would change without writing anything',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        storage = DualLocationStorage()
+        fixed = removed = 0
+
+        with transaction.atomic():
+            # Lock the blobs first: a concurrent upload's increment then waits for the new counts
+            blobs = list(
+                DocumentBlob.objects.select_for_update()
+                .filter(created_at__lt=timezone.now() - RECONCILE_GRACE).order_by('pk')
+            )
+            references = count_blob_references()
+            for blob in blobs:
+                count = references.get(blob.name, 0)
+                if count == blob.ref_count:
+                    continue
+                if count == 0:
+                    self.stdout.write(f"  Unreferenced blob {blob.name} (had {blob.ref_count} refs)")
+                    removed += 1
+                    if not dry_run:
+                        blob.delete()
+                        # Unlink only once the row deletion is committed, as DualLocationStorage does
+                        transaction.on_commit(lambda name=blob.name: storage.delete(name))
+                else:
+                    self.stdout.write(f"  {blob.name}: {blob.ref_count} -> {count} refs")
+                    fixed += 1
+                    if not dry_run:
+                        DocumentBlob.objects.filter(pk=blob.pk).update(ref_count=count)
+
+        summary = f"{fixed} reference counts corrected, {removed} unreferenced blobs removed"
+        self.stdout.write(self.style.SUCCESS(f"Dry run: {summary}" if dry_run else summary))
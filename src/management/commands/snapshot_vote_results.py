@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from src.models import Legislation
+
+
+class Command(BaseCommand):
+    help = 'Stores result snapshots for closed legislation that was closed (or imported) before snapshots existed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Show what would be snapshotted without saving')
+
+    def handle(self, *args, **options):
+        missing = Legislation.objects.filter(voting_closed=True, result_snapshot__isnull=True).order_by('id')
+        count = 0
+
+        for leg in missing.iterator():
+            # Attendance is looked up around when voting ended, falling back to when it opened
+            snapshot = leg.build_result_snapshot(closed_at=leg.voting_ended_at or leg.available_at)
+            if snapshot['passed'] != leg.passed:
+                self.stdout.write(self.style.WARNING(
+                    f"[{leg.id}] {leg.title}: stored passed={leg.passed}, ballots say {snapshot['passed']} (keeping stored value)"
+                ))
+                # The stored outcome is what members were told; keep it authoritative
+                snapshot['passed'] = leg.passed
+
+            if not options['dry_run']:
+                Legislation.objects.filter(pk=leg.pk).update(result_snapshot=snapshot)
+            count += 1
+
+        action = 'Would snapshot' if options['dry_run'] else 'Snapshotted'
+        self.stdout.write(self.style.SUCCESS(f'{action} {count} closed legislation records.'))
@@ -0,0 +1,143 @@
+"""
+Snapshot behind the projector/kiosk meeting display.
+
+The display shows the chapter bills open for voting with their tallies, the quorum (members
+marked present in the voting window) and the upcoming agenda. All of it is built into one
+snapshot, rendered once to HTML and cached in the 'meeting_display' namespace. Every screen
+showing the display reads that cached snapshot through one stream
+(src/view/officer/meeting_display.py), so extra screens or constant refreshing add cache reads,
+not queries.
+
+Ballots, bills, attendance, events and agenda documents bump the namespace version on commit;
+the next stream poll rebuilds the snapshot once, so a burst of ballots between polls costs a
+single rebuild. The snapshot is also rebuilt every MEETING_DISPLAY_REFRESH seconds, for changes
+that come from the clock (a bill opening at available_at, attendance leaving the window).
+"""
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from src.caching import CacheNamespace
+from src.models import Attendance, CommitteeDocument, Event, Legislation, ParliamentUser, Vote
+
+DEFAULT_MEETING_DISPLAY_REFRESH = 60
+
+# Same window vote_view uses to decide whether a member is present
+ATTENDANCE_WINDOW = timedelta(hours=3)
+
+AGENDA_DAYS = 7
+AGENDA_LIMIT = 5
+
+MEETING_DISPLAY_MODELS = (Legislation, Vote, Attendance, Event, CommitteeDocument)
+
+MEETING_DISPLAY = CacheNamespace('meeting_display')
+
+
+def meeting_display_refresh():
+    return getattr(settings, 'MEETING_DISPLAY_REFRESH', DEFAULT_MEETING_DISPLAY_REFRESH)
+
+
+def _open_bills(now):
+    bills = list(
+        Legislation.objects.filter(voting_closed=False, available_at__lte=now)
+        .order_by('available_at', 'id')
+        .only('id', 'title', 'vote_mode', 'plurality_options', 'anonymous_vote', 'required_percentage',
+              'required_number', 'available_at')
+    )
+    counts = defaultdict(dict)
+    for legislation_id, choice, count in (
+        Vote.objects.filter(legislation_id__in=[bill.id for bill in bills])
+        .values_list('legislation_id', 'vote_choice').annotate(count=Count('id'))
+    ):
+        counts[legislation_id][choice] = count
+
+    rows = []
+    for bill in bills:
+        options = list(bill.plurality_options or []) if bill.vote_mode == 'plurality' else ['yes', 'no', 'abstain']
+        tally = {**{option: 0 for option in options}, **counts[bill.id]}
+        rows.append({
+            'id': bill.id,
+            'title': bill.title,
+            'vote_mode': bill.vote_mode,
+            'anonymous': bill.anonymous_vote,
+            'required_percentage': bill.required_percentage if bill.vote_mode == 'percentage' else None,
+            'required_number': bill.required_yes_votes,
+            'tally': list(tally.items()),
+            'total': sum(tally.values()),
+        })
+    return rows
+
+
+def _quorum(now):
+    present = (
+        Attendance.objects.filter(present=True, created_at__gte=now - ATTENDANCE_WINDOW)
+        .values('user').distinct().count()
+    )
+    eligible = ParliamentUser.active.filter(member_type__in=['Member', 'Chair', 'Officer']).count()
+    # A majority of voting members unless the chapter sets MEETING_QUORUM
+    required = getattr(settings, 'MEETING_QUORUM', None) or eligible // 2 + 1
+    return {'present': present, 'eligible': eligible, 'required': required, 'met': present >= required}
+
+
+def _agenda(now):
+    events = list(
+        Event.objects.filter(
+            is_active=True, archived=False, date_time__gte=now, date_time__lte=now + timedelta(days=AGENDA_DAYS)
+        )
+        # Shown to the whole room, so only events every member may see
+        .filter(Q(visible_to__isnull=True) | Q(visible_to=[]))
+        .order_by('date_time')
+        .values('title', 'date_time', 'location')[:AGENDA_LIMIT]
+    )
+    documents = list(
+        CommitteeDocument.objects.filter(
+            document_type='agenda', published_to_chapter=True, meeting_date__gte=now.date()
+        )
+        .order_by('meeting_date', 'id')
+        .values('id', 'title', 'meeting_date', 'committee__name')[:AGENDA_LIMIT]
+    )
+    return {'events': events, 'documents': documents}
+
+
+def build_meeting_snapshot():
+    """Everything the meeting display shows, from a handful of queries"""
+    now = timezone.now()
+    return {
+        'generated_at': now,
+        'bills': _open_bills(now),
+        'quorum': _quorum(now),
+        'agenda': _agenda(now),
+    }
+
+
+def _render_snapshot():
+    snapshot = build_meeting_snapshot()
+    return {'html': render_to_string('officer/partials/meeting_display_body.html', snapshot)}
+
+
+def snapshot_key(version=None):
+    """Identifies the current snapshot; changes with the namespace version and the refresh interval"""
+    version = MEETING_DISPLAY.version() if version is None else version
+    return f'{version}-{int(time.time() // meeting_display_refresh())}'
+
+
+def current_snapshot():
+    """(key, {'html': ...}) for the current snapshot, built at most once per key"""
+    key = snapshot_key()
+    return key, MEETING_DISPLAY.get_or_set(('snapshot', key), _render_snapshot, timeout=meeting_display_refresh() * 2)
+
+
+def _invalidate_meeting_display(sender, **kwargs):
+    transaction.on_commit(MEETING_DISPLAY.invalidate)
+
+
+for _model in MEETING_DISPLAY_MODELS:
+    post_save.connect(_invalidate_meeting_display, sender=_model, dispatch_uid=f'meeting_display_save_{_model.__name__}')
+    post_delete.connect(_invalidate_meeting_display, sender=_model, dispatch_uid=f'meeting_display_delete_{_model.__name__}')
@@ -1,123 +1,190 @@
 """
 Custom middleware for Parliament application
 """
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
 from django.shortcuts import redirect
+from django.utils.functional import SimpleLazyObject
 from django.urls import reverse
-from django.core.cache import cache
 from django.http import HttpResponseForbidden
 from django.contrib import messages
 import logging
 
+from src.rate_limit import get_rate_limit
+from src.user_cache import get_cached_user
+
 logger = logging.getLogger('admin_actions')
 
 
-class ForcePasswordChangeMiddleware:
+# Requests under these prefixes skip the middleware below: static and media files, health checks,
+# and the JSON APIs that chat and calendar pages poll every few seconds (their views do their own
+# auth and can't follow an HTML redirect anyway)
+FAST_PATH_PREFIXES = ('/static/', '/media/', '/health/', '/api/')
+
+
+class PathDispatchMiddleware:
     """
-    Middleware to force users to change password if force_password_change flag is set.
-    Redirects authenticated users to the password change page if needed.
+    Base for middleware that only acts on some requests.
+
+    Paths are compiled once at startup: target_paths (exact paths or URL names) become a frozenset
+    and target_prefixes/skip_prefixes tuples for str.startswith. Requests that don't match go
+    straight to get_response, and handle() is only called for the ones that do. With neither
+    target_paths nor target_prefixes set, every path not skipped is a target.
     """
+    target_paths = ()
+    target_prefixes = ()
+    skip_prefixes = FAST_PATH_PREFIXES
+    methods = None
 
     def __init__(self, get_response):
         self.get_response = get_response
-        # Paths that should be accessible even when password change is forced
-        self.exempt_paths = [
-            reverse('forced_password_change'),
-            reverse('logout'),
-            '/admin/',  # Allow admin access
-        ]
+        self.target_path_set = frozenset(self.resolve_path(path) for path in self.target_paths)
+        self.target_prefix_tuple = tuple(self.target_prefixes)
+        self.skip_prefix_tuple = tuple(self.skip_prefixes)
+        self.method_set = frozenset(self.methods) if self.methods else None
+
+    @staticmethod
+    def resolve_path(path):
+        """Paths start with '/'; anything else is a URL name"""
+        return path if path.startswith('/') else reverse(path)
+
+    def applies_to(self, request):
+        path = request.path
+        if self.method_set is not None and request.method not in self.method_set:
+            return False
+        if self.skip_prefix_tuple and path.startswith(self.skip_prefix_tuple):
+            return False
+        if self.target_path_set or self.target_prefix_tuple:
+            return path in self.target_path_set or (
+                bool(self.target_prefix_tuple) and path.startswith(self.target_prefix_tuple)
+            )
+        return True
 
     def __call__(self, request):
-        # Check if user is authenticated and needs to change password
-        if request.user.is_authenticated and hasattr(request.user, 'force_password_change'):
-            if request.user.force_password_change:
-                # Allow access to certain paths
-                if not any(request.path.startswith(path) for path in self.exempt_paths):
-                    # Don't redirect if already on the password change page
-                    if request.path != reverse('forced_password_change'):
-                        return redirect('forced_password_change')
+        if self.applies_to(request):
+            return self.handle(request)
+        return self.get_response(request)
 
-        response = self.get_response(request)
-        return response
+    def handle(self, request):
+        return self.get_response(request)
 
 
-class PasswordResetRateLimitMiddleware:
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
     """
-    Middleware to rate limit password reset requests and prevent brute force attacks.
-    Tracks attempts by IP address and implements progressive delays.
+    Drop-in replacement for django.contrib.auth's AuthenticationMiddleware that resolves
+    request.user through the per-worker user cache (see src/user_cache.py), so polling
+    endpoints don't query the user table on every hit.
     """
 
-    def __init__(self, get_response):
-        self.get_response = get_response
-        # Rate limit settings
-        self.max_attempts_per_ip = 5  # Max attempts per IP per window
-        self.max_attempts_per_email = 3  # Max attempts per email per window
-        self.window_minutes = 15  # Time window in minutes
-        self.lockout_minutes = 60  # Lockout duration after exceeding limits
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: self.get_user(request))
 
-    def __call__(self, request):
-        # Only check password reset endpoints
-        if request.path == '/password-reset/' and request.method == 'POST':
-            ip_address = self.get_client_ip(request)
+    @staticmethod
+    def get_user(request):
+        if not hasattr(request, '_cached_user'):
+            request._cached_user = get_cached_user(request)
+        return request._cached_user
 
-            # Check IP-based rate limit
-            ip_key = f'password_reset_ip_{ip_address}'
-            ip_attempts = cache.get(ip_key, 0)
 
-            # Check if IP is locked out
-            lockout_key = f'password_reset_lockout_{ip_address}'
-            if cache.get(lockout_key):
-                logger.warning(
-                    f'Password reset blocked: IP {ip_address} is locked out due to too many attempts'
-                )
-                return HttpResponseForbidden(
-                    '<html><body>'
-                    '<h1>Too Many Requests</h1>'
-                    '<p>Too many password reset attempts. Please try again later.</p>'
-                    '<p>If you need immediate assistance, please contact an administrator.</p>'
-                    '</body></html>'
-                )
+class ForcePasswordChangeMiddleware(PathDispatchMiddleware):
+    """
+    Middleware to force users to change password if force_password_change flag is set.
+    Redirects authenticated users to the password change page if needed.
+    """
+    # Paths that should be accessible even when password change is forced
+    exempt_paths = (
+        'forced_password_change',
+        'logout',
+        '/admin/',  # Allow admin access
+    )
 
-            # Check if IP has exceeded rate limit
-            if ip_attempts >= self.max_attempts_per_ip:
-                logger.warning(
-                    f'Password reset rate limit exceeded for IP {ip_address}. '
-                    f'Attempts: {ip_attempts}'
-                )
-                # Lock out the IP
-                cache.set(lockout_key, True, self.lockout_minutes * 60)
-                return HttpResponseForbidden(
-                    '<html><body>'
-                    '<h1>Too Many Requests</h1>'
-                    '<p>Too many password reset attempts. Please try again in 1 hour.</p>'
-                    '</body></html>'
-                )
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.redirect_url = reverse('forced_password_change')
+        self.skip_prefix_tuple += tuple(self.resolve_path(path) for path in self.exempt_paths)
 
-            # Increment IP attempt counter
-            cache.set(ip_key, ip_attempts + 1, self.window_minutes * 60)
+    def applies_to(self, request):
+        if not super().applies_to(request):
+            return False
+        # Without a session cookie the user is anonymous; don't load the session to find that out
+        return settings.SESSION_COOKIE_NAME in request.COOKIES
 
-            # Check email-based rate limit if email is provided
-            email = request.POST.get('email', '').strip().lower()
-            if email:
-                email_key = f'password_reset_email_{email}'
-                email_attempts = cache.get(email_key, 0)
+    def handle(self, request):
+        # Check if user is authenticated and needs to change password
+        user = request.user
+        if user.is_authenticated and getattr(user, 'force_password_change', False):
+            return redirect(self.redirect_url)
+        return self.get_response(request)
 
-                if email_attempts >= self.max_attempts_per_email:
-                    logger.warning(
-                        f'Password reset rate limit exceeded for email {email} from IP {ip_address}'
-                    )
-                    # Don't reveal that the email exists, just slow them down
-                    cache.set(email_key, email_attempts + 1, self.window_minutes * 60)
 
-                # Increment email attempt counter
-                cache.set(email_key, email_attempts + 1, self.window_minutes * 60)
+class PasswordResetRateLimitMiddleware(PathDispatchMiddleware):
+    """
+    Middleware to rate limit password reset requests and prevent brute force attacks.
+    Tracks attempts by IP address and email with the shared 'password_reset_ip' and
+    'password_reset_email' limits (see src/rate_limit.py); an IP that exceeds its limit is locked out.
+    """
+
+    # Only check password reset endpoints
+    target_paths = ('/password-reset/',)
+    methods = ('POST',)
 
-                # Log the attempt
-                logger.info(
-                    f'Password reset requested for email {email} from IP {ip_address}. '
-                    f'IP attempts: {ip_attempts + 1}/{self.max_attempts_per_ip}, '
-                    f'Email attempts: {email_attempts + 1}/{self.max_attempts_per_email}'
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.ip_limit = get_rate_limit('password_reset_ip')
+        self.email_limit = get_rate_limit('password_reset_email')
+
+    def handle(self, request):
+        ip_address = self.get_client_ip(request)
+
+        # Check if IP is locked out
+        if self.ip_limit.is_locked_out(ip_address):
+            logger.warning(
+                f'Password reset blocked: IP {ip_address} is locked out due to too many attempts'
+            )
+            return HttpResponseForbidden(
+                '<html><body>'
+                '<h1>Too Many Requests</h1>'
+                '<p>Too many password reset attempts. Please try again later.</p>'
+                '<p>If you need immediate assistance, please contact an administrator.</p>'
+                '</body></html>'
+            )
+
+        # Count the attempt atomically, then check the IP-based limit
+        ip_result = self.ip_limit.hit(ip_address)
+        if not ip_result.allowed:
+            logger.warning(
+                f'Password reset rate limit exceeded for IP {ip_address}. '
+                f'Attempts: {ip_result.count}'
+            )
+            # Lock out the IP
+            self.ip_limit.lock_out(ip_address)
+            return HttpResponseForbidden(
+                '<html><body>'
+                '<h1>Too Many Requests</h1>'
+                '<p>Too many password reset attempts. Please try again in 1 hour.</p>'
+                '</body></html>',
+                headers={'Retry-After': str(self.ip_limit.lockout or ip_result.retry_after)},
+            )
+
+        # Check email-based rate limit if email is provided
+        email = request.POST.get('email', '').strip().lower()
+        if email:
+            email_result = self.email_limit.hit(email)
+
+            if not email_result.allowed:
+                # Don't reveal that the email exists, just record it
+                logger.warning(
+                    f'Password reset rate limit exceeded for email {email} from IP {ip_address}'
                 )
 
+            # Log the attempt
+            logger.info(
+                f'Password reset requested for email {email} from IP {ip_address}. '
+                f'IP attempts: {ip_result.count}/{ip_result.limit}, '
+                f'Email attempts: {email_result.count}/{email_result.limit}'
+            )
+
         response = self.get_response(request)
         return response
 
@@ -131,129 +198,109 @@ class PasswordResetRateLimitMiddleware:
         return ip
 
 
-class LoginRateLimitMiddleware:
+class LoginRateLimitMiddleware(PathDispatchMiddleware):
     """
     Middleware to rate limit login attempts and prevent brute force attacks.
-    Tracks both IP-based and username-based attempts with progressive lockouts.
+    Counts every attempt per IP and per username with the shared 'login_ip' and
+    'login_username' limits (see src/rate_limit.py) before authenticating, locking out either
+    once it is exceeded; a successful login resets both, so only failed attempts add up.
     """
 
+    # Only check login endpoints
+    target_paths = ('/login/', '/accounts/login/')
+    methods = ('POST',)
+
     def __init__(self, get_response):
-        self.get_response = get_response
-        # Rate limit settings
-        self.max_attempts_per_ip = 10  # Max login attempts per IP per window
-        self.max_attempts_per_username = 5  # Max attempts per username per window
-        self.window_minutes = 15  # Time window in minutes
-        self.lockout_minutes = 30  # Lockout duration after exceeding limits
+        super().__init__(get_response)
+        self.ip_limit = get_rate_limit('login_ip')
+        self.username_limit = get_rate_limit('login_username')
+
+    def handle(self, request):
+        ip_address = self.get_client_ip(request)
+        username = request.POST.get('username', '').strip().lower()
+        lockout_minutes = (self.ip_limit.lockout or 0) // 60
+
+        # Check if IP is locked out
+        if self.ip_limit.is_locked_out(ip_address):
+            logger.warning(
+                f'Login blocked: IP {ip_address} is locked out due to too many attempts'
+            )
+            return HttpResponseForbidden(
+                '<html><body style="font-family: sans-serif; max-width: 600px; margin: 100px auto; padding: 20px;">'
+                '<h1 style="color: #dc2626;">Account Temporarily Locked</h1>'
+                '<p>Too many failed login attempts from your IP address.</p>'
+                f'<p>Please try again in {lockout_minutes} minutes, or contact an administrator if you need immediate access.</p>'
+                '<p><a href="/login/" style="color: #2563eb;">← Back to Login</a></p>'
+                '</body></html>'
+            )
+
+        # Count the attempt before authenticating, so parallel guesses can't all slip under the limit;
+        # a successful login clears the counters again below
+        ip_result = self.ip_limit.hit(ip_address)
+        if not ip_result.allowed:
+            logger.warning(
+                f'Login rate limit exceeded for IP {ip_address}. Attempts: {ip_result.count}'
+            )
+            # Lock out the IP
+            self.ip_limit.lock_out(ip_address)
+            return HttpResponseForbidden(
+                '<html><body style="font-family: sans-serif; max-width: 600px; margin: 100px auto; padding: 20px;">'
+                '<h1 style="color: #dc2626;">Too Many Login Attempts</h1>'
+                '<p>Your IP address has been temporarily blocked due to excessive failed login attempts.</p>'
+                f'<p>Please try again in {lockout_minutes} minutes.</p>'
+                '<p><a href="/login/" style="color: #2563eb;">← Back to Login</a></p>'
+                '</body></html>',
+                headers={'Retry-After': str(self.ip_limit.lockout or ip_result.retry_after)},
+            )
+
+        # Check username-based rate limit if username is provided
+        username_result = None
+        if username:
+            username_locked = self.username_limit.is_locked_out(username)
+            if not username_locked:
+                username_result = self.username_limit.hit(username)
+                if not username_result.allowed:
+                    logger.warning(
+                        f'Login rate limit exceeded for username {username} from IP {ip_address}.'
+                    )
+                    # Lock out the username
+                    self.username_limit.lock_out(username)
+                    username_locked = True
 
-    def __call__(self, request):
-        # Only check login endpoints
-        if (request.path == '/login/' or request.path == '/accounts/login/') and request.method == 'POST':
-            ip_address = self.get_client_ip(request)
-            username = request.POST.get('username', '').strip().lower()
-
-            # Check IP-based rate limit
-            ip_key = f'login_attempts_ip_{ip_address}'
-            ip_attempts = cache.get(ip_key, 0)
-
-            # Check if IP is locked out
-            ip_lockout_key = f'login_lockout_ip_{ip_address}'
-            if cache.get(ip_lockout_key):
+            if username_locked:
                 logger.warning(
-                    f'Login blocked: IP {ip_address} is locked out due to too many attempts'
+                    f'Login blocked: Username {username} is locked out. Attempt from IP {ip_address}'
                 )
+                # Don't reveal if username exists, use generic message
                 return HttpResponseForbidden(
                     '<html><body style="font-family: sans-serif; max-width: 600px; margin: 100px auto; padding: 20px;">'
                     '<h1 style="color: #dc2626;">Account Temporarily Locked</h1>'
-                    '<p>Too many failed login attempts from your IP address.</p>'
-                    '<p>Please try again in 30 minutes, or contact an administrator if you need immediate access.</p>'
+                    '<p>This account has been temporarily locked due to multiple failed login attempts.</p>'
+                    f'<p>Please try again in {(self.username_limit.lockout or 0) // 60} minutes, or use the "Forgot Password" link to reset your password.</p>'
                     '<p><a href="/login/" style="color: #2563eb;">← Back to Login</a></p>'
+                    '<p><a href="/password-reset/" style="color: #2563eb;">Reset Password</a></p>'
                     '</body></html>'
                 )
 
-            # Check if IP has exceeded rate limit
-            if ip_attempts >= self.max_attempts_per_ip:
-                logger.warning(
-                    f'Login rate limit exceeded for IP {ip_address}. Attempts: {ip_attempts}'
-                )
-                # Lock out the IP
-                cache.set(ip_lockout_key, True, self.lockout_minutes * 60)
-                return HttpResponseForbidden(
-                    '<html><body style="font-family: sans-serif; max-width: 600px; margin: 100px auto; padding: 20px;">'
-                    '<h1 style="color: #dc2626;">Too Many Login Attempts</h1>'
-                    '<p>Your IP address has been temporarily blocked due to excessive failed login attempts.</p>'
-                    '<p>Please try again in 30 minutes.</p>'
-                    '<p><a href="/login/" style="color: #2563eb;">← Back to Login</a></p>'
-                    '</body></html>'
-                )
-
-            # Check username-based rate limit if username is provided
-            if username:
-                username_key = f'login_attempts_user_{username}'
-                username_attempts = cache.get(username_key, 0)
-                username_lockout_key = f'login_lockout_user_{username}'
-
-                # Check if username is locked out
-                if cache.get(username_lockout_key):
-                    logger.warning(
-                        f'Login blocked: Username {username} is locked out. Attempt from IP {ip_address}'
-                    )
-                    # Don't reveal if username exists, use generic message
-                    return HttpResponseForbidden(
-                        '<html><body style="font-family: sans-serif; max-width: 600px; margin: 100px auto; padding: 20px;">'
-                        '<h1 style="color: #dc2626;">Account Temporarily Locked</h1>'
-                        '<p>This account has been temporarily locked due to multiple failed login attempts.</p>'
-                        '<p>Please try again in 30 minutes, or use the "Forgot Password" link to reset your password.</p>'
-                        '<p><a href="/login/" style="color: #2563eb;">← Back to Login</a></p>'
-                        '<p><a href="/password-reset/" style="color: #2563eb;">Reset Password</a></p>'
-                        '</body></html>'
-                    )
-
-                if username_attempts >= self.max_attempts_per_username:
-                    logger.warning(
-                        f'Login rate limit exceeded for username {username} from IP {ip_address}. '
-                        f'Attempts: {username_attempts}'
-                    )
-                    # Lock out the username
-                    cache.set(username_lockout_key, True, self.lockout_minutes * 60)
-
         response = self.get_response(request)
 
-        # After response, track failed login attempts
-        if (request.path == '/login/' or request.path == '/accounts/login/') and request.method == 'POST':
-            # Check if login failed by looking for error messages
-            storage = messages.get_messages(request)
-            has_error = any('Invalid' in str(msg) or 'disabled' in str(msg) for msg in storage)
-
-            if has_error:
-                ip_address = self.get_client_ip(request)
-                username = request.POST.get('username', '').strip().lower()
-
-                # Increment IP attempt counter
-                ip_key = f'login_attempts_ip_{ip_address}'
-                ip_attempts = cache.get(ip_key, 0)
-                cache.set(ip_key, ip_attempts + 1, self.window_minutes * 60)
+        # Check if login failed by looking for error messages; login_view only flashes a
+        # success message after login(), so a form error can't clear the counters
+        storage = list(messages.get_messages(request))
+        has_error = any('Invalid' in str(msg) or 'disabled' in str(msg) for msg in storage)
+        logged_in = any(msg.level == messages.SUCCESS for msg in storage)
 
-                # Increment username attempt counter
-                if username:
-                    username_key = f'login_attempts_user_{username}'
-                    username_attempts = cache.get(username_key, 0)
-                    cache.set(username_key, username_attempts + 1, self.window_minutes * 60)
-
-                    logger.warning(
-                        f'Failed login attempt for username "{username}" from IP {ip_address}. '
-                        f'IP attempts: {ip_attempts + 1}/{self.max_attempts_per_ip}, '
-                        f'Username attempts: {username_attempts + 1}/{self.max_attempts_per_username}'
-                    )
-            else:
-                # Successful login - clear attempt counters
-                ip_address = self.get_client_ip(request)
-                username = request.POST.get('username', '').strip().lower()
-
-                if username:
-                    cache.delete(f'login_attempts_ip_{ip_address}')
-                    cache.delete(f'login_attempts_user_{username}')
-                    cache.delete(f'login_lockout_ip_{ip_address}')
-                    cache.delete(f'login_lockout_user_{username}')
+        if has_error:
+            if username:
+                logger.warning(
+                    f'Failed login attempt for username "{username}" from IP {ip_address}. '
+                    f'IP attempts: {ip_result.count}/{ip_result.limit}, '
+                    f'Username attempts: {username_result.count}/{username_result.limit}'
+                )
+        elif logged_in:
+            # Successful login - clear attempt counters and lockouts
+            self.ip_limit.reset(ip_address)
+            self.username_limit.reset(username)
 
         return response
 
@@ -267,42 +314,39 @@ class LoginRateLimitMiddleware:
         return ip
 
 
-class AdminAccessMonitoringMiddleware:
+class AdminAccessMonitoringMiddleware(PathDispatchMiddleware):
     """
     Middleware to monitor and log all admin panel access attempts.
     Provides security audit trail for administrative actions.
     """
-
-    def __init__(self, get_response):
-        self.get_response = get_response
-
-    def __call__(self, request):
-        # Monitor admin panel access
-        if request.path.startswith('/admin/'):
-            ip_address = self.get_client_ip(request)
-
-            # Log admin access attempts
-            if request.user.is_authenticated:
-                if hasattr(request.user, 'is_admin') and request.user.is_admin:
-                    # Log successful admin access
-                    if request.method in ['POST', 'PUT', 'PATCH', 'DELETE']:
-                        logger.info(
-                            f"ADMIN ACTION: User '{request.user.username}' "
-                            f"({request.method} {request.path}) from IP {ip_address}"
-                        )
-                else:
-                    # Log unauthorized admin access attempt
-                    logger.warning(
-                        f"ADMIN ACCESS DENIED: Non-admin user '{request.user.username}' "
-                        f"attempted to access {request.path} from IP {ip_address}"
+    # Monitor admin panel access
+    target_prefixes = ('/admin/',)
+
+    def handle(self, request):
+        ip_address = self.get_client_ip(request)
+
+        # Log admin access attempts
+        if request.user.is_authenticated:
+            if hasattr(request.user, 'is_admin') and request.user.is_admin:
+                # Log successful admin access
+                if request.method in ['POST', 'PUT', 'PATCH', 'DELETE']:
+                    logger.info(
+                        f"ADMIN ACTION: User '{request.user.username}' "
+                        f"({request.method} {request.path}) from IP {ip_address}"
                     )
             else:
-                # Log unauthenticated admin access attempt
-                if request.method == 'POST':  # Only log POST to avoid spam from page loads
-                    logger.warning(
-                        f"ADMIN LOGIN ATTEMPT: Unauthenticated access to {request.path} "
-                        f"from IP {ip_address}"
-                    )
+                # Log unauthorized admin access attempt
+                logger.warning(
+                    f"ADMIN ACCESS DENIED: Non-admin user '{request.user.username}' "
+                    f"attempted to access {request.path} from IP {ip_address}"
+                )
+        else:
+            # Log unauthenticated admin access attempt
+            if request.method == 'POST':  # Only log POST to avoid spam from page loads
+                logger.warning(
+                    f"ADMIN LOGIN ATTEMPT: Unauthenticated access to {request.path} "
+                    f"from IP {ip_address}"
+                )
 
         response = self.get_response(request)
         return response
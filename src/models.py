@@ -1,7 +1,11 @@
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 import logging
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
@@ -198,6 +202,9 @@ class Legislation(models.Model):
 
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
 
+    # Frozen outcome written once by close_voting(); result pages read this instead of Vote rows
+    result_snapshot = models.JSONField(null=True, blank=True)
+
     @property
     def required_yes_votes(self):
         if self.vote_mode == 'piecewise':
@@ -211,35 +218,142 @@ class Legislation(models.Model):
     def __str__(self):
         return self.title
 
-    def set_passed(self):
-        from collections import Counter
-
-        total_votes = Vote.objects.filter(legislation=self)
+    def vote_counts(self):
+        """Return a {vote_choice: count} tally for this legislation in a single query"""
+        return dict(
+            Vote.objects.filter(legislation=self)
+            .values_list('vote_choice')
+            .annotate(count=models.Count('id'))
+        )
 
+    def decide_passed(self, vote_counts):
+        """Apply this legislation's pass rules to a {vote_choice: count} tally"""
         if self.vote_mode == 'plurality':
-            vote_choices = [v.vote_choice for v in total_votes]
-            vote_counts = Counter(vote_choices)
-            if vote_counts:
-                max_votes = max(vote_counts.values())
-                winners = [option for option, count in vote_counts.items() if count == max_votes]
-                self.passed = len(winners) == 1  # Only passes if there is a single clear winner
-            else:
-                self.passed = False
+            vote_counts = {option: count for option, count in vote_counts.items() if count}
+            if not vote_counts:
+                return False
+            max_votes = max(vote_counts.values())
+            winners = [option for option, count in vote_counts.items() if count == max_votes]
+            return len(winners) == 1  # Only passes if there is a single clear winner
         elif self.vote_mode == 'piecewise':
-            yes_votes = total_votes.filter(vote_choice='yes').count()
-            self.passed = yes_votes >= self.required_yes_votes
+            return vote_counts.get('yes', 0) >= self.required_yes_votes
         else:  # percentage
-            total_votes = total_votes.exclude(vote_choice='abstain')
-            total = total_votes.count()
-            yes = total_votes.filter(vote_choice='yes').count()
+            yes = vote_counts.get('yes', 0)
+            total = sum(count for choice, count in vote_counts.items() if choice != 'abstain')
             if total > 0:
-                yes_pct = (yes / total) * 100
-                self.passed = yes_pct >= float(self.required_percentage)
-            else:
-                self.passed = False
+                return (yes / total) * 100 >= float(self.required_percentage)
+            return False
 
+    def set_passed(self):
+        self.passed = self.decide_passed(self.vote_counts())
         self.save()
 
+    def build_result_snapshot(self, closed_at=None):
+        """
+        Compute the complete result of this vote from its ballots and attendance.
+
+        Uses one query for the ballots (with voter names) and one for the members present
+        in the 3-hour voting window before closed_at. Voter names are left out of the
+        snapshot for anonymous votes.
+        """
+        from datetime import timedelta
+        from django.utils import timezone
+
+        closed_at = closed_at or self.voting_ended_at or timezone.now()
+
+        if self.vote_mode == 'plurality':
+            options = list(self.plurality_options or [])
+        else:
+            options = ['yes', 'no', 'abstain']
+
+        tallies = {option: 0 for option in options}
+        voters = {option: [] for option in options}
+        ballots = Vote.objects.filter(legislation=self).order_by('user__name').values_list('vote_choice', 'user__name')
+        for choice, name in ballots:
+            tallies[choice] = tallies.get(choice, 0) + 1
+            voters.setdefault(choice, []).append(name)
+
+        present_members = list(
+            Attendance.objects.filter(
+                present=True,
+                created_at__range=(closed_at - timedelta(hours=3), closed_at)
+            ).order_by('user__name').values_list('user_id', 'user__name').distinct()
+        )
+
+        total_votes = sum(tallies.values())
+        counted_votes = total_votes - tallies.get('abstain', 0) if self.vote_mode != 'plurality' else total_votes
+        passed = self.decide_passed(tallies)
+
+        yes_percentage = None
+        winner = None
+        if self.vote_mode == 'plurality':
+            if total_votes:
+                winner = max(tallies, key=tallies.get)
+        elif counted_votes:
+            yes_percentage = round(tallies.get('yes', 0) / counted_votes * 100, 2)
+        elif self.vote_mode == 'percentage':
+            yes_percentage = 0
+
+        return {
+            'vote_mode': self.vote_mode,
+            'closed_at': closed_at.isoformat(),
+            'tallies': tallies,
+            'voters': None if self.anonymous_vote else voters,
+            'total_votes': total_votes,
+            'counted_votes': counted_votes,
+            'required_percentage': int(self.required_percentage or 51) if self.vote_mode == 'percentage' else None,
+            'required_number': self.required_yes_votes if self.vote_mode == 'piecewise' else None,
+            'yes_percentage': yes_percentage,
+            'winner': winner,
+            'passed': passed,
+            'present_count': len(present_members),
+            'present_members': [name for _, name in present_members],
+        }
+
+    def close_voting(self):
+        """
+        Close voting and freeze the result in a single transaction.
+
+        The row is locked exclusively, so it waits for ballots in flight (vote_view holds a
+        key-share lock while inserting one) and no ballot can be inserted while the snapshot
+        is computed. Closing an already-closed vote never changes its published outcome: the
+        existing snapshot is kept, and a bill closed before snapshots existed only gets one
+        recorded with its stored result (as the snapshot_vote_results command does).
+        """
+        from django.db import transaction
+        from django.utils import timezone
+
+        with transaction.atomic():
+            legislation = Legislation.objects.select_for_update().get(pk=self.pk)
+            if legislation.voting_closed:
+                if not legislation.result_snapshot:
+                    snapshot = legislation.build_result_snapshot(
+                        closed_at=legislation.voting_ended_at or legislation.available_at
+                    )
+                    # The stored outcome is what members were told; keep it authoritative
+                    snapshot['passed'] = legislation.passed
+                    legislation.result_snapshot = snapshot
+                    legislation.save(update_fields=['result_snapshot'])
+                return legislation
+
+            closed_at = timezone.now()
+            snapshot = legislation.build_result_snapshot(closed_at=closed_at)
+
+            legislation.voting_closed = True
+            legislation.voting_ended_at = closed_at
+            legislation.passed = snapshot['passed']
+            legislation.status = 'passed' if snapshot['passed'] else 'removed'
+            legislation.result_snapshot = snapshot
+            legislation.save(update_fields=['voting_closed', 'voting_ended_at', 'passed', 'status', 'result_snapshot'])
+
+        return legislation
+
+    def get_result_snapshot(self):
+        """Return the frozen result, or compute one (without saving) for bills closed before snapshots existed"""
+        if self.result_snapshot:
+            return self.result_snapshot
+        return self.build_result_snapshot(closed_at=self.voting_ended_at or self.available_at)
+
 class Attendance(models.Model):
     user = models.ForeignKey(ParliamentUser, on_delete=models.CASCADE, limit_choices_to={'member_status': 'Active'})
     date = models.DateField(auto_now_add=True)
@@ -251,14 +365,35 @@ class Vote(models.Model):
     legislation = models.ForeignKey(Legislation, on_delete=models.CASCADE)
     vote_choice = models.CharField(max_length=100)
 
+    class Meta:
+        unique_together = ('user', 'legislation')
 
-@receiver(post_save)
-def log_model_save(sender, instance, created, **kwargs):
-    """Enhanced logging for model save events"""
-    if sender.__module__.startswith('django.'):
+
+def _audit_user(instance):
+    """
+    Describe who made a change without triggering a lazy FK fetch: the related user is
+    only rendered if it is already loaded, otherwise its primary key is logged.
+    """
+    from django.core.exceptions import FieldDoesNotExist
+
+    for field_name in ('posted_by', 'uploaded_by'):
+        try:
+            field = instance._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            continue
+        if field.is_cached(instance):
+            return str(getattr(instance, field_name))
+        return str(getattr(instance, field.attname) or 'System')
+    return 'System'
+
+
+def _log_model_event(sender, instance, action):
+    from src.logging_utils import AuditLogEntry, should_audit
+
+    # Sampling is decided before any details are gathered, so skipped events cost nothing
+    if not should_audit(sender):
         return
 
-    action = 'CREATE' if created else 'UPDATE'
     model_name = sender.__name__
 
     # Build detailed log information
@@ -273,24 +408,23 @@ def log_model_save(sender, instance, created, **kwargs):
     elif hasattr(instance, 'name'):
         details['name'] = instance.name
 
-    # Get user information if available from thread-local storage or instance
-    user_info = 'System'
-    if hasattr(instance, 'posted_by'):
-        user_info = str(instance.posted_by)
-    elif hasattr(instance, 'uploaded_by'):
-        user_info = str(instance.uploaded_by)
-
-    # Format log entry
-    from src.logging_utils import LogContext
-    log_entry = LogContext.format_log_entry(
-        user=user_info,
+    # Formatting happens when the record is written (on the audit queue listener thread)
+    logger.info(AuditLogEntry(
+        user=_audit_user(instance),
         action=action,
         resource_type=model_name,
         resource_id=instance.pk,
         details=details,
         status='success'
-    )
-    logger.info(log_entry)
+    ))
+
+@receiver(post_save)
+def log_model_save(sender, instance, created, **kwargs):
+    """Enhanced logging for model save events"""
+    if sender.__module__.startswith('django.'):
+        return
+
+    _log_model_event(sender, instance, 'CREATE' if created else 'UPDATE')
 
 @receiver(post_delete)
 def log_model_delete(sender, instance, **kwargs):
@@ -298,37 +432,117 @@ def log_model_delete(sender, instance, **kwargs):
     if sender.__module__.startswith('django.'):
         return
 
-    model_name = sender.__name__
+    _log_model_event(sender, instance, 'DELETE')
 
-    # Build detailed log information
-    details = {
-        'model': model_name,
-        'instance_id': str(instance.pk),
-    }
 
-    if hasattr(instance, 'title'):
-        details['title'] = instance.title
-    elif hasattr(instance, 'name'):
-        details['name'] = instance.name
+class AuditEvent(models.Model):
+    """
+    Append-only, indexed copy of structured audit log entries (see LogContext.format_log_entry)
+
+    Rows are bulk-inserted by AuditEventHandler from the audit log queue. Users are stored by
+    name/ID rather than foreign key so history survives user deletion.
+    """
+    # Audit rows are written with bulk_create, but never audit the audit table itself
+    audit_log_sample_rate = 0.0
+
+    timestamp = models.DateTimeField(default=timezone.now)
+    logger_name = models.CharField(max_length=50, blank=True)
+    username = models.CharField(max_length=150)
+    user_id = models.CharField(max_length=50, blank=True)
+    action = models.CharField(max_length=100)
+    resource_type = models.CharField(max_length=100, blank=True)
+    resource_id = models.CharField(max_length=100, blank=True)
+    status = models.CharField(max_length=20, default='success')
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    details = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-timestamp', '-id']
+        indexes = [
+            models.Index(fields=['timestamp', 'username', 'action', 'resource_type']),
+            models.Index(fields=['resource_type', 'resource_id', '-timestamp']),
+            # Case-insensitive prefix search on username (UPPER(username) LIKE 'ALI%')
+            models.Index(OpClass(Upper('username'), name='text_pattern_ops'), name='auditevent_username_prefix'),
+            # The user filter also matches user_id; without this the OR scans the table
+            models.Index(fields=['user_id', '-timestamp']),
+            # Case-insensitive prefix search on action (UPPER(action) LIKE 'DEL%')
+            models.Index(OpClass(Upper('action'), name='text_pattern_ops'), name='auditevent_action_prefix'),
+        ]
+
+    def __str__(self):
+        return f"{self.timestamp:%Y-%m-%d %H:%M:%S} {self.username} {self.action} {self.resource_type} {self.resource_id}"
+
+
+class DocumentBlob(models.Model):
+    """
+    A stored file's content, addressed by SHA-256 (see DualLocationStorage).
+
+    Every uploaded document with the same bytes shares one blob; ref_count is the number of
+    document fields pointing at it, and the file is only unlinked when it drops to zero.
+    """
+    audit_log_sample_rate = 0.0
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True, help_text='Storage name of the blob file')
+    size = models.BigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count} refs)"
+
+
+class DocumentText(models.Model):
+    """
+    Text extracted from an uploaded document, indexed for full-text search (see src/document_search.py).
+
+    kind/object_id identify the source row the same way the document download URL does. sha256 is
+    the hash of the file the text came from, so re-indexing skips files that haven't changed.
+    """
+    audit_log_sample_rate = 0.0
+
+    kind = models.CharField(max_length=30)
+    object_id = models.PositiveBigIntegerField()
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    text = models.TextField(blank=True)
+    sha256 = models.CharField(max_length=64, blank=True)
+    search_vector = SearchVectorField(null=True)
+    extraction_error = models.CharField(max_length=255, blank=True)
+    indexed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_document_text_source'),
+        ]
+        indexes = [
+            GinIndex(fields=['search_vector']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}: {self.title}"
+
+
+class RateLimitCounter(models.Model):
+    """
+    Hits per identifier per fixed window, for rate limits when the cache has no atomic incr
+    (see src/rate_limit.py). Rows are incremented with an INSERT ... ON CONFLICT upsert.
+    """
+    audit_log_sample_rate = 0.0
+
+    key = models.CharField(max_length=100)
+    window_index = models.BigIntegerField()
+    count = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['key', 'window_index'], name='unique_rate_limit_window'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} @ {self.window_index}: {self.count}"
 
-    # Get user information if available
-    user_info = 'System'
-    if hasattr(instance, 'posted_by'):
-        user_info = str(instance.posted_by)
-    elif hasattr(instance, 'uploaded_by'):
-        user_info = str(instance.uploaded_by)
-
-    # Format log entry
-    from src.logging_utils import LogContext
-    log_entry = LogContext.format_log_entry(
-        user=user_info,
-        action='DELETE',
-        resource_type=model_name,
-        resource_id=instance.pk,
-        details=details,
-        status='success'
-    )
-    logger.info(log_entry)
 
 class Committee(models.Model):
     # Hard-coded committees (ID, Code, Name)
@@ -628,6 +842,8 @@ class Announcement(models.Model):
 
 class UserAnnouncementView(models.Model):
     """Track which announcements users have seen/dismissed"""
+    audit_log_sample_rate = 0.0
+
     user = models.ForeignKey('ParliamentUser', on_delete=models.CASCADE)
     announcement = models.ForeignKey(Announcement, on_delete=models.CASCADE)
     viewed_at = models.DateTimeField(auto_now_add=True)
@@ -872,6 +1088,9 @@ class ChatMessage(models.Model):
 
 class ChatReadReceipt(models.Model):
     """Track last read message per user per channel"""
+    # Bumped on every chat poll; bookkeeping only, so not audited by default
+    audit_log_sample_rate = 0.0
+
     user = models.ForeignKey('ParliamentUser', on_delete=models.CASCADE, related_name='chat_receipts')
 
     # New channel-based system
@@ -1003,10 +1222,12 @@ class PassedResolution(models.Model):
 
     def get_document_url(self):
         """Get the URL to the resolution document"""
+        from django.urls import reverse
+
         if self.legislation:
-            return self.legislation.document.url if self.legislation.document else None
+            return reverse('download_document', args=['legislation', self.legislation_id]) if self.legislation.document else None
         elif self.document:
-            return self.document.url
+            return reverse('download_document', args=['passed_resolution', self.pk])
         return None
 
 
@@ -1040,6 +1261,7 @@ class ResolutionSectionImpact(models.Model):
     section_anchor = models.CharField(
         max_length=100,
         blank=True,
+        db_index=True,
         help_text='URL anchor/fragment (e.g., "#const-leadership")'
     )
 
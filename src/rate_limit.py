@@ -0,0 +1,170 @@
+"""
+Rate limiting that holds across every worker.
+
+A RateLimit allows `limit` hits per `window` seconds for each identifier (an IP, a username, a
+user ID). It is a sliding window counter: hits are counted in fixed windows, and the previous
+window's count is weighted by how much of it the sliding window still covers. Counts only change
+through atomic increments, so concurrent requests can't read the same count and all slip past.
+
+Counters live in the cache when its backend has an atomic incr (Redis, Memcached, or LocMem in
+development); otherwise in the RateLimitCounter table, incremented by one INSERT ... ON CONFLICT
+upsert. Lockout flags are plain cache keys, since setting one twice is harmless.
+
+Limits are defined per endpoint in DEFAULT_RATE_LIMITS and can be overridden with the
+RATE_LIMITS setting, e.g. RATE_LIMITS = {'chat_send': {'limit': 60}}.
+"""
+import hashlib
+import math
+import random
+import time
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+from src.models import RateLimitCounter
+
+# name -> limit (hits), window (seconds) and optional lockout (seconds) once the limit is exceeded
+DEFAULT_RATE_LIMITS = {
+    'login_ip': {'limit': 10, 'window': 15 * 60, 'lockout': 30 * 60},
+    'login_username': {'limit': 5, 'window': 15 * 60, 'lockout': 30 * 60},
+    'password_reset_ip': {'limit': 5, 'window': 15 * 60, 'lockout': 60 * 60},
+    'password_reset_email': {'limit': 3, 'window': 15 * 60},
+    'chat_send': {'limit': 30, 'window': 60},
+    'vote': {'limit': 20, 'window': 60},
+}
+
+# Backends whose incr is a single atomic operation
+ATOMIC_CACHE_BACKENDS = ('RedisCache', 'PyMemcacheCache', 'PyLibMCCache', 'LocMemCache')
+
+# Share of database hits that also delete expired counter rows
+COUNTER_CLEANUP_PROBABILITY = 0.001
+
+RateLimitResult = namedtuple('RateLimitResult', ['allowed', 'count', 'limit', 'retry_after'])
+
+
+class CacheCounterStore:
+    """Window counters as cache keys, for backends with atomic incr"""
+
+    def incr(self, key, window_index, ttl):
+        current_key = f'{key}:{window_index}'
+        for _ in range(2):
+            cache.add(current_key, 0, ttl)
+            try:
+                current = cache.incr(current_key)
+                break
+            except ValueError:
+                continue  # expired between add() and incr(); add it again
+        else:
+            current = 1
+        return current, cache.get(f'{key}:{window_index - 1}', 0)
+
+    def counts(self, key, window_index):
+        values = cache.get_many([f'{key}:{window_index}', f'{key}:{window_index - 1}'])
+        return values.get(f'{key}:{window_index}', 0), values.get(f'{key}:{window_index - 1}', 0)
+
+    def reset(self, key, window_index):
+        cache.delete_many([f'{key}:{window_index}', f'{key}:{window_index - 1}'])
+
+
+class DatabaseCounterStore:
+    """Window counters as RateLimitCounter rows, for caches whose incr is a read followed by a write"""
+
+    def incr(self, key, window_index, ttl):
+        table = connection.ops.quote_name(RateLimitCounter._meta.db_table)
+        expires_at = timezone.now() + timedelta(seconds=ttl)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                WITH hit AS (
+                    INSERT INTO {table} (key, window_index, count, expires_at) VALUES (%s, %s, 1, %s)
+                    ON CONFLICT (key, window_index) DO UPDATE SET count = {table}.count + 1
+                    RETURNING count
+                )
+                SELECT (SELECT count FROM hit),
+                       COALESCE((SELECT count FROM {table} WHERE key = %s AND window_index = %s), 0)
+                """,
+                [key, window_index, expires_at, key, window_index - 1],
+            )
+            current, previous = cursor.fetchone()
+
+        if random.random() < COUNTER_CLEANUP_PROBABILITY:
+            RateLimitCounter.objects.filter(expires_at__lt=timezone.now()).delete()
+        return current, previous
+
+    def counts(self, key, window_index):
+        counts = dict(RateLimitCounter.objects.filter(
+            key=key, window_index__in=[window_index, window_index - 1]
+        ).values_list('window_index', 'count'))
+        return counts.get(window_index, 0), counts.get(window_index - 1, 0)
+
+    def reset(self, key, window_index):
+        RateLimitCounter.objects.filter(key=key).delete()
+
+
+def counter_store():
+    """The store named by RATE_LIMIT_STORE ('cache' or 'database'), or the right one for the cache backend"""
+    store = getattr(settings, 'RATE_LIMIT_STORE', None)
+    if store is None:
+        backend = settings.CACHES.get('default', {}).get('BACKEND', 'LocMemCache')
+        store = 'cache' if backend.endswith(ATOMIC_CACHE_BACKENDS) else 'database'
+    return DatabaseCounterStore() if store == 'database' else CacheCounterStore()
+
+
+class RateLimit:
+    """A named limit of `limit` hits per `window` seconds per identifier"""
+
+    def __init__(self, name, limit, window, lockout=None, store=None):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.lockout = lockout
+        self.store = store or counter_store()
+
+    def _key(self, identifier):
+        # Identifiers may be emails or contain characters cache backends reject
+        digest = hashlib.sha256(str(identifier).encode()).hexdigest()[:32]
+        return f'rl:{self.name}:{digest}'
+
+    def _estimate(self, current, previous, now):
+        elapsed = (now % self.window) / self.window
+        return current + previous * (1 - elapsed)
+
+    def _result(self, allowed, count, now):
+        retry_after = 0 if allowed else math.ceil(self.window - now % self.window)
+        return RateLimitResult(allowed, math.ceil(count), self.limit, retry_after)
+
+    def hit(self, identifier):
+        """Count one hit; allowed is False once the sliding window holds more than `limit` hits"""
+        now = time.time()
+        current, previous = self.store.incr(self._key(identifier), int(now // self.window), self.window * 2)
+        count = self._estimate(current, previous, now)
+        return self._result(count <= self.limit, count, now)
+
+    def peek(self, identifier):
+        """Whether one more hit would be allowed, without counting one"""
+        now = time.time()
+        current, previous = self.store.counts(self._key(identifier), int(now // self.window))
+        count = self._estimate(current, previous, now)
+        return self._result(count < self.limit, count, now)
+
+    def reset(self, identifier):
+        self.store.reset(self._key(identifier), int(time.time() // self.window))
+        cache.delete(f'{self._key(identifier)}:lockout')
+
+    def lock_out(self, identifier):
+        if self.lockout:
+            cache.set(f'{self._key(identifier)}:lockout', True, self.lockout)
+
+    def is_locked_out(self, identifier):
+        return bool(self.lockout) and bool(cache.get(f'{self._key(identifier)}:lockout'))
+
+
+def get_rate_limit(name):
+    """The RateLimit for an endpoint, with any RATE_LIMITS overrides applied"""
+    config = dict(DEFAULT_RATE_LIMITS.get(name, {}))
+    config.update(getattr(settings, 'RATE_LIMITS', {}).get(name, {}))
+    return RateLimit(name, **config)
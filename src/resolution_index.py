@@ -0,0 +1,108 @@
+"""
+Inverted index from Constitution & Bylaws sections to the passed resolutions that amended them.
+
+Each section anchor (the id of a <section> on the constitution page, e.g. "const-leadership")
+has an entry in the 'resolution_index' cache namespace listing its active resolutions, oldest
+first, and one more entry holds the number of resolutions per anchor. Saving or deleting a
+ResolutionSectionImpact or a PassedResolution rebuilds only the entries for the anchors it
+touches (the old and the new anchor when an impact is moved), so looking up a section never
+scans every resolution. An entry that is missing from the cache is rebuilt from the table on
+first read.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from src.caching import CacheNamespace
+from src.models import PassedResolution, ResolutionSectionImpact
+
+# Entries are rewritten on every change, so they only expire to bound memory
+RESOLUTION_INDEX_TIMEOUT = 24 * 60 * 60
+
+RESOLUTION_INDEX = CacheNamespace('resolution_index', timeout=RESOLUTION_INDEX_TIMEOUT)
+
+
+def normalize_anchor(anchor):
+    """Section anchors are stored with or without the leading '#'; index them without it"""
+    return (anchor or '').strip().lstrip('#')
+
+
+def _build_section(anchor):
+    impacts = (
+        ResolutionSectionImpact.objects
+        .filter(section_anchor__in=[anchor, f'#{anchor}'], resolution__is_active=True)
+        .select_related('resolution__legislation')
+        .order_by('resolution__date_passed', 'resolution__display_order', 'resolution_id')
+    )
+    entries = {}
+    for impact in impacts:
+        resolution = impact.resolution
+        entry = entries.get(resolution.pk)
+        if entry is None:
+            entries[resolution.pk] = {
+                'id': resolution.pk,
+                'title': resolution.title,
+                'description': resolution.description,
+                'date_passed': resolution.date_passed,
+                'document_url': resolution.get_document_url(),
+                'sections': [impact.section_name],
+            }
+        elif impact.section_name not in entry['sections']:
+            entry['sections'].append(impact.section_name)
+    return list(entries.values())
+
+
+def _build_counts():
+    resolutions_by_anchor = {}
+    for anchor, resolution_id in (
+        ResolutionSectionImpact.objects.filter(resolution__is_active=True)
+        .exclude(section_anchor='')
+        .values_list('section_anchor', 'resolution_id').distinct()
+    ):
+        resolutions_by_anchor.setdefault(normalize_anchor(anchor), set()).add(resolution_id)
+    return {anchor: len(ids) for anchor, ids in sorted(resolutions_by_anchor.items())}
+
+
+def section_resolutions(anchor):
+    """Active resolutions that amended a section, oldest first"""
+    anchor = normalize_anchor(anchor)
+    return RESOLUTION_INDEX.get_or_set(('section', anchor), lambda: _build_section(anchor))
+
+
+def section_counts():
+    """{anchor: number of active resolutions} for every amended section"""
+    return RESOLUTION_INDEX.get_or_set(('counts',), _build_counts)
+
+
+def refresh_sections(anchors):
+    """Rebuild the index entries for some anchors, and the per-anchor counts"""
+    for anchor in {normalize_anchor(anchor) for anchor in anchors} - {''}:
+        RESOLUTION_INDEX.set(('section', anchor), _build_section(anchor))
+    RESOLUTION_INDEX.set(('counts',), _build_counts())
+
+
+def _remember_anchor(sender, instance, **kwargs):
+    # The impact may be moved to another section; that section's entry has to drop it
+    instance._indexed_anchor = (
+        sender.objects.filter(pk=instance.pk).values_list('section_anchor', flat=True).first()
+        if instance.pk else None
+    )
+
+
+def _on_impact_changed(sender, instance, **kwargs):
+    anchors = [instance.section_anchor, getattr(instance, '_indexed_anchor', None)]
+    transaction.on_commit(lambda: refresh_sections(anchors))
+
+
+def _on_resolution_changed(sender, instance, created, **kwargs):
+    if created:
+        return  # No impacts yet; they are indexed as they are added
+    pk = instance.pk
+    transaction.on_commit(lambda: refresh_sections(
+        ResolutionSectionImpact.objects.filter(resolution_id=pk).values_list('section_anchor', flat=True)
+    ))
+
+
+pre_save.connect(_remember_anchor, sender=ResolutionSectionImpact, dispatch_uid='resolution_index_pre_save')
+post_save.connect(_on_impact_changed, sender=ResolutionSectionImpact, dispatch_uid='resolution_index_save')
+post_delete.connect(_on_impact_changed, sender=ResolutionSectionImpact, dispatch_uid='resolution_index_delete')
+post_save.connect(_on_resolution_changed, sender=PassedResolution, dispatch_uid='resolution_index_resolution')
@@ -1,8 +1,149 @@
+import hashlib
 import os
+import tempfile
+import threading
+import time
 from django.core.files.storage import FileSystemStorage
 from django.conf import settings
 
 
+class StorageLocationIndex:
+    """
+    In-memory map of stored file names to the root directory that holds them.
+
+    Built by scanning every root on first use in a process. Afterwards it is refreshed at
+    most once every `refresh_interval` seconds by comparing directory mtimes, so only
+    directories that changed are rescanned and a lookup costs no filesystem calls.
+    Roots are listed in priority order: a name present in several roots resolves to the first.
+    """
+
+    def __init__(self, roots, refresh_interval=30):
+        self.roots = list(roots)
+        self.refresh_interval = refresh_interval
+        self._files = {root: set() for root in self.roots}
+        self._dir_entries = {}   # (root, relative dir) -> set of file names directly inside it
+        self._dir_mtimes = {}    # (root, relative dir) -> directory mtime at last scan
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def lookup(self, name):
+        """Return the root holding name, or None if the index doesn't know it"""
+        self._refresh_if_stale()
+        for root in self.roots:
+            if name in self._files[root]:
+                return root
+        return None
+
+    def add(self, name, root):
+        self._files[root].add(name)
+        self._dir_entries.setdefault((root, os.path.dirname(name)), set()).add(name)
+
+    def discard(self, name):
+        for root in self.roots:
+            self._files[root].discard(name)
+            self._dir_entries.get((root, os.path.dirname(name)), set()).discard(name)
+
+    def _refresh_if_stale(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.refresh_interval:
+            return
+
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.refresh_interval:
+                return
+            if self._checked_at is None:
+                for root in self.roots:
+                    self._scan_dir(root, '')
+            else:
+                for root, relative_dir in list(self._dir_mtimes):
+                    self._refresh_dir(root, relative_dir)
+            self._checked_at = time.monotonic()
+
+    def _refresh_dir(self, root, relative_dir):
+        key = (root, relative_dir)
+        if key not in self._dir_mtimes:
+            return  # removed while refreshing its parent
+        try:
+            mtime = os.stat(os.path.join(root, relative_dir)).st_mtime
+        except OSError:
+            self._forget_dir(root, relative_dir)
+            return
+        if mtime != self._dir_mtimes[key]:
+            self._scan_dir(root, relative_dir)
+
+    def _scan_dir(self, root, relative_dir):
+        key = (root, relative_dir)
+        directory = os.path.join(root, relative_dir)
+        try:
+            mtime = os.stat(directory).st_mtime
+            entries = list(os.scandir(directory))
+        except OSError:
+            self._forget_dir(root, relative_dir)
+            return
+
+        names = set()
+        subdirs = []
+        for entry in entries:
+            name = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+            if entry.is_dir(follow_symlinks=True):
+                subdirs.append(name)
+            else:
+                names.add(name)
+
+        previous = self._dir_entries.get(key, set())
+        self._files[root].difference_update(previous - names)
+        self._files[root].update(names)
+        self._dir_entries[key] = names
+        self._dir_mtimes[key] = mtime
+
+        # Subdirectories that disappeared are dropped; new ones are scanned
+        for known_root, known_dir in list(self._dir_mtimes):
+            if known_root == root and os.path.dirname(known_dir) == relative_dir and known_dir and known_dir not in subdirs:
+                self._forget_dir(root, known_dir)
+        for subdir in subdirs:
+            if (root, subdir) not in self._dir_mtimes:
+                self._scan_dir(root, subdir)
+
+    def _forget_dir(self, root, relative_dir):
+        prefix = f"{relative_dir}/"
+        for key in [key for key in self._dir_mtimes if key[0] == root and (key[1] == relative_dir or key[1].startswith(prefix))]:
+            self._files[root].difference_update(self._dir_entries.pop(key, set()))
+            del self._dir_mtimes[key]
+
+
+# Content-addressed uploads live under this directory of the media root
+BLOB_DIRECTORY = 'blobs'
+
+
+def blob_name_for(sha256, original_name):
+    """Storage name for content with this hash; the original extension is kept for MIME detection"""
+    extension = os.path.splitext(original_name)[1].lower()
+    return f"{BLOB_DIRECTORY}/{sha256[:2]}/{sha256}{extension}"
+
+
+def is_blob_name(name):
+    return bool(name) and name.startswith(f"{BLOB_DIRECTORY}/")
+
+
+# One index per (media root, exportable root) pair, shared by every storage instance in the process
+_location_indexes = {}
+_location_indexes_lock = threading.Lock()
+
+
+def get_location_index(roots):
+    roots = tuple(roots)
+    index = _location_indexes.get(roots)
+    if index is None:
+        with _location_indexes_lock:
+            index = _location_indexes.get(roots)
+            if index is None:
+                index = StorageLocationIndex(
+                    roots, refresh_interval=getattr(settings, 'DUAL_STORAGE_INDEX_REFRESH', 30)
+                )
+                _location_indexes[roots] = index
+    return index
+
+
 class DualLocationStorage(FileSystemStorage):
     """
     Custom storage that checks both media and exportable_media folders.
@@ -12,8 +153,17 @@ class DualLocationStorage(FileSystemStorage):
     2. If not found, checks the exportable_media folder
     3. Returns the first location where the file exists
 
+    Known files are resolved through a StorageLocationIndex, so rendering document links and
+    paths makes no stat calls; only names the index doesn't know fall back to checking disk.
+    Set DUAL_STORAGE_INDEX = False to always check disk.
+
     When saving a file:
     - Always saves to the regular media folder
+    - With CONTENT_ADDRESSED_STORAGE (default True) the upload is hashed while it is written and
+      stored once under blobs/ by SHA-256; identical uploads reuse the existing blob. Each blob
+      has a DocumentBlob row whose ref_count is raised by saves and add_reference() and lowered
+      by delete() and release_reference(); the file is only unlinked when the count reaches zero.
+      Replaced and deleted rows release their blobs through src/blob_references.py.
     """
 
     def __init__(self, *args, **kwargs):
@@ -21,36 +171,46 @@ class DualLocationStorage(FileSystemStorage):
         # Define the exportable_media location
         self.exportable_location = os.path.join(settings.BASE_DIR, 'exportable_media')
 
+    @property
+    def location_index(self):
+        if not getattr(settings, 'DUAL_STORAGE_INDEX', True):
+            return None
+        return get_location_index((self.location, self.exportable_location))
+
+    def _locate(self, name):
+        """Return the root directory that holds name, or None if it is in neither location"""
+        index = self.location_index
+        if index is not None:
+            root = index.lookup(name)
+            if root is not None:
+                return root
+
+        for root in (self.location, self.exportable_location):
+            if os.path.exists(os.path.join(root, name)):
+                # Remember files created since the last refresh (e.g. by another worker)
+                if index is not None:
+                    index.add(name, root)
+                return root
+        return None
+
     def path(self, name):
         """
         Return the filesystem path where the file can be retrieved.
         Checks both media and exportable_media locations.
         """
-        # First check the regular media location
-        regular_path = super().path(name)
-        if os.path.exists(regular_path):
-            return regular_path
-
-        # If not found, check exportable_media
-        exportable_path = os.path.join(self.exportable_location, name)
-        if os.path.exists(exportable_path):
-            return exportable_path
+        root = self._locate(name)
+        if root == self.exportable_location:
+            return os.path.join(self.exportable_location, name)
 
-        # If not found in either location, return the regular path
+        # Found in media, or in neither location: return the regular path
         # (this maintains normal behavior for new files)
-        return regular_path
+        return super().path(name)
 
     def exists(self, name):
         """
         Check if a file exists in either media or exportable_media.
         """
-        # Check regular media location
-        if super().exists(name):
-            return True
-
-        # Check exportable_media location
-        exportable_path = os.path.join(self.exportable_location, name)
-        return os.path.exists(exportable_path)
+        return self._locate(name) is not None
 
     def url(self, name):
         """
@@ -58,3 +218,102 @@ class DualLocationStorage(FileSystemStorage):
         Uses the regular URL for both locations since Django will serve from either.
         """
         return super().url(name)
+
+    def _save(self, name, content):
+        if getattr(settings, 'CONTENT_ADDRESSED_STORAGE', True):
+            name = self._save_blob(name, content)
+        else:
+            name = super()._save(name, content)
+        index = self.location_index
+        if index is not None:
+            index.add(name, self.location)
+        return name
+
+    def _save_blob(self, name, content):
+        from django.apps import apps
+        from django.db import transaction
+        from django.db.models import F
+
+        DocumentBlob = apps.get_model('src', 'DocumentBlob')
+
+        blob_root = os.path.join(self.location, BLOB_DIRECTORY)
+        os.makedirs(blob_root, exist_ok=True)
+
+        # Hash while streaming into a temporary file beside the blobs, so keeping it is a rename
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=blob_root, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+
+            sha256 = digest.hexdigest()
+            with transaction.atomic():
+                blob, _ = DocumentBlob.objects.select_for_update().get_or_create(
+                    sha256=sha256, defaults={'name': blob_name_for(sha256, name), 'size': size}
+                )
+                full_path = os.path.join(self.location, blob.name)
+                # A duplicate upload is dropped; the file is (re)written only if it is missing
+                if not os.path.exists(full_path):
+                    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                    os.replace(temp_path, full_path)
+                    temp_path = None
+                    if self.file_permissions_mode is not None:
+                        os.chmod(full_path, self.file_permissions_mode)
+                DocumentBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+            return blob.name
+        finally:
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def add_reference(self, name):
+        """Record another document field pointing at an existing blob (e.g. a copied FieldFile)"""
+        if not is_blob_name(name):
+            return
+        from django.apps import apps
+        from django.db.models import F
+
+        apps.get_model('src', 'DocumentBlob').objects.filter(name=name).update(ref_count=F('ref_count') + 1)
+
+    def release_reference(self, name):
+        """Drop one reference to a blob (e.g. a document replaced on its row); other files are kept"""
+        if is_blob_name(name):
+            self._release_blob(name)
+
+    def delete(self, name):
+        if is_blob_name(name) and self._release_blob(name):
+            return
+        super().delete(name)
+        index = self.location_index
+        if index is not None:
+            index.discard(name)
+
+    def _release_blob(self, name):
+        """Drop one reference to a blob; returns False if it has no DocumentBlob row"""
+        from django.apps import apps
+        from django.db import transaction
+        from django.db.models import F
+
+        DocumentBlob = apps.get_model('src', 'DocumentBlob')
+        with transaction.atomic():
+            blob = DocumentBlob.objects.select_for_update().filter(name=name).first()
+            if blob is None:
+                return False
+            if blob.ref_count > 1:
+                DocumentBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') - 1)
+                return True
+            blob.delete()
+
+            # Unlink only once the row deletion is committed, so a rollback never loses the file
+            def unlink():
+                FileSystemStorage.delete(self, name)
+                index = self.location_index
+                if index is not None:
+                    index.discard(name)
+            transaction.on_commit(unlink)
+        return True
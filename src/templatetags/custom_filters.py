@@ -9,3 +9,9 @@ def get_item(dictionary, key):
 def split(value, arg):
     """Split a string by the given separator"""
     return value.split(arg)
+
+@register.filter
+def previewable(file):
+    """True if a first-page thumbnail can be rendered for this file"""
+    from src.document_previews import can_preview
+    return can_preview(file)
@@ -0,0 +1,136 @@
+"""
+Benchmark harness tests for Parliament system.
+Runs the meeting-night benchmark and the scale data generator at small scale to make
+sure the tooling and the endpoints it drives keep working.
+
+Run with: python manage.py test src.test_benchmarks
+Full-size runs: python manage.py benchmark_voting --users 80 --bills 4
+"""
+
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from .benchmarking import (
+    benchmark_rate_limit, percentile, summarize, run_meeting_benchmark, write_results, compare_results
+)
+from .models import Legislation, Vote, Committee, ParliamentUser, ChatMessage, CommitteeDocument
+
+
+class PercentileTestCase(TestCase):
+    """Test the latency summary helpers"""
+
+    def test_percentile_interpolates(self):
+        samples = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+        self.assertEqual(percentile(samples, 0), 1)
+        self.assertEqual(percentile(samples, 100), 10)
+        self.assertAlmostEqual(percentile(samples, 50), 5.5)
+
+    def test_percentile_empty(self):
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_summarize_reports_throughput_and_queries(self):
+        summary = summarize([0.01, 0.02, 0.03, 0.04], [3, 5, 5, 7], elapsed=0.1)
+        self.assertEqual(summary['requests'], 4)
+        self.assertEqual(summary['queries_avg'], 5.0)
+        self.assertEqual(summary['queries_max'], 7)
+        self.assertEqual(summary['throughput_rps'], 40.0)
+
+
+class MeetingBenchmarkTestCase(TestCase):
+    """Run the meeting benchmark at toy scale"""
+
+    def test_meeting_benchmark_records_every_endpoint(self):
+        results = run_meeting_benchmark(users=6, bills=3, messages=10, polls=2)
+
+        self.assertEqual(
+            set(results),
+            {'vote_page', 'cast_vote', 'chat_messages_poll', 'chat_active_users_poll', 'end_vote'}
+        )
+        self.assertEqual(results['vote_page']['requests'], 6)
+        self.assertEqual(results['cast_vote']['requests'], 18)
+        self.assertEqual(results['chat_messages_poll']['requests'], 12)
+        self.assertEqual(results['end_vote']['requests'], 3)
+        self.assertEqual(results['end_vote']['status_codes'], {'200': 3})
+
+        for metrics in results.values():
+            self.assertLessEqual(metrics['p50_ms'], metrics['p95_ms'])
+            self.assertLessEqual(metrics['p95_ms'], metrics['p99_ms'])
+
+        # Every seeded member voted exactly once on every bill, and every bill is closed
+        self.assertEqual(Vote.objects.filter(legislation__title__startswith='Benchmark Bill').count(), 18)
+        self.assertFalse(Legislation.objects.filter(title__startswith='Benchmark Bill', voting_closed=False).exists())
+
+    def test_results_round_trip_and_compare(self):
+        endpoints = {'cast_vote': summarize([0.01, 0.02], [4, 4], elapsed=0.03)}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'run.json')
+            write_results(path, endpoints, {'users': 2})
+            with open(path) as f:
+                saved = json.load(f)
+
+        self.assertEqual(saved['endpoints'], endpoints)
+        self.assertEqual(saved['parameters'], {'users': 2})
+
+        slower = {'endpoints': {'cast_vote': dict(endpoints['cast_vote'], p50_ms=endpoints['cast_vote']['p50_ms'] * 2)}}
+        comparison = compare_results(saved, slower)
+        self.assertEqual(comparison['cast_vote']['p50_ms'][2], 100.0)
+
+
+class RateLimitBenchmarkTestCase(TestCase):
+    """The shared rate limiter must stay cheap enough to run on every login, ballot and chat send"""
+
+    def test_cache_store_hit_costs_under_a_millisecond(self):
+        from .rate_limit import CacheCounterStore
+
+        summary = benchmark_rate_limit(iterations=500, store=CacheCounterStore())
+        self.assertEqual(summary['requests'], 500)
+        self.assertEqual(summary['queries_max'], 0)
+        self.assertLess(summary['p50_ms'], 1.0)
+
+    @mock.patch('src.rate_limit.COUNTER_CLEANUP_PROBABILITY', 0)
+    def test_database_store_hit_is_one_query(self):
+        from .rate_limit import DatabaseCounterStore
+
+        summary = benchmark_rate_limit(iterations=50, store=DatabaseCounterStore())
+        self.assertEqual(summary['queries_avg'], 1.0)
+
+
+class ScaleDataTestCase(TestCase):
+    """Test the generate_scale_data management command"""
+
+    def setUp(self):
+        Committee.objects.create(code='FINANCE', name='Finance Committee')
+
+    def generate(self, seed):
+        call_command(
+            'generate_scale_data', seed=seed, end_date='2026-01-15', users=40, years=2,
+            bills_per_year=4, open_bills=1, channels=2, messages=120, kai_reports=5,
+            events_per_year=6, folders=2, documents=10, stdout=StringIO(),
+        )
+        return (
+            list(ParliamentUser.objects.filter(user_id__startswith='scale_').values_list('name', 'member_status')),
+            sorted(Vote.objects.values_list('user_id', 'legislation__title', 'vote_choice')),
+        )
+
+    def test_generates_requested_volumes(self):
+        self.generate(seed=1)
+        self.assertEqual(ParliamentUser.objects.filter(user_id__startswith='scale_').count(), 40)
+        self.assertEqual(Legislation.objects.count(), 8)
+        self.assertEqual(Legislation.objects.filter(voting_closed=False).count(), 1)
+        self.assertEqual(ChatMessage.objects.count(), 120)
+        self.assertEqual(CommitteeDocument.objects.count(), 10)
+        # Timestamps are spread over the generated history rather than all being "now"
+        self.assertLess(ChatMessage.objects.order_by('created_at').first().created_at.year, 2026)
+
+    def test_same_seed_is_deterministic(self):
+        first = self.generate(seed=3)
+        call_command('generate_scale_data', flush=True, stdout=StringIO())
+        self.assertFalse(ParliamentUser.objects.filter(user_id__startswith='scale_').exists())
+        self.assertEqual(self.generate(seed=3), first)
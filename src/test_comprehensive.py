@@ -9,6 +9,8 @@ from django.test import TestCase, Client
 from django.urls import reverse
 from django.utils import timezone
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from datetime import timedelta
 from .models import (
     Legislation, Vote, ParliamentUser, Attendance, Committee,
@@ -252,6 +254,59 @@ class LegislationViewTestCase(TestCase):
         self.assertIn('Failed Bill', user_titles)
         self.assertNotIn('Other User Bill', user_titles)
 
+    def test_legislation_history_uses_frozen_result(self):
+        """Test that viewing history reads the stored result instead of recounting votes"""
+        # No votes exist, so recounting would flip this bill to failed
+        self.client.get(reverse('view_legislation_history'))
+        self.passed_leg.refresh_from_db()
+        self.assertTrue(self.passed_leg.passed)
+
+    def test_legislation_history_query_count_is_constant(self):
+        """Test that the history page costs the same number of queries regardless of size"""
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(reverse('view_legislation_history'))
+
+        for i in range(8):
+            leg = Legislation.objects.create(
+                title=f'Extra Bill {i}',
+                description='More history',
+                posted_by=self.user,
+                available_at=timezone.now() - timedelta(days=3 + i),
+                voting_closed=True,
+                document='test.pdf'
+            )
+            Vote.objects.create(user=self.user, legislation=leg, vote_choice='yes')
+
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(reverse('view_legislation_history'))
+
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+        self.assertFalse(any(q['sql'].startswith('UPDATE') for q in large.captured_queries))
+        extra = next(item for item in response.context['legislation_history'] if item['title'] == 'Extra Bill 0')
+        self.assertEqual(extra['yes_votes'], 1)
+        self.assertEqual(extra['total_votes'], 1)
+
+    def test_end_vote_freezes_result(self):
+        """Test that closing a vote stores pass/fail and the close time"""
+        leg = Legislation.objects.create(
+            title='Open Bill',
+            description='Closed by the uploader',
+            posted_by=self.user,
+            available_at=timezone.now() - timedelta(hours=1),
+            vote_mode='percentage',
+            required_percentage='51',
+            document='test.pdf'
+        )
+        Vote.objects.create(user=self.user, legislation=leg, vote_choice='yes')
+
+        self.client.post(reverse('end_vote', args=[leg.id]))
+        leg.refresh_from_db()
+
+        self.assertTrue(leg.voting_closed)
+        self.assertTrue(leg.passed)
+        self.assertEqual(leg.status, 'passed')
+        self.assertIsNotNone(leg.voting_ended_at)
+
 
 class ProfileTestCase(TestCase):
     """Test user profile functionality including preferred name"""
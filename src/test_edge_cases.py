@@ -5,15 +5,27 @@ Tests boundary conditions, error handling, and complex scenarios.
 Run with: python manage.py test src.test_edge_cases
 """
 
-from django.test import TestCase, Client
+import gzip
+import io
+import logging
+import os
+import tempfile
+import time
+import zipfile
+from unittest import mock
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 from datetime import timedelta
 from .models import (
     Legislation, Vote, ParliamentUser, Attendance, Committee,
-    CommitteeLegislation, CommitteeVote, Event
+    CommitteeLegislation, CommitteeVote, Event, ChatReadReceipt, AuditEvent, CommitteeDocument, ChapterFolder, Announcement, _audit_user
 )
+from .storage import DualLocationStorage
+from .upload_handlers import ValidatingUploadHandler, detect_upload_mime
+from .logging_utils import AuditLogEntry, AuditEventHandler, AuditQueueHandler, should_audit, read_log_tail
 
 
 class EdgeCaseVotingTestCase(TestCase):
@@ -147,14 +159,44 @@ class EdgeCaseVotingTestCase(TestCase):
         vote1 = Vote.objects.create(user=voter, legislation=leg, vote_choice='yes')
         self.assertIsNotNone(vote1)
 
-        # Second vote from same user should be prevented or update existing
-        vote_count_before = Vote.objects.filter(user=voter, legislation=leg).count()
-        Vote.objects.create(user=voter, legislation=leg, vote_choice='no')
-        vote_count_after = Vote.objects.filter(user=voter, legislation=leg).count()
+        # Second vote from same user is rejected by the unique constraint
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                Vote.objects.create(user=voter, legislation=leg, vote_choice='no')
 
-        # Depending on implementation, should either be 1 (updated) or 2 (allowed)
-        # This documents the current behavior
-        self.assertGreaterEqual(vote_count_after, vote_count_before)
+        self.assertEqual(Vote.objects.filter(user=voter, legislation=leg).count(), 1)
+
+    def test_duplicate_vote_submission_through_view(self):
+        """Test that a repeated ballot POST is rejected and only counted once"""
+        leg = Legislation.objects.create(
+            title='Double Submit Test',
+            description='Test double submit',
+            posted_by=self.user,
+            available_at=timezone.now() - timedelta(minutes=5),
+            document='test.pdf'
+        )
+
+        voter = ParliamentUser.objects.create_user(
+            user_id='dup2',
+            name='Double Submitter',
+            username='dup2',
+            member_type='Member',
+            password='VoterPass123!'
+        )
+        Attendance.objects.create(user=voter, present=True)
+
+        self.client.force_login(voter)
+        payload = {
+            'legislation_id': leg.id,
+            'vote_choice': 'yes',
+            'password': 'VoterPass123!',
+        }
+        self.client.post(reverse('vote'), payload)
+        response = self.client.post(reverse('vote'), dict(payload, vote_choice='no'), follow=True)
+
+        self.assertEqual(Vote.objects.filter(user=voter, legislation=leg).count(), 1)
+        self.assertEqual(Vote.objects.get(user=voter, legislation=leg).vote_choice, 'yes')
+        self.assertContains(response, 'You have already voted on this legislation.')
 
 
 class IntegrationTestCase(TestCase):
@@ -535,3 +577,1225 @@ class DataIntegrityTestCase(TestCase):
         # Creating another committee with same code should fail
         with self.assertRaises(Exception):
             Committee.objects.create(code='TEST', name='Another Test')
+
+
+class AuditLoggingTestCase(TestCase):
+    """Test the queued, sampled audit logging pipeline"""
+
+    def test_high_frequency_models_are_not_audited_by_default(self):
+        self.assertFalse(should_audit(ChatReadReceipt))
+        self.assertTrue(should_audit(Legislation))
+
+    @override_settings(AUDIT_LOG_SAMPLE_RATES={'ChatReadReceipt': 1.0, 'Legislation': 0.0})
+    def test_sample_rates_can_be_overridden_in_settings(self):
+        self.assertTrue(should_audit(ChatReadReceipt))
+        self.assertFalse(should_audit(Legislation))
+
+    def test_audit_user_does_not_fetch_related_user(self):
+        user = ParliamentUser.objects.create_user(
+            user_id='audit1', name='Audit User', username='audit1', member_type='Chair'
+        )
+        leg = Legislation.objects.create(
+            title='Audit Bill', description='Audit', posted_by=user,
+            available_at=timezone.now(), document='test.pdf'
+        )
+        fresh = Legislation.objects.get(pk=leg.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(_audit_user(fresh), 'audit1')
+
+    def test_queue_handler_writes_batches_off_thread(self):
+        stream = io.StringIO()
+        target = logging.StreamHandler(stream)
+        target.setFormatter(logging.Formatter('%(message)s'))
+        queue_handler = AuditQueueHandler([target], batch_size=10, flush_interval=0.05)
+
+        test_logger = logging.getLogger('audit_queue_test')
+        test_logger.propagate = False
+        test_logger.setLevel(logging.INFO)
+        test_logger.addHandler(queue_handler)
+        try:
+            for i in range(25):
+                test_logger.info(AuditLogEntry(user='System', action='UPDATE', resource_type='Vote', resource_id=i))
+            queue_handler.stop()
+        finally:
+            test_logger.removeHandler(queue_handler)
+
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 25)
+        self.assertEqual(lines[0], '[SUCCESS] | User: System (unknown) | Action: UPDATE | Resource: Vote | ID: 0')
+
+    def test_audit_event_handler_stores_structured_entries(self):
+        handler = AuditEventHandler()
+        records = [
+            logging.LogRecord('security', logging.WARNING, __file__, 0, AuditLogEntry(
+                user='intruder', action='UNAUTHORIZED_ACCESS', details={'path': '/officers/'},
+                status='warning', ip_address='10.0.0.5'
+            ), None, None),
+            # Unstructured messages (log_function_call output) are not stored
+            logging.LogRecord('function_calls', logging.INFO, __file__, 0, 'User x called vote_view', None, None),
+        ]
+        handler.emit_batch(records)
+
+        event = AuditEvent.objects.get(action='UNAUTHORIZED_ACCESS')
+        self.assertEqual(event.username, 'intruder')
+        self.assertEqual(event.action, 'UNAUTHORIZED_ACCESS')
+        self.assertEqual(event.status, 'warning')
+        self.assertEqual(event.ip_address, '10.0.0.5')
+        self.assertEqual(event.details, {'path': '/officers/'})
+        self.assertEqual(event.logger_name, 'security')
+
+    @override_settings(AUDIT_EVENT_LOGGERS=['audit_sync_test'], AUDIT_LOG_QUEUE_LOGGERS=['audit_sync_test'])
+    def test_audit_events_are_written_synchronously_under_tests(self):
+        from .logging_utils import install_audit_queue
+
+        test_logger = logging.getLogger('audit_sync_test')
+        test_logger.propagate = False
+        install_audit_queue()
+        try:
+            self.assertFalse(any(isinstance(h, AuditQueueHandler) for h in test_logger.handlers))
+            test_logger.info(AuditLogEntry(user='synctest', action='CREATE', resource_type='Vote'))
+            # On this thread's connection, so the row is visible (and rolled back with the test)
+            self.assertTrue(AuditEvent.objects.filter(username='synctest').exists())
+        finally:
+            for handler in list(test_logger.handlers):
+                test_logger.removeHandler(handler)
+
+    def test_officer_audit_log_search_filters_and_paginates(self):
+        officer = ParliamentUser.objects.create_user(
+            user_id='auditofficer', name='Audit Officer', username='auditofficer', member_type='Officer'
+        )
+        AuditEvent.objects.bulk_create(
+            [AuditEvent(username='alice', action='DELETE', resource_type='Legislation', resource_id=str(i)) for i in range(60)]
+            + [AuditEvent(username='bob', action='CREATE', resource_type='Vote', resource_id='1')]
+        )
+        self.client.force_login(officer)
+
+        search = {'user': 'ali', 'action': 'delete'}
+        response = self.client.get(reverse('officer_view_logs'), search)
+        self.assertEqual(response.status_code, 200)
+        first_page = response.context['logs']
+        self.assertEqual(len(first_page), 50)
+        self.assertIsNone(response.context['newer_cursor'])
+        self.assertIn('user=ali', response.context['filter_query'])
+
+        response = self.client.get(reverse('officer_view_logs'), {**search, 'before': response.context['older_cursor']})
+        older_page = response.context['logs']
+        self.assertEqual(len(older_page), 10)
+        self.assertIsNone(response.context['older_cursor'])
+        self.assertFalse({log.pk for log in first_page} & {log.pk for log in older_page})
+
+        response = self.client.get(reverse('officer_view_logs'), {**search, 'after': response.context['newer_cursor']})
+        self.assertEqual([log.pk for log in response.context['logs']], [log.pk for log in first_page])
+        self.assertIsNone(response.context['newer_cursor'])
+
+        response = self.client.get(reverse('officer_view_logs'), {'resource_type': 'Vote'})
+        self.assertEqual([log.username for log in response.context['logs']], ['bob'])
+
+
+class LogTailTestCase(TestCase):
+    """Test reading raw log files backwards from EOF, across rotated files"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'django_actions.log')
+        with gzip.open(self.path + '.2.gz', 'wb') as f:
+            f.write(b''.join(b'old %d\n' % i for i in range(3)))
+        with open(self.path + '.1', 'wb') as f:
+            f.write(b''.join(b'mid %d\n' % i for i in range(2)))
+        with open(self.path, 'wb') as f:
+            f.write(b''.join(b'new %d\n' % i for i in range(5)))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_all_pages(self, limit, **kwargs):
+        pages, before = [], None
+        while True:
+            lines, before = read_log_tail(self.path, limit, before, **kwargs)
+            pages.append(lines)
+            if before is None:
+                return pages
+
+    def test_returns_newest_lines_first(self):
+        lines, before = read_log_tail(self.path, 2)
+        self.assertEqual(lines, ['new 4', 'new 3'])
+        self.assertIsNotNone(before)
+
+    def test_pages_back_through_rotated_files(self):
+        pages = self.read_all_pages(3)
+        self.assertEqual(pages, [
+            ['new 4', 'new 3', 'new 2'],
+            ['new 1', 'new 0', 'mid 1'],
+            ['mid 0', 'old 2', 'old 1'],
+            ['old 0'],
+        ])
+
+    def test_block_reader_matches_mmap_reader(self):
+        expected = self.read_all_pages(3)
+        with mock.patch('src.logging_utils.mmap.mmap', side_effect=ValueError):
+            self.assertEqual(self.read_all_pages(3, block_size=4), expected)
+
+    def test_missing_file(self):
+        self.assertEqual(read_log_tail(os.path.join(self.tmp.name, 'missing.log')), ([], None))
+
+
+class DualLocationStorageTestCase(TestCase):
+    """Test the cached media/exportable_media location index"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.media = os.path.join(self.tmp.name, 'media')
+        os.makedirs(os.path.join(self.media, 'legislation_docs'))
+        os.makedirs(os.path.join(self.tmp.name, 'exportable_media', 'legislation_docs'))
+        with open(os.path.join(self.media, 'legislation_docs', 'current.pdf'), 'wb') as f:
+            f.write(b'%PDF current')
+        with open(os.path.join(self.tmp.name, 'exportable_media', 'legislation_docs', 'archived.pdf'), 'wb') as f:
+            f.write(b'%PDF archived')
+
+        settings_override = override_settings(BASE_DIR=self.tmp.name, DUAL_STORAGE_INDEX_REFRESH=3600)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.storage = DualLocationStorage(location=self.media)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_known_files_resolve_without_stat_calls(self):
+        self.storage.exists('legislation_docs/current.pdf')  # builds the index
+
+        with mock.patch('src.storage.os.path.exists', side_effect=AssertionError('stat call')):
+            self.assertTrue(self.storage.exists('legislation_docs/archived.pdf'))
+            self.assertEqual(
+                self.storage.path('legislation_docs/archived.pdf'),
+                os.path.join(self.tmp.name, 'exportable_media', 'legislation_docs', 'archived.pdf'),
+            )
+            self.assertEqual(
+                self.storage.path('legislation_docs/current.pdf'),
+                os.path.join(self.media, 'legislation_docs', 'current.pdf'),
+            )
+
+    def test_saved_and_deleted_files_update_the_index(self):
+        from django.core.files.base import ContentFile
+
+        name = self.storage.save('legislation_docs/new.pdf', ContentFile(b'%PDF new'))
+        with mock.patch('src.storage.os.path.exists', side_effect=AssertionError('stat call')):
+            self.assertTrue(self.storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.storage.delete(name)
+        self.assertFalse(self.storage.exists(name))
+
+    def test_files_added_behind_the_index_are_still_found(self):
+        self.storage.exists('legislation_docs/current.pdf')
+        with open(os.path.join(self.media, 'legislation_docs', 'copied.pdf'), 'wb') as f:
+            f.write(b'%PDF copied')
+
+        self.assertTrue(self.storage.exists('legislation_docs/copied.pdf'))
+
+    def test_identical_uploads_share_one_blob(self):
+        from django.core.files.base import ContentFile
+        from src.models import DocumentBlob
+
+        first = self.storage.save('legislation_docs/bill.pdf', ContentFile(b'%PDF same bytes'))
+        second = self.storage.save('legislation_docs/bill_copy.pdf', ContentFile(b'%PDF same bytes'))
+
+        self.assertEqual(first, second)
+        blob = DocumentBlob.objects.get(name=first)
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(blob.size, len(b'%PDF same bytes'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.storage.delete(first)
+        self.assertTrue(os.path.exists(os.path.join(self.media, first)))
+        self.assertEqual(DocumentBlob.objects.get(name=first).ref_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.storage.delete(second)
+        self.assertFalse(os.path.exists(os.path.join(self.media, first)))
+        self.assertFalse(DocumentBlob.objects.filter(name=first).exists())
+
+
+class BlobReferenceTestCase(TestCase):
+    """Test that replaced and deleted documents release their blobs"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        settings_override = override_settings(MEDIA_ROOT=self.tmp.name, BASE_DIR=self.tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.committee = Committee.objects.create(code='BLOB', name='Blob Committee')
+        self.officer = ParliamentUser.objects.create_user(
+            user_id='blobofficer', name='Blob Officer', username='blobofficer', member_type='Officer'
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _document(self, content):
+        from django.core.files.base import ContentFile
+
+        document = CommitteeDocument(committee=self.committee, title='Minutes', uploaded_by=self.officer)
+        with self.captureOnCommitCallbacks(execute=True):
+            document.document.save('minutes.pdf', ContentFile(content), save=True)
+        return document
+
+    def test_replaced_document_releases_the_old_blob(self):
+        from django.core.files.base import ContentFile
+        from src.models import DocumentBlob
+
+        document = self._document(b'%PDF first draft')
+        old_name = document.document.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            document.document.save('minutes.pdf', ContentFile(b'%PDF second draft'), save=True)
+
+        self.assertFalse(DocumentBlob.objects.filter(name=old_name).exists())
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, old_name)))
+        self.assertEqual(DocumentBlob.objects.get(name=document.document.name).ref_count, 1)
+
+    def test_queryset_delete_releases_blobs(self):
+        from src.models import DocumentBlob
+
+        first = self._document(b'%PDF shared')
+        self._document(b'%PDF shared')
+        name = first.document.name
+        self.assertEqual(DocumentBlob.objects.get(name=name).ref_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CommitteeDocument.objects.filter(pk=first.pk).delete()
+        self.assertEqual(DocumentBlob.objects.get(name=name).ref_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.committee.delete()
+        self.assertFalse(DocumentBlob.objects.filter(name=name).exists())
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, name)))
+
+    def test_reconcile_blobs_recomputes_leaked_references(self):
+        from django.core.management import call_command
+        from src.models import DocumentBlob
+
+        kept = self._document(b'%PDF kept').document.name
+        orphan = self._document(b'%PDF orphan')
+        orphan_name = orphan.document.name
+        # A row removed behind the signals, e.g. with raw SQL
+        CommitteeDocument.objects.filter(pk=orphan.pk)._raw_delete(CommitteeDocument.objects.db)
+        DocumentBlob.objects.filter(name=kept).update(ref_count=5)
+        DocumentBlob.objects.update(created_at=timezone.now() - timedelta(days=1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('reconcile_blobs', stdout=io.StringIO())
+
+        self.assertEqual(DocumentBlob.objects.get(name=kept).ref_count, 1)
+        self.assertFalse(DocumentBlob.objects.filter(name=orphan_name).exists())
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, orphan_name)))
+
+
+class DocumentDownloadTestCase(TestCase):
+    """Test the permission-checked document download endpoint"""
+
+    def setUp(self):
+        from django.core.files.base import ContentFile
+
+        self.tmp = tempfile.TemporaryDirectory()
+        settings_override = override_settings(MEDIA_ROOT=self.tmp.name, BASE_DIR=self.tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.committee = Committee.objects.create(code='DLTEST', name='Download Test Committee')
+        self.officer = ParliamentUser.objects.create_user(
+            user_id='dlofficer', name='Download Officer', username='dlofficer', member_type='Officer'
+        )
+        self.member = ParliamentUser.objects.create_user(
+            user_id='dlmember', name='Download Member', username='dlmember', member_type='Member'
+        )
+        self.document = CommitteeDocument.objects.create(
+            committee=self.committee, title='Budget', uploaded_by=self.officer
+        )
+        self.document.document.save('budget.pdf', ContentFile(b'%PDF-1.4 0123456789'), save=True)
+        self.url = reverse('download_document', args=['committee_document', self.document.id])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_unpublished_document_requires_committee_access(self):
+        self.client.force_login(self.member)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+        self.document.published_to_chapter = True
+        self.document.save()
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_etag_and_range(self):
+        self.client.force_login(self.officer)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.4 0123456789')
+        etag = response['ETag']
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=9-12')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 9-12/19')
+        self.assertEqual(b''.join(response.streaming_content), b'0123')
+
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=50-').status_code, 416)
+
+    @override_settings(DOCUMENT_X_ACCEL_REDIRECT=True)
+    def test_x_accel_redirect_hands_transfer_to_nginx(self):
+        self.client.force_login(self.officer)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected/media/' + self.document.document.name)
+        self.assertEqual(response.content, b'')
+
+    def test_reference_documents_are_served_without_public_media(self):
+        os.makedirs(os.path.join(self.tmp.name, 'legislation_docs'))
+        with open(os.path.join(self.tmp.name, 'legislation_docs', 'Kai-Binder.pdf'), 'wb') as f:
+            f.write(b'%PDF-1.4 binder')
+        self.client.force_login(self.member)
+
+        response = self.client.get(reverse('reference_document', args=['kai-binder']))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.4 binder')
+        self.assertEqual(self.client.get(reverse('reference_document', args=['budget'])).status_code, 404)
+
+    def test_preview_is_generated_lazily_and_cached(self):
+        from .document_previews import PreviewWorker, preview_path
+
+        self.client.force_login(self.officer)
+        preview_url = reverse('document_preview', args=['committee_document', self.document.id])
+
+        with mock.patch.object(PreviewWorker, 'put') as put:
+            response = self.client.get(preview_url)
+        self.assertEqual(response['Content-Type'], 'image/svg+xml')
+        self.assertEqual(response['Cache-Control'], 'no-store')
+        put.assert_called_once()
+
+        # What the worker would have rendered
+        path = preview_path(self.document.document)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b'\x89PNG thumbnail')
+
+        response = self.client.get(preview_url)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(b''.join(response.streaming_content), b'\x89PNG thumbnail')
+
+        response = self.client.get(preview_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_preview_cache_evicts_least_recently_used(self):
+        from .document_previews import evict_previews
+
+        root = os.path.join(self.tmp.name, 'previews')
+        os.makedirs(os.path.join(root, 'ab'))
+        for age, name in enumerate(['newest', 'middle', 'oldest']):
+            path = os.path.join(root, 'ab', f'{name}.png')
+            with open(path, 'wb') as f:
+                f.write(b'x' * 100)
+            mtime = time.time() - age * 1000
+            os.utime(path, (mtime, mtime))
+
+        self.assertEqual(evict_previews(root, max_bytes=250), 1)
+        self.assertEqual(sorted(os.listdir(os.path.join(root, 'ab'))), ['middle.png', 'newest.png'])
+
+class ValidatingUploadHandlerTestCase(TestCase):
+    """Test size and MIME checks applied while an upload streams in"""
+
+    def stream(self, chunks, file_name='bill.pdf', content_length=None):
+        handler = ValidatingUploadHandler()
+        handler.new_file('document', file_name, 'application/pdf', content_length)
+        received = 0
+        for chunk in chunks:
+            handler.receive_data_chunk(chunk, received)
+            received += len(chunk)
+        return handler.file_complete(received)
+
+    def test_accepted_file_is_spooled_to_disk_with_sniffed_type(self):
+        uploaded = self.stream([b'%PDF-1.4\n' + b'0' * 4096, b'1' * 4096])
+        self.assertEqual(uploaded.sniffed_mime, 'application/pdf')
+        self.assertTrue(os.path.exists(uploaded.temporary_file_path()))
+        self.assertEqual(detect_upload_mime(uploaded), 'application/pdf')
+        uploaded.close()
+
+    @override_settings(MAX_UPLOAD_SIZE=8 * 1024)
+    def test_oversized_file_is_rejected_midstream(self):
+        uploaded = self.stream([b'%PDF-1.4\n' + b'0' * 4096, b'1' * 4096, b'2' * 4096])
+        self.assertIn('File size must not exceed', uploaded.upload_error)
+        self.assertEqual(uploaded.read(), b'')
+
+    def test_disallowed_type_is_rejected_from_first_bytes(self):
+        uploaded = self.stream([b'MZ\x90\x00' + b'\x00' * 4096], file_name='bill.pdf')
+        self.assertIn('Invalid file type detected', uploaded.upload_error)
+
+    def test_form_reports_handler_rejection(self):
+        from .forms import LegislationForm
+
+        uploaded = self.stream([b'MZ\x90\x00' + b'\x00' * 4096], file_name='bill.pdf')
+        form = LegislationForm(data={'title': 'Bill'}, files={'document': uploaded})
+        form.is_valid()
+        self.assertIn(uploaded.upload_error, form.errors['document'])
+
+
+class DocumentSearchTestCase(TestCase):
+    """Test text extraction and the full-text document index"""
+
+    def setUp(self):
+        from django.core.files.base import ContentFile
+
+        self.tmp = tempfile.TemporaryDirectory()
+        settings_override = override_settings(MEDIA_ROOT=self.tmp.name, BASE_DIR=self.tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.committee = Committee.objects.create(code='FTS', name='Search Test Committee')
+        self.officer = ParliamentUser.objects.create_user(
+            user_id='ftsofficer', name='Search Officer', username='ftsofficer', member_type='Officer'
+        )
+        self.member = ParliamentUser.objects.create_user(
+            user_id='ftsmember', name='Search Member', username='ftsmember', member_type='Member'
+        )
+        self.document = CommitteeDocument.objects.create(
+            committee=self.committee, title='Bylaws Draft', uploaded_by=self.officer
+        )
+        self.document.document.save('bylaws.docx', ContentFile(self.docx_bytes('A quorum requires two thirds of members.')), save=True)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def docx_bytes(self, text):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('word/document.xml', (
+                '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                f'<w:body><w:p><w:r><w:t>{text}</w:t></w:r></w:p></w:body></w:document>'
+            ))
+        return buffer.getvalue()
+
+    def test_docx_text_is_extracted(self):
+        from .document_search import extract_text
+
+        self.assertIn('quorum requires two thirds', extract_text(self.document.document.path))
+
+    def test_unchanged_files_are_skipped(self):
+        from .document_search import index_document
+
+        self.assertEqual(index_document('committee_document', self.document), 'indexed')
+        self.assertEqual(index_document('committee_document', self.document), 'unchanged')
+
+        self.document.title = 'Bylaws Draft v2'
+        self.assertEqual(index_document('committee_document', self.document), 'indexed')
+
+    def test_search_ranks_matches_and_respects_visibility(self):
+        from .document_search import index_document, search_documents
+
+        index_document('committee_document', self.document)
+
+        results = list(search_documents(self.officer, 'quorum'))
+        self.assertEqual([r.object_id for r in results], [self.document.id])
+        self.assertIn('<mark>quorum</mark>', results[0].headline)
+
+        # Unpublished committee documents are hidden from non-members
+        self.assertEqual(list(search_documents(self.member, 'quorum')), [])
+        self.document.published_to_chapter = True
+        self.document.save()
+        self.assertEqual(len(search_documents(self.member, 'quorum')), 1)
+
+
+class ChapterDocumentsTestCase(TestCase):
+    """Test folder summaries and the lazily loaded folder contents"""
+
+    def setUp(self):
+        self.committee = Committee.objects.create(code='CHDOCS', name='Chapter Docs Committee')
+        self.officer = ParliamentUser.objects.create_user(
+            user_id='chdocsofficer', name='Docs Officer', username='chdocsofficer', member_type='Officer'
+        )
+        self.folder = ChapterFolder.objects.create(name='Policies', created_by=self.officer)
+        for i in range(30):
+            CommitteeDocument.objects.create(
+                committee=self.committee, title=f'Policy {i}', uploaded_by=self.officer,
+                document=f'committee_documents/policy_{i}.pdf', published_to_chapter=True,
+                chapter_folder=self.folder,
+            )
+        CommitteeDocument.objects.create(
+            committee=self.committee, title='Draft', uploaded_by=self.officer,
+            document='committee_documents/draft.pdf', chapter_folder=self.folder,
+        )
+        CommitteeDocument.objects.create(
+            committee=self.committee, title='Loose', uploaded_by=self.officer,
+            document='committee_documents/loose.pdf', published_to_chapter=True,
+        )
+        self.client.force_login(self.officer)
+
+    def test_page_only_loads_folder_summaries(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('chapter_documents'))
+        # Folder summaries and the uncategorized aggregate; no per-document rows
+        document_queries = [q['sql'] for q in queries.captured_queries if 'src_committeedocument' in q['sql']]
+        self.assertEqual(len(document_queries), 2)
+
+        folder = response.context['folders'][0]
+        self.assertEqual(folder.document_count, 30)
+        self.assertEqual(response.context['uncategorized']['document_count'], 1)
+        self.assertEqual(response.context['total_documents'], 31)
+
+    def test_folder_documents_are_paginated(self):
+        url = reverse('chapter_folder_documents', args=[self.folder.id])
+
+        first = self.client.get(url).json()
+        self.assertEqual(first['count'], 30)
+        self.assertEqual(len(first['documents']), 25)
+        self.assertEqual(first['next_page'], 2)
+        self.assertIn('Policy 29', first['html'])
+
+        second = self.client.get(url, {'page': 2}).json()
+        self.assertEqual(len(second['documents']), 5)
+        self.assertIsNone(second['next_page'])
+
+        uncategorized = self.client.get(reverse('chapter_uncategorized_documents')).json()
+        self.assertEqual([doc['title'] for doc in uncategorized['documents']], ['Loose'])
+
+
+class OfficerDocumentFacetsTestCase(TestCase):
+    """Test the faceted counts and paginated listings on the officer reports/activity pages"""
+
+    def setUp(self):
+        self.committee = Committee.objects.create(code='FACET', name='Facet Committee')
+        self.officer = ParliamentUser.objects.create_user(
+            user_id='facetofficer', name='Facet Officer', username='facetofficer', member_type='Officer'
+        )
+        for i in range(30):
+            CommitteeDocument.objects.create(
+                committee=self.committee, title=f'Report {i}', uploaded_by=self.officer,
+                document=f'committee_documents/report_{i}.pdf', document_type='report',
+            )
+        CommitteeDocument.objects.create(
+            committee=self.committee, title='Agenda', uploaded_by=self.officer,
+            document='committee_documents/agenda.pdf', document_type='agenda',
+        )
+        self.client.force_login(self.officer)
+
+    def test_reports_tabs_count_by_type_and_page_the_listing(self):
+        response = self.client.get(reverse('view_all_reports'), {'type': 'report'})
+
+        counts = {tab['type']: tab['count'] for tab in response.context['tabs']}
+        self.assertEqual(counts[''], 31)
+        self.assertEqual(counts['report'], 30)
+        self.assertEqual(counts['agenda'], 1)
+        self.assertEqual(counts['minutes'], 0)
+
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.paginator.count, 30)
+        self.assertEqual(len(page_obj), 25)
+
+    def test_reports_text_filter_counts_the_filtered_listing(self):
+        response = self.client.get(reverse('view_all_reports'), {'q': 'agenda'})
+        self.assertEqual([doc.title for doc in response.context['page_obj']], ['Agenda'])
+
+    def test_activity_facets_cover_all_sections_in_one_query(self):
+        from .view.officer.view_all_activity import activity_facets
+
+        with self.assertNumQueries(1):
+            facets = activity_facets()
+        self.assertEqual(facets['documents']['total'], 31)
+        self.assertEqual(facets['chapter']['total'], Legislation.objects.count())
+
+        response = self.client.get(reverse('view_all_activity'), {'section': 'documents'})
+        self.assertEqual(len(response.context['page_obj']), 25)
+
+
+class DashboardCacheTestCase(TestCase):
+    """Test the per-member-type dashboard fragment cache and its signal invalidation"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.officer = ParliamentUser.objects.create_user(
+            user_id='dashofficer', name='Dash Officer', username='dashofficer', member_type='Officer'
+        )
+        self.member = ParliamentUser.objects.create_user(
+            user_id='dashmember', name='Dash Member', username='dashmember', member_type='Member'
+        )
+
+    def _announcement_queries(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('home'))
+        return response, [q for q in queries.captured_queries if 'src_announcement' in q['sql']]
+
+    def test_cached_widget_skips_its_query_until_an_announcement_is_saved(self):
+        self.client.force_login(self.member)
+        Announcement.objects.create(title='First notice', content='...', posted_by=self.officer)
+
+        response, queries = self._announcement_queries()
+        self.assertContains(response, 'First notice')
+        self.assertEqual(len(queries), 1)
+
+        response, queries = self._announcement_queries()
+        self.assertContains(response, 'First notice')
+        self.assertEqual(queries, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Announcement.objects.create(title='Second notice', content='...', posted_by=self.officer)
+        response, queries = self._announcement_queries()
+        self.assertContains(response, 'Second notice')
+        self.assertEqual(len(queries), 1)
+
+    def test_announcement_widget_is_cached_per_member_type(self):
+        Announcement.objects.create(
+            title='Officers only', content='...', posted_by=self.officer, visible_to=['Officer']
+        )
+
+        self.client.force_login(self.officer)
+        self.assertContains(self.client.get(reverse('home')), 'Officers only')
+
+        self.client.force_login(self.member)
+        self.assertNotContains(self.client.get(reverse('home')), 'Officers only')
+
+
+class CacheNamespaceTestCase(TestCase):
+    """Test namespaced cache keys, version-based invalidation and the officer stats page"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from .caching import CacheNamespace, flush_stats
+        flush_stats()  # drop counts left over from other tests along with the rest of the cache
+        cache.clear()
+        self.namespace = CacheNamespace('test.namespace')
+        self.officer = ParliamentUser.objects.create_user(
+            user_id='cacheofficer', name='Cache Officer', username='cacheofficer', member_type='Officer'
+        )
+
+    def test_invalidate_hides_every_entry_in_the_namespace(self):
+        from .caching import CacheNamespace
+
+        other = CacheNamespace('test.other')
+        self.namespace.set(('a',), 1)
+        other.set(('a',), 2)
+
+        self.namespace.invalidate()
+
+        self.assertIsNone(self.namespace.get('a'))
+        self.assertEqual(other.get('a'), 2)
+
+    def test_memoize_queryset_caches_rows_until_invalidated(self):
+        queryset = ParliamentUser.objects.filter(member_type='Officer').order_by('user_id')
+
+        with self.assertNumQueries(1):
+            first = self.namespace.memoize_queryset('officers', queryset)
+        with self.assertNumQueries(0):
+            second = self.namespace.memoize_queryset('officers', queryset)
+        self.assertEqual([u.pk for u in first], [u.pk for u in second])
+
+        officer = ParliamentUser.objects.create_user(
+            user_id='memoofficer', name='Memo Officer', username='memoofficer', member_type='Officer'
+        )
+        self.namespace.invalidate()
+        with self.assertNumQueries(1):
+            third = self.namespace.memoize_queryset('officers', queryset)
+        self.assertIn(officer.pk, [u.pk for u in third])
+
+    def test_long_keys_are_hashed(self):
+        self.assertLess(len(self.namespace.key('x' * 1000)), 300)
+
+    def test_stats_page_counts_hits_and_misses(self):
+        from .caching import flush_stats
+
+        self.namespace.get_or_set(('k',), lambda: 'v')
+        self.namespace.get_or_set(('k',), lambda: 'v')
+        flush_stats()
+
+        self.client.force_login(self.officer)
+        response = self.client.get(reverse('view_cache_stats'))
+        row = next(ns for ns in response.context['namespaces'] if ns['name'] == 'test.namespace')
+        self.assertEqual((row['hits'], row['misses']), (1, 1))
+
+        response = self.client.post(reverse('clear_cache_namespace'), {'namespace': 'test.namespace'})
+        self.assertRedirects(response, reverse('view_cache_stats'))
+
+
+class RateLimitTestCase(TestCase):
+    """Test the shared sliding-window rate limiter and the endpoints that use it"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def _exhaust(self, limit, identifier):
+        return [limit.hit(identifier).allowed for _ in range(limit.limit + 1)]
+
+    def test_cache_store_allows_limit_hits_then_refuses(self):
+        from .rate_limit import CacheCounterStore, RateLimit
+
+        limit = RateLimit('test', limit=3, window=60, lockout=60, store=CacheCounterStore())
+        self.assertEqual(self._exhaust(limit, '10.0.0.1'), [True, True, True, False])
+        self.assertFalse(limit.peek('10.0.0.1').allowed)
+        self.assertTrue(limit.peek('10.0.0.2').allowed)
+
+        limit.lock_out('10.0.0.1')
+        self.assertTrue(limit.is_locked_out('10.0.0.1'))
+        limit.reset('10.0.0.1')
+        self.assertFalse(limit.is_locked_out('10.0.0.1'))
+        self.assertTrue(limit.hit('10.0.0.1').allowed)
+
+    @mock.patch('src.rate_limit.COUNTER_CLEANUP_PROBABILITY', 0)
+    def test_database_store_counts_with_one_upsert(self):
+        from .models import RateLimitCounter
+        from .rate_limit import DatabaseCounterStore, RateLimit
+
+        limit = RateLimit('test', limit=2, window=60, store=DatabaseCounterStore())
+        with self.assertNumQueries(1):
+            limit.hit('user@example.com')
+        self.assertEqual(self._exhaust(limit, 'user@example.com')[-1], False)
+        self.assertEqual(RateLimitCounter.objects.get().count, 4)
+
+    def test_previous_window_still_counts(self):
+        from .rate_limit import CacheCounterStore, RateLimit
+
+        limit = RateLimit('test', limit=4, window=60, store=CacheCounterStore())
+        with mock.patch('src.rate_limit.time.time', return_value=600 + 59):
+            self._exhaust(limit, 'a')
+        # Just after the window rolls over most of the previous window is still inside the sliding window
+        with mock.patch('src.rate_limit.time.time', return_value=660 + 1):
+            self.assertFalse(limit.hit('a').allowed)
+        with mock.patch('src.rate_limit.time.time', return_value=720 + 50):
+            self.assertTrue(limit.hit('a').allowed)
+
+    @override_settings(RATE_LIMITS={'chat_send': {'limit': 2}})
+    def test_chat_send_is_rate_limited_per_user(self):
+        from .models import ChatChannel
+
+        user = ParliamentUser.objects.create_user(
+            user_id='ratelimited', name='Rate Limited', username='ratelimited', member_type='Officer'
+        )
+        channel = ChatChannel.objects.create(name='rate-limit', channel_type='custom', access_type='open', created_by=user)
+        self.client.force_login(user)
+        url = reverse('send_channel_message', args=[channel.id])
+
+        statuses = [self.client.post(url, {'message': f'hi {i}'}).status_code for i in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+
+    @override_settings(RATE_LIMITS={'login_username': {'limit': 2}})
+    def test_login_attempts_are_counted_before_authenticating(self):
+        from django.contrib import messages
+        from django.contrib.messages.storage.base import Message
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from .middleware import LoginRateLimitMiddleware
+        from .rate_limit import get_rate_limit
+
+        outcome = {'level': messages.ERROR, 'text': 'Invalid username or password.'}
+
+        def login_view(request):
+            request._messages.append(Message(outcome['level'], outcome['text']))
+            return HttpResponse()
+
+        middleware = LoginRateLimitMiddleware(login_view)
+
+        def attempt():
+            request = RequestFactory().post('/login/', {'username': 'target', 'password': 'guess'})
+            request._messages = []
+            return middleware(request).status_code
+
+        self.assertEqual([attempt(), attempt()], [200, 200])
+        # The third guess is refused before it reaches authentication
+        self.assertEqual(attempt(), 403)
+
+        # Form errors don't clear the counter
+        get_rate_limit('login_username').reset('target')
+        outcome.update(text='Both username and password are required.')
+        self.assertEqual([attempt(), attempt(), attempt()], [200, 200, 403])
+
+        get_rate_limit('login_username').reset('target')
+        outcome.update(level=messages.SUCCESS, text='Welcome, Target!')
+        self.assertEqual([attempt(), attempt()], [200, 200])
+        # Each login cleared the counter, so a later typo isn't one away from a lockout
+        outcome.update(level=messages.ERROR, text='Invalid username or password.')
+        self.assertEqual([attempt(), attempt()], [200, 200])
+
+
+class MiddlewareFastPathTestCase(TestCase):
+    """Test that path-scoped middleware leaves static, health and API requests alone"""
+
+    def setUp(self):
+        from django.test import RequestFactory
+        self.factory = RequestFactory()
+        self.user = ParliamentUser.objects.create_user(
+            user_id='mustchange', name='Must Change', username='mustchange', member_type='Member'
+        )
+        self.user.force_password_change = True
+        self.user.save()
+
+    def _middleware(self):
+        from django.http import HttpResponse
+        from .middleware import ForcePasswordChangeMiddleware
+        return ForcePasswordChangeMiddleware(lambda request: HttpResponse('view'))
+
+    def _request(self, path, user, cookie=True):
+        from django.conf import settings
+        from django.utils.functional import SimpleLazyObject
+
+        request = self.factory.get(path)
+        if cookie:
+            request.COOKIES[settings.SESSION_COOKIE_NAME] = 'session'
+        request.user = SimpleLazyObject(user)
+        return request
+
+    def _must_not_load_user(self):
+        raise AssertionError('request.user was evaluated')
+
+    def test_fast_paths_and_anonymous_requests_skip_the_user_lookup(self):
+        middleware = self._middleware()
+        for path in ('/api/channel/1/messages/', '/static/app.css', '/health/'):
+            response = middleware(self._request(path, self._must_not_load_user))
+            self.assertEqual(response.content, b'view')
+
+        response = middleware(self._request('/vote/', self._must_not_load_user, cookie=False))
+        self.assertEqual(response.content, b'view')
+
+    def test_pages_still_redirect_to_forced_password_change(self):
+        middleware = self._middleware()
+        response = middleware(self._request('/vote/', lambda: self.user))
+        self.assertRedirects(response, reverse('forced_password_change'), fetch_redirect_response=False)
+
+        response = middleware(self._request(reverse('logout'), lambda: self.user))
+        self.assertEqual(response.content, b'view')
+
+    def test_health_check_runs_no_queries(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('health'))
+        self.assertEqual(response.content, b'ok')
+
+
+class UserCacheTestCase(TestCase):
+    """Test that authenticated requests reuse cached users until the user changes"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from .user_cache import user_cache
+        cache.clear()
+        user_cache.clear()
+        self.user = ParliamentUser.objects.create_user(
+            user_id='cacheduser', name='Cached User', username='cacheduser', member_type='Member',
+            password='Original-pass-123',
+        )
+        self.client.force_login(self.user)
+
+    def _resolve(self):
+        from django.db import connection
+        from django.test import RequestFactory
+        from django.test.utils import CaptureQueriesContext
+        from .user_cache import get_cached_user
+
+        request = RequestFactory().get('/api/channel/1/messages/')
+        request.session = self.client.session
+        with CaptureQueriesContext(connection) as queries:
+            user = get_cached_user(request)
+        return user, [q for q in queries.captured_queries if 'src_parliamentuser' in q['sql']]
+
+    def test_second_request_skips_the_user_query(self):
+        user, queries = self._resolve()
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(len(queries), 1)
+
+        user, queries = self._resolve()
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(queries, [])
+
+    def test_saving_the_user_invalidates_the_cached_copy(self):
+        self._resolve()
+        ParliamentUser.objects.get(pk=self.user.pk).save()
+
+        user, queries = self._resolve()
+        self.assertEqual(len(queries), 1)
+
+    def test_password_change_logs_the_session_out(self):
+        self._resolve()
+        user = ParliamentUser.objects.get(pk=self.user.pk)
+        user.set_password('Changed-pass-456')
+        user.save()
+
+        user, _ = self._resolve()
+        self.assertFalse(user.is_authenticated)
+
+
+
+class JsonApiTestCase(TestCase):
+    """Test the read-only JSON API's ETags, conditional GETs and invalidation"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.user = ParliamentUser.objects.create_user(
+            user_id='apiuser', name='Api User', username='apiuser', member_type='Member'
+        )
+        self.voter = ParliamentUser.objects.create_user(
+            user_id='apivoter', name='Api Voter', username='apivoter', member_type='Member'
+        )
+        self.legislation = Legislation.objects.create(
+            title='Open Bill', description='...', posted_by=self.user,
+            available_at=timezone.now() - timedelta(minutes=5), document='test.pdf'
+        )
+
+    def test_anonymous_request_gets_json_401(self):
+        response = self.client.get(reverse('api_legislation'))
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('error', response.json())
+
+    def test_matching_etag_gets_304_without_queries(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('api_legislation'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['title'], 'Open Bill')
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/'))
+
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('api_legislation'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual([q for q in queries.captured_queries if 'src_legislation' in q['sql']
+                          or 'src_vote' in q['sql']], [])
+
+    def test_new_vote_changes_the_etag_and_tally(self):
+        self.client.force_login(self.user)
+        etag = self.client.get(reverse('api_legislation'))['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Vote.objects.create(user=self.voter, legislation=self.legislation, vote_choice='yes')
+
+        response = self.client.get(reverse('api_legislation'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['results'][0]['tallies'], {'yes': 1})
+
+    def test_open_tallies_are_only_shown_to_the_uploader_and_officers(self):
+        Vote.objects.create(user=self.voter, legislation=self.legislation, vote_choice='no')
+        officer = ParliamentUser.objects.create_user(
+            user_id='apiofficer', name='Api Officer', username='apiofficer', member_type='Officer'
+        )
+
+        self.client.force_login(self.voter)
+        member_response = self.client.get(reverse('api_legislation'))
+        row = member_response.json()['results'][0]
+        self.assertIsNone(row['tallies'])
+        self.assertIsNone(row['total_votes'])
+
+        self.client.force_login(officer)
+        officer_response = self.client.get(reverse('api_legislation'))
+        self.assertEqual(officer_response.json()['results'][0]['tallies'], {'no': 1})
+        # A member's cached response can't be replayed to an officer, or the other way round
+        self.assertNotEqual(officer_response['ETag'], member_response['ETag'])
+
+        self.legislation.voting_closed = True
+        self.legislation.result_snapshot = {'tallies': {'no': 1}, 'total_votes': 1}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.legislation.save()
+        self.client.force_login(self.voter)
+        response = self.client.get(reverse('api_legislation'), {'status': 'closed'})
+        self.assertEqual(response.json()['results'][0]['tallies'], {'no': 1})
+
+    def test_unknown_document_kind_is_a_400(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('api_documents'), {'kind': 'kai_report'})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(LIVE_TALLY_STREAM_SECONDS=0)
+class LiveTallyStreamTestCase(TestCase):
+    """Test the live vote tally stream and the events ballots publish to it"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.uploader = ParliamentUser.objects.create_user(
+            user_id='streamchair', name='Stream Chair', username='streamchair', member_type='Chair'
+        )
+        self.voter = ParliamentUser.objects.create_user(
+            user_id='streamvoter', name='Stream Voter', username='streamvoter', member_type='Member'
+        )
+        self.legislation = Legislation.objects.create(
+            title='Streamed Bill', description='...', posted_by=self.uploader,
+            available_at=timezone.now(), document='test.pdf'
+        )
+
+    def _events(self, **headers):
+        import json
+        response = self.client.get(reverse('vote_stream', args=['legislation', self.legislation.id]), **headers)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = []
+        for block in b''.join(response.streaming_content).decode().split('\n\n'):
+            fields = dict(line.split(': ', 1) for line in block.splitlines() if line.startswith(('id:', 'event:', 'data:')))
+            if 'data' in fields:
+                events.append((fields['event'], int(fields['id']), json.loads(fields['data'])))
+        return events
+
+    def _vote(self, choice):
+        with self.captureOnCommitCallbacks(execute=True):
+            Vote.objects.create(user=self.voter, legislation=self.legislation, vote_choice=choice)
+
+    def test_first_event_is_the_current_tally(self):
+        self._vote('yes')
+        self.client.force_login(self.uploader)
+        [(event, _, data)] = self._events()
+        self.assertEqual(event, 'tally')
+        self.assertEqual(data['counts'], {'yes': 1, 'no': 0, 'abstain': 0})
+
+    def test_reconnect_replays_ballots_since_last_event_id(self):
+        self.client.force_login(self.uploader)
+        [(_, seq, _)] = self._events()
+        self._vote('no')
+
+        [(event, next_seq, data)] = self._events(HTTP_LAST_EVENT_ID=str(seq))
+        self.assertEqual(event, 'vote')
+        self.assertEqual(next_seq, seq + 1)
+        self.assertEqual((data['choice'], data['voter'], data['total']), ('no', 'Stream Voter', 1))
+
+    def test_anonymous_bill_events_leave_out_the_voter(self):
+        self.legislation.anonymous_vote = True
+        self.legislation.save()
+        self.client.force_login(self.uploader)
+        [(_, seq, _)] = self._events()
+        self._vote('yes')
+
+        [(_, _, data)] = self._events(HTTP_LAST_EVENT_ID=str(seq))
+        self.assertIsNone(data['voter'])
+        self.assertEqual(data['counts']['yes'], 1)
+
+    def test_other_members_cannot_watch(self):
+        self.client.force_login(self.voter)
+        response = self.client.get(reverse('vote_stream', args=['legislation', self.legislation.id]))
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(MEETING_DISPLAY_STREAM_SECONDS=0)
+class MeetingDisplayTestCase(TestCase):
+    """Test the meeting display's cached snapshot and its invalidation"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.officer = ParliamentUser.objects.create_user(
+            user_id='displayofficer', name='Display Officer', username='displayofficer', member_type='Officer'
+        )
+        self.member = ParliamentUser.objects.create_user(
+            user_id='displaymember', name='Display Member', username='displaymember', member_type='Member'
+        )
+        self.legislation = Legislation.objects.create(
+            title='Projected Bill', description='...', posted_by=self.officer,
+            available_at=timezone.now() - timedelta(minutes=1), document='test.pdf'
+        )
+
+    def _vote_queries(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('meeting_display'))
+        return response, [q for q in queries.captured_queries if 'src_vote' in q['sql']]
+
+    def test_display_shows_bills_and_quorum(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.create(user=self.member, present=True)
+        self.client.force_login(self.officer)
+        response = self.client.get(reverse('meeting_display'))
+        self.assertContains(response, 'Projected Bill')
+        self.assertContains(response, '1 present')
+
+    def test_snapshot_is_reused_until_a_ballot_is_cast(self):
+        self.client.force_login(self.officer)
+        _, queries = self._vote_queries()
+        self.assertEqual(len(queries), 1)
+        _, queries = self._vote_queries()
+        self.assertEqual(queries, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Vote.objects.create(user=self.member, legislation=self.legislation, vote_choice='yes')
+        _, queries = self._vote_queries()
+        self.assertEqual(len(queries), 1)
+
+    def test_stream_sends_nothing_when_the_display_is_current(self):
+        self.client.force_login(self.officer)
+        response = self.client.get(reverse('meeting_display_stream'))
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn('event: snapshot', body)
+        key = [line for line in body.splitlines() if line.startswith('id: ')][0][4:]
+
+        response = self.client.get(reverse('meeting_display_stream'), HTTP_LAST_EVENT_ID=key)
+        self.assertNotIn('event: snapshot', b''.join(response.streaming_content).decode())
+
+    def test_members_cannot_open_the_display(self):
+        self.client.force_login(self.member)
+        self.assertEqual(self.client.get(reverse('meeting_display')).status_code, 403)
+
+
+class ResolutionIndexTestCase(TestCase):
+    """Test the section -> resolution index and its incremental updates"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from .models import PassedResolution, ResolutionSectionImpact
+        cache.clear()
+        self.user = ParliamentUser.objects.create_user(
+            user_id='indexuser', name='Index User', username='indexuser', member_type='Officer'
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.resolution = PassedResolution.objects.create(
+                title='Leadership Amendment', description='...', date_passed=timezone.now().date()
+            )
+            self.impact = ResolutionSectionImpact.objects.create(
+                resolution=self.resolution, section_name='Article III', section_anchor='#const-leadership'
+            )
+
+    def test_section_lookup_is_served_from_the_index(self):
+        from .resolution_index import section_counts, section_resolutions
+
+        with self.assertNumQueries(0):
+            [entry] = section_resolutions('const-leadership')
+            counts = section_counts()
+        self.assertEqual(entry['title'], 'Leadership Amendment')
+        self.assertEqual(counts, {'const-leadership': 1})
+
+    def test_moving_an_impact_updates_both_sections(self):
+        from .resolution_index import section_counts, section_resolutions
+
+        self.impact.section_anchor = '#const-meetings'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.impact.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(section_resolutions('const-leadership'), [])
+            self.assertEqual(len(section_resolutions('const-meetings')), 1)
+            self.assertEqual(section_counts(), {'const-meetings': 1})
+
+    def test_inactive_resolutions_leave_the_index(self):
+        from .resolution_index import section_resolutions
+
+        self.resolution.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.resolution.save()
+        self.assertEqual(section_resolutions('const-leadership'), [])
+
+    def test_section_json_and_history_page(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('api_section_resolutions', args=['const-leadership']))
+        self.assertEqual(response.json()['results'][0]['title'], 'Leadership Amendment')
+        response = self.client.get(
+            reverse('api_section_resolutions', args=['const-leadership']), HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(reverse('section_amendment_history', args=['const-leadership']))
+        self.assertContains(response, 'Leadership Amendment')
+        self.assertContains(response, 'Article III')
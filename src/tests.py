@@ -37,6 +37,98 @@ class EndVoteTestCase(TestCase):
         response = self.client.post(reverse('end_vote', args=[self.legislation.id]))
         self.assertEqual(response.status_code, 403)  # Forbidden
 
+class VoteResultSnapshotTestCase(TestCase):
+    def setUp(self):
+        self.uploader = ParliamentUser.objects.create_user(
+            user_id='300', name='Snapshot Chair', username='snapchair', member_type='Chair'
+        )
+        self.client.force_login(self.uploader)
+        self.legislation = Legislation.objects.create(
+            title='Snapshot Bill',
+            description='Result should be frozen at close',
+            document='snapshot.pdf',
+            posted_by=self.uploader,
+            available_at=timezone.now() - timedelta(hours=1),
+        )
+        self.voters = []
+        for i, choice in enumerate(['yes', 'yes', 'no', 'abstain']):
+            voter = ParliamentUser.objects.create_user(
+                user_id=f'snap{i}', name=f'Snap Voter {i}', username=f'snap{i}', member_type='Member'
+            )
+            Attendance.objects.create(user=voter, present=True)
+            Vote.objects.create(user=voter, legislation=self.legislation, vote_choice=choice)
+            self.voters.append(voter)
+
+    def test_end_vote_stores_snapshot(self):
+        response = self.client.post(reverse('end_vote', args=[self.legislation.id]))
+        self.assertEqual(response.status_code, 200)
+
+        self.legislation.refresh_from_db()
+        snapshot = self.legislation.result_snapshot
+        self.assertEqual(snapshot['tallies'], {'yes': 2, 'no': 1, 'abstain': 1})
+        self.assertEqual(snapshot['counted_votes'], 3)
+        self.assertEqual(snapshot['present_count'], 4)
+        self.assertEqual(snapshot['voters']['no'], ['Snap Voter 2'])
+        self.assertTrue(snapshot['passed'])
+        self.assertTrue(self.legislation.passed)
+        self.assertEqual(self.legislation.status, 'passed')
+        self.assertIsNotNone(self.legislation.voting_ended_at)
+        self.assertEqual(list(response.context['in_favor']), ['Snap Voter 0', 'Snap Voter 1'])
+
+    def test_snapshot_is_immutable_once_closed(self):
+        self.client.post(reverse('end_vote', args=[self.legislation.id]))
+        self.legislation.refresh_from_db()
+        original = self.legislation.result_snapshot
+
+        # A late row (e.g. an import) must not change an already-closed result
+        late = ParliamentUser.objects.create_user(
+            user_id='snap_late', name='Late Voter', username='snaplate', member_type='Member'
+        )
+        Vote.objects.create(user=late, legislation=self.legislation, vote_choice='no')
+
+        response = self.client.post(reverse('end_vote', args=[self.legislation.id]))
+        self.legislation.refresh_from_db()
+        self.assertEqual(self.legislation.result_snapshot, original)
+        self.assertEqual(response.context['total_votes'], 3)
+
+    def test_reclosing_legacy_closed_bill_keeps_its_outcome(self):
+        # Closed (as failed) before snapshots existed, and not yet backfilled
+        ended_at = timezone.now() - timedelta(days=30)
+        Legislation.objects.filter(pk=self.legislation.pk).update(
+            voting_closed=True, voting_ended_at=ended_at, passed=False, status='removed'
+        )
+
+        self.client.post(reverse('end_vote', args=[self.legislation.id]))
+        self.legislation.refresh_from_db()
+        self.assertFalse(self.legislation.passed)
+        self.assertEqual(self.legislation.status, 'removed')
+        self.assertEqual(self.legislation.voting_ended_at, ended_at)
+        self.assertFalse(self.legislation.result_snapshot['passed'])
+        self.assertEqual(self.legislation.result_snapshot['closed_at'], ended_at.isoformat())
+
+    def test_anonymous_snapshot_has_no_voter_names(self):
+        self.legislation.anonymous_vote = True
+        self.legislation.save()
+
+        response = self.client.post(reverse('end_vote', args=[self.legislation.id]))
+        self.legislation.refresh_from_db()
+        self.assertIsNone(self.legislation.result_snapshot['voters'])
+        self.assertNotIn('in_favor', response.context)
+
+    def test_result_pages_read_snapshot(self):
+        self.client.post(reverse('end_vote', args=[self.legislation.id]))
+        # Deleting ballots after close shows that result pages no longer recount Vote rows
+        Vote.objects.filter(legislation=self.legislation).delete()
+
+        response = self.client.get(reverse('legislation_detail', args=[self.legislation.id]))
+        self.assertEqual(response.context['vote_result']['yes'], 2)
+
+        response = self.client.get(reverse('passed_legislation'))
+        entry = next(item for item in response.context['passed_legislation'] if item['legislation'].id == self.legislation.id)
+        self.assertEqual(entry['yes'], 2)
+        self.assertEqual(entry['present_count'], 4)
+
+
 class VoteTallyTestCase(TestCase):
     def setUp(self):
         print("\n=== Setting up VoteTallyTestCase ===")
@@ -0,0 +1,143 @@
+"""
+Upload handler that validates files while they stream in.
+
+Django's default handlers keep uploads under FILE_UPLOAD_MAX_MEMORY_SIZE in memory and only
+let forms check size and type once the whole file has arrived. ValidatingUploadHandler sniffs
+the MIME type from the first bytes and counts bytes as they are received: accepted files are
+spooled straight to a temporary file, and oversized or disallowed files stop being stored as
+soon as the problem is seen. Rejected files reach the form as a RejectedUploadedFile carrying
+the error, so the user still gets a normal form error.
+"""
+from functools import wraps
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+import magic  # python-magic for MIME type detection
+
+# Enough of the file for libmagic to recognise PDF, OOXML, OLE and image headers
+SNIFF_BYTES = 2048
+
+DEFAULT_MAX_UPLOAD_SIZE = 20 * 1024 * 1024
+
+# Union of the types the upload forms accept; each form still checks its own narrower list
+DEFAULT_ALLOWED_UPLOAD_TYPES = [
+    'application/pdf',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'application/msword',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'application/vnd.ms-excel',
+    'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+    'application/vnd.ms-powerpoint',
+    'image/jpeg',
+    'image/png',
+]
+
+
+def max_upload_size():
+    return getattr(settings, 'MAX_UPLOAD_SIZE', DEFAULT_MAX_UPLOAD_SIZE)
+
+
+def allowed_upload_types():
+    allowed = set(getattr(settings, 'ALLOWED_UPLOAD_TYPES', DEFAULT_ALLOWED_UPLOAD_TYPES))
+    allowed.update(getattr(settings, 'ALLOWED_DOCUMENT_TYPES', []))
+    return allowed
+
+
+def detect_upload_mime(file):
+    """MIME type sniffed while the file streamed in, or read from its first bytes otherwise"""
+    mime = getattr(file, 'sniffed_mime', None)
+    if mime is None:
+        mime = magic.from_buffer(file.read(SNIFF_BYTES), mime=True)
+        file.seek(0)  # Reset file pointer
+    return mime
+
+
+class RejectedUploadedFile(UploadedFile):
+    """Placeholder for a file the handler refused; holds no content, only the reason"""
+
+    def __init__(self, name, content_type, size, upload_error):
+        super().__init__(BytesIO(), name, content_type, size)
+        self.upload_error = upload_error
+
+
+class ValidatingUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams every file to a temporary file, enforcing MAX_UPLOAD_SIZE and ALLOWED_UPLOAD_TYPES
+    on the fly. Accepted files get a `sniffed_mime` attribute so forms don't re-read them.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.head = b''
+        self.sniffed_mime = None
+        self.upload_error = None
+        self.max_size = max_upload_size()
+
+        # The client-declared length can't be trusted to be small, but a large one can be refused up front
+        if self.content_length is not None and self.content_length > self.max_size:
+            self.reject(f'File size must not exceed {self.max_size // (1024 * 1024)} MB.')
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.upload_error:
+            return None  # keep draining the request without storing anything
+
+        if start + len(raw_data) > self.max_size:
+            self.reject(f'File size must not exceed {self.max_size // (1024 * 1024)} MB.')
+            return None
+
+        if self.sniffed_mime is None:
+            self.head += raw_data[:SNIFF_BYTES - len(self.head)]
+            if len(self.head) >= SNIFF_BYTES:
+                self.sniff()
+                if self.upload_error:
+                    return None
+
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.sniffed_mime is None and not self.upload_error:
+            self.sniff()  # files shorter than SNIFF_BYTES
+
+        if self.upload_error:
+            return RejectedUploadedFile(self.file_name, self.content_type, file_size, self.upload_error)
+
+        file = super().file_complete(file_size)
+        file.sniffed_mime = self.sniffed_mime
+        return file
+
+    def sniff(self):
+        try:
+            self.sniffed_mime = magic.from_buffer(self.head, mime=True)
+        except Exception:
+            self.reject('Unable to verify file type. Please try again.')
+            return
+        if self.sniffed_mime not in allowed_upload_types():
+            self.reject(f'Invalid file type detected: {self.sniffed_mime}. Please upload a valid file.')
+
+    def reject(self, message):
+        self.upload_error = message
+        # Drop whatever was spooled so far
+        self.upload_interrupted()
+
+
+def stream_validated_uploads(view_func):
+    """
+    Parse this view's uploads with ValidatingUploadHandler.
+
+    Upload handlers must be replaced before request.POST is first read, and the CSRF middleware
+    reads it, so the view is CSRF-exempted and the check is re-applied after the handler is set.
+    Must be the outermost decorator.
+    """
+    protected_view = csrf_protect(view_func)
+
+    @csrf_exempt
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not hasattr(request, '_files'):
+            request.upload_handlers = [ValidatingUploadHandler(request)]
+        return protected_view(request, *args, **kwargs)
+    return wrapper
@@ -7,7 +7,7 @@ from src.view.officer import *
 from src.view.committee import *
 from src.view.chat import *
 from src.view.kai_reports import submit_kai_report, view_kai_reports, manage_kai_report, export_kai_reports_csv, print_kai_report, kai_dashboard, bulk_actions_kai_reports, manage_kai_templates, create_kai_template, edit_kai_template, delete_kai_template
-from src.view.chapter_documents import chapter_documents
+from src.view.chapter_documents import chapter_documents, chapter_folder_documents
 from src.view.upload_chapter_document import upload_chapter_document
 from src.view.manage_chapter_document import manage_chapter_document
 from src.view.manage_chapter_documents import manage_chapter_documents
@@ -27,12 +27,15 @@ from src.view.upload_legislation import upload_legislation
 from src.view.end_vote import end_vote
 from src.view.passed_legislation import passed_legislation, PassedLegislationDetailView
 from src.view.legislation_detail import legislation_detail
+from src.view.download_document import download_document, document_preview, reference_document
+from src.view.vote_stream import vote_stream
+from src.view.search_documents import search_documents
 from src.view.edit_legislation import edit_legislation
 from src.view.reopen_legislation import reopen_legislation
 from src.view.submit_new_version import submit_new_version
 from src.view.login_as_view import login_as_view, login_as_user
 from src.view.roberts_rules import roberts_rules
-from src.view.constitution_bylaws import constitution_bylaws
+from src.view.constitution_bylaws import constitution_bylaws, section_amendment_history
 from src.view.passed_resolutions import passed_resolutions
 from src.view.officer_duties_detail import officer_duties_detail
 from src.view.committee_details import committee_details
@@ -40,15 +43,33 @@ from src.view.kai_procedures_detail import kai_procedures_detail
 from src.view.slating_elections_detail import slating_elections_detail
 from src.view.advisors_detail import advisors_detail
 from src.view.academic_standards_detail import academic_standards_detail
+from src.view.health import health
+from src.view.api import (
+    api_legislation, api_committees, api_events, api_announcements, api_documents, api_constitution_sections,
+    api_section_resolutions,
+)
 
 urlpatterns = [
     # General User Pages
     path('', home, name='home'),
     path('login/', login_view, name='login'),
     path('logout/', logout_view, name='logout'),
+    path('health/', health, name='health'),
+
+    # Read-only JSON API
+    path('api/v1/legislation/', api_legislation, name='api_legislation'),
+    path('api/v1/committees/', api_committees, name='api_committees'),
+    path('api/v1/events/', api_events, name='api_events'),
+    path('api/v1/announcements/', api_announcements, name='api_announcements'),
+    path('api/v1/documents/', api_documents, name='api_documents'),
+    path('api/v1/constitution/sections/', api_constitution_sections, name='api_constitution_sections'),
+    path('api/v1/constitution/sections/<slug:anchor>/', api_section_resolutions, name='api_section_resolutions'),
+    path('api/votes/<str:kind>/<int:pk>/stream/', vote_stream, name='vote_stream'),
+    path('api/meeting-display/stream/', meeting_display_stream, name='meeting_display_stream'),
     path('roberts-rules/', roberts_rules, name='roberts_rules'),
     path('constitution-bylaws/', constitution_bylaws, name='constitution_bylaws'),
     path('constitution-bylaws/passed-resolutions/', passed_resolutions, name='passed_resolutions_detail'),
+    path('constitution-bylaws/sections/<slug:anchor>/history/', section_amendment_history, name='section_amendment_history'),
     path('constitution-bylaws/officer-duties/', officer_duties_detail, name='officer_duties_detail'),
     path('constitution-bylaws/committees/', committee_details, name='committee_details'),
     path('constitution-bylaws/kai-procedures/', kai_procedures_detail, name='kai_procedures_detail'),
@@ -68,6 +89,8 @@ urlpatterns = [
     path('change_password/', change_password, name='change_password'),
     path('forced-password-change/', forced_password_change, name='forced_password_change'),
     path('chapter-documents/', chapter_documents, name='chapter_documents'),
+    path('chapter-documents/folders/<int:folder_id>/documents/', chapter_folder_documents, name='chapter_folder_documents'),
+    path('chapter-documents/folders/uncategorized/documents/', chapter_folder_documents, name='chapter_uncategorized_documents'),
     path('chapter-documents/manage-all/', manage_chapter_documents, name='manage_chapter_documents'),
     path('chapter-documents/upload/', upload_chapter_document, name='upload_chapter_document'),
     path('chapter-documents/manage/<int:doc_id>/', manage_chapter_document, name='manage_chapter_document'),
@@ -84,6 +107,10 @@ urlpatterns = [
     path('officers/all-reports/', view_all_reports, name='view_all_reports'),
     path('officers/all-activity/', view_all_activity, name='view_all_activity'),
     path('officers/archived-events/', view_archived_events, name='view_archived_events'),
+    path('officers/audit-log/', view_logs, name='officer_view_logs'),
+    path('officers/cache-stats/', view_cache_stats, name='view_cache_stats'),
+    path('officers/cache-stats/clear/', clear_cache_namespace, name='clear_cache_namespace'),
+    path('officers/meeting-display/', meeting_display, name='meeting_display'),
     path('attendance/', attendance, name='attendance'),
     path('make_event/', make_event, name='make_event'),
     path('manage_event/', manage_event, name='manage_event'),
@@ -121,6 +148,10 @@ urlpatterns = [
     path('legislation/detail/<int:pk>/', PassedLegislationDetailView.as_view(), name='passed_legislation_detail'),
     path('legislation/<int:legislation_id>/', legislation_detail, name='legislation_detail'),
     path('legislation/history/', view_legislation_history, name='view_legislation_history'),
+    path('documents/search/', search_documents, name='search_documents'),
+    path('documents/<str:kind>/<int:pk>/', download_document, name='download_document'),
+    path('documents/<str:kind>/<int:pk>/preview.png', document_preview, name='document_preview'),
+    path('documents/reference/<slug:name>/', reference_document, name='reference_document'),
     path('legislation/<int:legislation_id>/edit/', edit_legislation, name='edit_legislation'),
     path('legislation/<int:legislation_id>/reopen/', reopen_legislation, name='reopen_legislation'),
     path('legislation/<int:legislation_id>/submit_new_version/', submit_new_version, name='submit_new_version'),
@@ -0,0 +1,124 @@
+"""
+In-process cache of authenticated users.
+
+django.contrib.auth loads the session's user with a query on every request, which the chat and
+calendar polling endpoints pay every few seconds per member. CachedAuthenticationMiddleware (see
+src/middleware.py) resolves request.user through get_cached_user instead, which keeps recently
+seen users in a small per-worker LRU keyed by (user ID, session auth hash). The session auth hash
+is derived from the password hash, so a password change never matches an old entry.
+
+Any save or delete of a user bumps a per-user version in the shared cache, so every worker drops
+its copy on the next request; USER_CACHE_TTL bounds staleness if that version key is evicted.
+The session itself is cheap to load with SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+(a system check warns about the plain database engine).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+from django.core import checks
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save
+from django.utils.crypto import constant_time_compare
+
+DEFAULT_USER_CACHE_SIZE = 256
+DEFAULT_USER_CACHE_TTL = 300
+
+
+def user_version_key(user_id):
+    return f'user_version:{user_id}'
+
+
+class UserCache:
+    """Thread-safe LRU of user field values, each tagged with the user's shared version"""
+
+    def __init__(self, size=None, ttl=None):
+        self.size = size or getattr(settings, 'USER_CACHE_SIZE', DEFAULT_USER_CACHE_SIZE)
+        self.ttl = ttl or getattr(settings, 'USER_CACHE_TTL', DEFAULT_USER_CACHE_TTL)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, cached_version, names, values = entry
+            if cached_version != version or expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        # A fresh instance per request, so nothing a view sets on request.user leaks into the cache
+        return get_user_model().from_db(DEFAULT_DB_ALIAS, names, values)
+
+    def set(self, key, version, user):
+        names = [field.attname for field in user._meta.concrete_fields]
+        values = [getattr(user, name) for name in names]
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, version, names, values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def discard_user(self, user_id):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+def get_cached_user(request):
+    """request.user for a request, from the user cache when the session's user is in it"""
+    session = request.session
+    try:
+        user_id = get_user_model()._meta.pk.to_python(session[SESSION_KEY])
+        backend_path = session[BACKEND_SESSION_KEY]
+        session_hash = session[HASH_SESSION_KEY]
+    except KeyError:
+        return auth.get_user(request)
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return auth.get_user(request)
+
+    key = (user_id, session_hash)
+    version = cache.get(user_version_key(user_id), 0)
+    user = user_cache.get(key, version)
+    if user is not None:
+        return user
+
+    # Miss: Django loads the user and verifies the session hash (flushing the session if it fails)
+    user = auth.get_user(request)
+    if user.is_authenticated and constant_time_compare(session_hash, user.get_session_auth_hash()):
+        user_cache.set(key, version, user)
+    return user
+
+
+def _invalidate_user(sender, instance, **kwargs):
+    user_cache.discard_user(instance.pk)
+    cache.set(user_version_key(instance.pk), time.time_ns(), None)
+
+
+post_save.connect(_invalidate_user, sender=settings.AUTH_USER_MODEL, dispatch_uid='user_cache_save')
+post_delete.connect(_invalidate_user, sender=settings.AUTH_USER_MODEL, dispatch_uid='user_cache_delete')
+
+
+@checks.register(checks.Tags.security, deploy=True)
+def check_session_engine(app_configs, **kwargs):
+    """Every request reads its session; the plain database engine makes that a query each time"""
+    if getattr(settings, 'SESSION_ENGINE', '') == 'django.contrib.sessions.backends.db':
+        return [checks.Warning(
+            'Sessions are read from the database on every request.',
+            hint="Set SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db' "
+                 "(or 'signed_cookies') with a shared cache.",
+            id='src.W002',
+        )]
+    return []
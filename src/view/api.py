@@ -0,0 +1,201 @@
+from collections import defaultdict
+
+from django.core.paginator import Paginator
+from django.db.models import Count, Q
+from django.urls import reverse
+from django.utils import timezone
+
+from src.api import API_PAGE_SIZE, ApiError, api_endpoint
+from src.document_search import viewable_committees
+from src.resolution_index import section_counts, section_resolutions
+from src.models import (
+    Announcement, Committee, CommitteeDocument, Event, Legislation, PassedResolution, Vote,
+)
+
+
+def _member_type_scope(request):
+    return request.user.member_type
+
+
+def _officer_scope(request):
+    # Officers see everything; everyone else sees what they posted or their committee memberships allow
+    return 'officers' if request.user.can_view_officer_pages else request.user.pk
+
+
+def _can_see_open_tally(user, row):
+    """Same rule as the live tally stream: the bill's uploader and officers"""
+    return user.can_view_officer_pages or row['posted_by_id'] == user.pk
+
+
+def _visible_to_filter(member_type):
+    """Rows with no audience restriction, or whose visible_to list includes member_type"""
+    return Q(visible_to__isnull=True) | Q(visible_to=[]) | Q(visible_to__contains=[member_type])
+
+
+def _page(request, queryset):
+    """(rows, page metadata) for ?page= with API_PAGE_SIZE rows per page"""
+    page = Paginator(queryset, API_PAGE_SIZE).get_page(request.GET.get('page'))
+    meta = {
+        'page': page.number,
+        'pages': page.paginator.num_pages,
+        'count': page.paginator.count,
+    }
+    return list(page.object_list), meta
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+@api_endpoint('legislation', scope=_officer_scope, time_bucket=60)
+def api_legislation(request):
+    """
+    Bills open for voting (?status=open, the default), or closed bills with their frozen
+    results (?status=closed&page=). Open bills carry live tallies only for their uploader and
+    officers; everyone else gets null until the vote closes.
+    """
+    fields = ('id', 'title', 'available_at', 'vote_mode', 'anonymous_vote', 'voting_ended_at', 'passed')
+    if request.GET.get('status') == 'closed':
+        rows, meta = _page(request, Legislation.objects.filter(voting_closed=True)
+                           .order_by('-voting_ended_at', '-id').values(*fields, 'result_snapshot'))
+        for row in rows:
+            snapshot = row.pop('result_snapshot') or {}
+            row['tallies'] = snapshot.get('tallies')
+            row['total_votes'] = snapshot.get('total_votes')
+        return {'status': 'closed', 'results': _serialize_legislation(rows), **meta}
+
+    rows = list(Legislation.objects.filter(voting_closed=False, available_at__lte=timezone.now())
+                .order_by('available_at', 'id').values(*fields, 'posted_by_id'))
+    watched = {row['id'] for row in rows if _can_see_open_tally(request.user, row)}
+    # One GROUP BY for every open bill's tally the caller may see
+    tallies = defaultdict(dict)
+    if watched:
+        for legislation_id, choice, count in (
+            Vote.objects.filter(legislation_id__in=watched)
+            .values_list('legislation_id', 'vote_choice').annotate(count=Count('id'))
+        ):
+            tallies[legislation_id][choice] = count
+    for row in rows:
+        del row['posted_by_id']
+        if row['id'] in watched:
+            row['tallies'] = tallies.get(row['id'], {})
+            row['total_votes'] = sum(row['tallies'].values())
+        else:
+            row['tallies'] = row['total_votes'] = None
+    return {'status': 'open', 'results': _serialize_legislation(rows)}
+
+
+def _serialize_legislation(rows):
+    for row in rows:
+        row['available_at'] = _iso(row['available_at'])
+        row['voting_ended_at'] = _iso(row['voting_ended_at'])
+        row['url'] = reverse('legislation_detail', args=[row['id']])
+    return rows
+
+
+@api_endpoint('committees')
+def api_committees(request):
+    """Committees with their chairs' names"""
+    committees = (
+        Committee.objects.only('id', 'code', 'name').order_by('name')
+        .prefetch_related('chairs')
+    )
+    return {'results': [
+        {
+            'id': committee.id,
+            'code': committee.code,
+            'name': committee.name,
+            'chairs': [chair.name for chair in committee.chairs.all()],
+        }
+        for committee in committees
+    ]}
+
+
+@api_endpoint('events', scope=_member_type_scope, time_bucket=60)
+def api_events(request):
+    """Upcoming events the member's type may see"""
+    events = (
+        Event.objects.filter(is_active=True, archived=False, date_time__gte=timezone.now())
+        .filter(_visible_to_filter(request.user.member_type))
+        .order_by('date_time')
+        .values('id', 'title', 'description', 'date_time', 'location')[:API_PAGE_SIZE]
+    )
+    return {'results': [{**event, 'date_time': _iso(event['date_time'])} for event in events]}
+
+
+@api_endpoint('announcements', scope=_member_type_scope, time_bucket=60)
+def api_announcements(request):
+    """Published announcements the member's type may see, newest first"""
+    announcements = (
+        Announcement.objects.filter(is_active=True)
+        .filter(Q(publish_at__isnull=True) | Q(publish_at__lte=timezone.now()))
+        .filter(_visible_to_filter(request.user.member_type))
+        .order_by('-posted_at')
+        .values('id', 'title', 'content', 'posted_at', 'event_date', 'posted_by__name')[:API_PAGE_SIZE]
+    )
+    return {'results': [
+        {
+            'id': row['id'],
+            'title': row['title'],
+            'content': row['content'],
+            'posted_at': _iso(row['posted_at']),
+            'event_date': _iso(row['event_date']),
+            'posted_by': row['posted_by__name'],
+        }
+        for row in announcements
+    ]}
+
+
+def _committee_documents(user):
+    documents = CommitteeDocument.objects.all()
+    if not user.can_view_officer_pages:
+        documents = documents.filter(Q(published_to_chapter=True) | Q(committee__in=viewable_committees(user)))
+    return (documents.order_by('-uploaded_at', '-id')
+            .values('id', 'title', 'description', 'uploaded_at', 'document_type', 'committee__code'))
+
+
+# kind -> rows the user may download, newest first (same checks as download_document)
+API_DOCUMENT_KINDS = {
+    'legislation': lambda user: Legislation.objects.exclude(document='')
+    .order_by('-created_at', '-id').values('id', 'title', 'description', 'created_at'),
+    'committee_document': _committee_documents,
+    'passed_resolution': lambda user: PassedResolution.objects.exclude(document__isnull=True)
+    .exclude(document='').order_by('-date_passed', '-id').values('id', 'title', 'description', 'date_passed'),
+}
+
+
+@api_endpoint('documents', scope=_officer_scope)
+def api_documents(request):
+    """Downloadable documents of one ?kind= (legislation by default), paginated with ?page="""
+    kind = request.GET.get('kind', 'legislation')
+    if kind not in API_DOCUMENT_KINDS:
+        raise ApiError(f'Unknown kind; expected one of {", ".join(API_DOCUMENT_KINDS)}')
+
+    rows, meta = _page(request, API_DOCUMENT_KINDS[kind](request.user))
+    for row in rows:
+        for field in ('created_at', 'uploaded_at', 'date_passed'):
+            if field in row:
+                row[field] = _iso(row[field])
+        if 'committee__code' in row:
+            row['committee'] = row.pop('committee__code')
+        row['url'] = reverse('download_document', args=[kind, row['id']])
+    return {'kind': kind, 'results': rows, **meta}
+
+
+@api_endpoint('resolutions')
+def api_constitution_sections(request):
+    """Number of passed resolutions that amended each Constitution & Bylaws section"""
+    return {'sections': section_counts()}
+
+
+@api_endpoint('resolutions')
+def api_section_resolutions(request, anchor):
+    """Passed resolutions that amended one section, oldest first (lazy-loaded by the constitution page)"""
+    return {
+        'section': anchor,
+        'history_url': reverse('section_amendment_history', args=[anchor]),
+        'results': [
+            {**entry, 'date_passed': _iso(entry['date_passed'])}
+            for entry in section_resolutions(anchor)
+        ],
+    }
@@ -1,32 +1,35 @@
-from django.shortcuts import render
+from django.shortcuts import render, get_object_or_404
 from src.models import CommitteeDocument, Committee, ChapterFolder
 from django.contrib.auth.decorators import login_required
-from collections import defaultdict
+from django.core.paginator import Paginator
+from django.db.models import Count, Max, Q
+from django.http import JsonResponse
+from django.template.loader import render_to_string
+from django.views.decorators.http import require_GET
+
+FOLDER_PAGE_SIZE = 25
+
 
 @login_required
 def chapter_documents(request):
-    """View for displaying all documents published to the chapter, organized by folder"""
-    documents = CommitteeDocument.objects.filter(published_to_chapter=True).select_related('committee', 'uploaded_by', 'chapter_folder')
-
-    # Get all folders
-    all_folders = ChapterFolder.objects.all()
+    """
+    View for displaying all documents published to the chapter, organized by folder.
 
-    # Organize documents by folder - include ALL folders even if empty
-    folders_with_documents = []
-    uncategorized_documents = []
+    Only folder summaries are loaded here (one annotated query, plus one aggregate for
+    uncategorized documents); each folder's documents are fetched from
+    chapter_folder_documents when it is expanded.
+    """
+    published = Q(documents__published_to_chapter=True)
+    folders = ChapterFolder.objects.annotate(
+        document_count=Count('documents', filter=published),
+        latest_upload=Max('documents__uploaded_at', filter=published),
+    ).order_by('name')
 
-    # First, create dict of documents by folder
-    docs_by_folder_id = defaultdict(list)
-    for doc in documents:
-        if doc.chapter_folder:
-            docs_by_folder_id[doc.chapter_folder.id].append(doc)
-        else:
-            uncategorized_documents.append(doc)
+    uncategorized = CommitteeDocument.objects.filter(
+        published_to_chapter=True, chapter_folder__isnull=True
+    ).aggregate(document_count=Count('id'), latest_upload=Max('uploaded_at'))
 
-    # Now pair each folder with its documents (empty list if no documents)
-    for folder in all_folders.order_by('name'):
-        folder_documents = docs_by_folder_id.get(folder.id, [])
-        folders_with_documents.append((folder, folder_documents))
+    total_documents = sum(folder.document_count for folder in folders) + uncategorized['document_count']
 
     # Check if user is officer (for uploads and document management)
     is_officer = request.user.member_type == 'Officer'
@@ -34,10 +37,52 @@ def chapter_documents(request):
     is_admin = request.user.is_admin
 
     return render(request, 'chapter_documents.html', {
-        'folders_with_documents': folders_with_documents,
-        'uncategorized_documents': uncategorized_documents,
-        'all_folders': all_folders,
-        'total_documents': documents.count(),
+        'folders': folders,
+        'uncategorized': uncategorized,
+        'total_documents': total_documents,
         'is_officer': is_officer,
         'is_admin': is_admin,
     })
+
+
+@require_GET
+@login_required
+def chapter_folder_documents(request, folder_id=None):
+    """
+    One page of a folder's published documents as JSON (folder_id None = uncategorized).
+
+    Returns the rendered list items alongside the document data, so the page can append them
+    with the same markup as before.
+    """
+    documents = CommitteeDocument.objects.filter(published_to_chapter=True)
+    if folder_id is None:
+        documents = documents.filter(chapter_folder__isnull=True)
+    else:
+        folder = get_object_or_404(ChapterFolder, pk=folder_id)
+        documents = documents.filter(chapter_folder=folder)
+
+    documents = documents.select_related('committee', 'uploaded_by').order_by('-uploaded_at', '-id')
+    page_obj = Paginator(documents, FOLDER_PAGE_SIZE).get_page(request.GET.get('page'))
+
+    is_officer = request.user.member_type == 'Officer'
+    return JsonResponse({
+        'documents': [
+            {
+                'id': doc.id,
+                'title': doc.title,
+                'committee': doc.committee.code,
+                'uploaded_by': doc.uploaded_by.name,
+                'uploaded_at': doc.uploaded_at.isoformat(),
+                'document_type': doc.document_type,
+            }
+            for doc in page_obj
+        ],
+        'html': ''.join(
+            render_to_string('chapter_documents_item.html', {'doc': doc, 'is_officer': is_officer}, request=request)
+            for doc in page_obj
+        ),
+        'page': page_obj.number,
+        'num_pages': page_obj.paginator.num_pages,
+        'count': page_obj.paginator.count,
+        'next_page': page_obj.next_page_number() if page_obj.has_next() else None,
+    })
@@ -3,6 +3,7 @@ from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse, HttpResponseForbidden
 from django.utils import timezone
 from src.models import ChatChannel, ChatMessage, ChatReadReceipt
+from src.rate_limit import get_rate_limit
 
 
 @login_required
@@ -129,6 +130,13 @@ def send_channel_message(request, channel_id):
     if len(message_text) > 2000:
         return JsonResponse({'error': 'Message too long (max 2000 characters)'}, status=400)
 
+    rate = get_rate_limit('chat_send').hit(request.user.pk)
+    if not rate.allowed:
+        return JsonResponse(
+            {'error': 'You are sending messages too quickly. Please wait a moment.'},
+            status=429, headers={'Retry-After': str(rate.retry_after)},
+        )
+
     # Create message
     message = ChatMessage.objects.create(
         channel=channel,
@@ -37,6 +37,10 @@ def committee_push_to_chapter(request, code):
             plurality_options=committee_leg.plurality_options,
         )
 
+        # The chapter copy shares the committee document's stored file
+        if committee_leg.document:
+            committee_leg.document.storage.add_reference(committee_leg.document.name)
+
         # Mark as pushed
         committee_leg.pushed_to_chapter = True
         committee_leg.chapter_legislation = chapter_leg
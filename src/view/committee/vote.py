@@ -4,8 +4,11 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 from django.contrib import messages
 from django.contrib.auth import authenticate
+from django.db import IntegrityError, transaction
 from datetime import timedelta
 from src.models import Committee, CommitteeLegislation, CommitteeVote, Attendance
+from src.rate_limit import get_rate_limit
+from src.live_tally import tally_counts
 import logging
 
 logger = logging.getLogger('function_calls')
@@ -31,6 +34,11 @@ def committee_vote(request, code):
 
     # Handle voting
     if request.method == 'POST' and 'vote_choice' in request.POST and can_vote:
+        # Ballots carry the member's password, so limit them like logins
+        if not get_rate_limit('vote').hit(user.pk).allowed:
+            messages.error(request, "Too many vote attempts. Please wait a minute and try again.")
+            return redirect('vote', code=code)
+
         password = request.POST.get('password')
         auth_user = authenticate(request, username=user.username, password=password)
 
@@ -38,10 +46,6 @@ def committee_vote(request, code):
             legislation_id = request.POST.get('legislation_id')
             legislation = get_object_or_404(CommitteeLegislation, id=legislation_id)
 
-            if CommitteeVote.objects.filter(user=user, legislation=legislation).exists():
-                messages.error(request, "You have already voted on this legislation.")
-                return redirect('vote', code=code)
-
             if legislation.voting_closed:
                 messages.error(request, "Voting on this legislation has ended.")
                 return redirect('vote', code=code)
@@ -51,7 +55,13 @@ def committee_vote(request, code):
                 messages.error(request, "Invalid vote option.")
                 return redirect('vote', code=code)
 
-            CommitteeVote.objects.create(user=user, legislation=legislation, vote_choice=vote_choice)
+            # Duplicate ballots are rejected by the (user, legislation) unique constraint
+            try:
+                with transaction.atomic():
+                    CommitteeVote.objects.create(user=user, legislation=legislation, vote_choice=vote_choice)
+            except IntegrityError:
+                messages.error(request, "You have already voted on this legislation.")
+                return redirect('vote', code=code)
 
             logger.info(
                 f"{user.username} voted '{vote_choice}' on committee legislation '{legislation.title}' (ID: {legislation.id})")
@@ -74,18 +84,9 @@ def committee_vote(request, code):
     vote_data = {}
     if is_chair:
         for leg in CommitteeLegislation.objects.filter(committee=committee, posted_by=user):
-            votes = CommitteeVote.objects.filter(legislation=leg)
-            if leg.vote_mode == 'plurality':
-                tally = {opt: votes.filter(vote_choice=opt).count() for opt in leg.plurality_options}
-                tally['total'] = votes.count()
-                vote_data[leg.id] = tally
-            else:
-                vote_data[leg.id] = {
-                    'yes': votes.filter(vote_choice='yes').count(),
-                    'no': votes.filter(vote_choice='no').count(),
-                    'abstain': votes.filter(vote_choice='abstain').count(),
-                    'total': votes.count()
-                }
+            tally = tally_counts('committee_legislation', leg)
+            tally['total'] = sum(tally.values())
+            vote_data[leg.id] = tally
 
     return render(request, 'committee/vote.html', {
         'committee': committee,
@@ -1,6 +1,8 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 
+from src.resolution_index import section_resolutions
+
 
 @login_required
 def constitution_bylaws(request):
@@ -8,3 +10,18 @@ def constitution_bylaws(request):
     Display the chapter's Constitution and Bylaws with navigation and search functionality.
     """
     return render(request, 'constitution_bylaws.html')
+
+
+@login_required
+def section_amendment_history(request, anchor):
+    """
+    Every passed resolution that amended one section of the Constitution & Bylaws, read from
+    the cached resolution index.
+    """
+    resolutions = section_resolutions(anchor)
+    section_name = resolutions[0]['sections'][0] if resolutions else anchor
+    return render(request, 'section_amendment_history.html', {
+        'anchor': anchor,
+        'section_name': section_name,
+        'resolutions': resolutions,
+    })
@@ -0,0 +1,259 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.http import content_disposition_header, http_date, parse_etags
+from django.utils.text import get_valid_filename
+from django.views.decorators.http import require_GET
+
+from src.models import (
+    Committee, CommitteeDocument, CommitteeLegislation, CommitteeMinutes, CommitteePermissions,
+    KaiReport, Legislation, PassedResolution,
+)
+from src.storage import DualLocationStorage, is_blob_name
+from src.document_previews import can_preview, schedule_preview, touch_preview
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# Shown while a preview is being rendered; not cached so the real thumbnail appears on the next load
+PREVIEW_PLACEHOLDER_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="320" height="414" viewBox="0 0 320 414">'
+    '<rect width="320" height="414" fill="#f3f4f6"/>'
+    '<path d="M120 150h80M120 190h80M120 230h50" stroke="#9ca3af" stroke-width="8" stroke-linecap="round"/>'
+    '</svg>'
+)
+
+
+def _can_view_committee_item(user, item):
+    committee = item.committee
+    return (
+        user.can_view_officer_pages
+        or committee.is_member(user)
+        or committee.is_chair(user)
+        or CommitteePermissions.objects.filter(user=user, committee=committee, can_view_docs=True).exists()
+    )
+
+
+def _can_view_committee_document(user, document):
+    return document.published_to_chapter or _can_view_committee_item(user, document)
+
+
+def _can_view_kai_report(user, report):
+    if user.is_admin or report.submitted_by_id == user.pk:
+        return True
+    kai_committee = Committee.objects.filter(code='KAI').first()
+    return kai_committee is not None and kai_committee.is_chair(user)
+
+
+# kind -> (model, file field, permission check); checks follow the pages that list each document
+DOWNLOADABLE_DOCUMENTS = {
+    'legislation': (Legislation, 'document', lambda user, obj: True),
+    'committee_legislation': (CommitteeLegislation, 'document', _can_view_committee_item),
+    'committee_document': (CommitteeDocument, 'document', _can_view_committee_document),
+    'committee_minutes': (CommitteeMinutes, 'document', _can_view_committee_item),
+    'kai_report': (KaiReport, 'attachment', _can_view_kai_report),
+    'passed_resolution': (PassedResolution, 'document', lambda user, obj: True),
+}
+
+# name -> file in the document storage; chapter-wide reference PDFs linked from static pages
+REFERENCE_DOCUMENTS = {
+    'code-of-beta-theta-pi': 'legislation_docs/Code-of-Beta-Theta-Pi_44th-Edition_10.18.2022.pdf',
+    'constitution-and-bylaws': 'legislation_docs/Constitution and Bylaws of the Samford Chapter - August 2025.pdf',
+    'kai-binder': 'legislation_docs/Kai-Binder.pdf',
+    'trial-by-chapter-overview': 'legislation_docs/Trial-By-Chapter-Overview.pdf',
+}
+
+
+def _get_document(kind, pk):
+    """Return (object, file, permission check) for a DOWNLOADABLE_DOCUMENTS kind"""
+    if kind not in DOWNLOADABLE_DOCUMENTS:
+        raise Http404("Unknown document type")
+
+    model, field_name, can_view = DOWNLOADABLE_DOCUMENTS[kind]
+    queryset = model.objects.select_related('committee') if hasattr(model, 'committee') else model.objects.all()
+    obj = get_object_or_404(queryset, pk=pk)
+    return obj, getattr(obj, field_name), can_view
+
+
+def _storage_root(storage, path):
+    """Return (root, internal URL prefix) for the storage location that contains path"""
+    roots = [(storage.location, '/protected/media/')]
+    exportable_location = getattr(storage, 'exportable_location', None)
+    if exportable_location:
+        roots.append((exportable_location, '/protected/exportable_media/'))
+
+    for root, prefix in roots:
+        if path.startswith(os.path.join(root, '')):
+            return root, prefix
+    raise Http404("Document not found")
+
+
+def _parse_range(header, size):
+    """Return (start, end) for a single satisfiable byte range, None for no/ignored range, or False if unsatisfiable"""
+    match = RANGE_RE.match(header.strip())
+    if not match or size == 0:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _stream_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+@require_GET
+@login_required
+def download_document(request, kind, pk):
+    """
+    Serve an uploaded document after checking the user may see it.
+
+    With DOCUMENT_X_ACCEL_REDIRECT enabled, Django only sends headers and nginx transfers the
+    file from an internal location (sendfile, Range). Otherwise the file is streamed here,
+    with single-range support. Both paths send ETag/Last-Modified and answer If-None-Match with 304.
+    """
+    obj, file, can_view = _get_document(kind, pk)
+    if not can_view(request.user, obj):
+        return HttpResponseForbidden("You do not have permission to view this document.")
+
+    if not file:
+        raise Http404("No document attached")
+    return _serve_file(request, file.storage, file.name, getattr(obj, 'title', ''))
+
+
+@require_GET
+@login_required
+def reference_document(request, name):
+    """
+    One of the chapter's REFERENCE_DOCUMENTS (the Code, the Kai binder, ...), which the
+    constitution and procedures pages link to; served like download_document.
+    """
+    if name not in REFERENCE_DOCUMENTS:
+        raise Http404("Unknown reference document")
+    return _serve_file(request, DualLocationStorage(), REFERENCE_DOCUMENTS[name])
+
+
+def _serve_file(request, storage, name, title=''):
+    """Validators, 304s, X-Accel-Redirect or Range/full streaming for one stored file"""
+    path = storage.path(name)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        raise Http404("Document not found")
+
+    # Same format nginx uses for static files, so validators match whichever side served the file
+    etag = '"%x-%x"' % (int(stat.st_mtime), stat.st_size)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': 'private, max-age=0, must-revalidate',
+        'Accept-Ranges': 'bytes',
+    }
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match and (if_none_match.strip() == '*' or etag in parse_etags(if_none_match)):
+        return HttpResponse(status=304, headers=headers)
+
+    filename = os.path.basename(name)
+    if is_blob_name(name) and title:
+        # Content-addressed names are hashes; name the download after the document instead
+        try:
+            filename = get_valid_filename(title) + os.path.splitext(name)[1]
+        except SuspiciousFileOperation:
+            pass
+    as_attachment = request.GET.get('download') == '1'
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    headers['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+
+    if getattr(settings, 'DOCUMENT_X_ACCEL_REDIRECT', False):
+        root, prefix = _storage_root(storage, path)
+        relative = os.path.relpath(path, root).replace(os.sep, '/')
+        # nginx handles Range/If-Range and sends the bytes with sendfile from the internal location
+        headers['X-Accel-Redirect'] = prefix + quote(relative)
+        return HttpResponse(content_type=content_type, headers=headers)
+
+    range_header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    if range_header and (not if_range or if_range.strip() == etag):
+        byte_range = _parse_range(range_header, stat.st_size)
+        if byte_range is False:
+            headers['Content-Range'] = f'bytes */{stat.st_size}'
+            return HttpResponse(status=416, headers=headers)
+        if byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingHttpResponse(
+                _stream_range(path, start, length), status=206, content_type=content_type, headers=headers
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+            response['Content-Length'] = str(length)
+            return response
+
+    # Full responses use FileResponse so the WSGI server can sendfile() the open file
+    response = FileResponse(open(path, 'rb'), content_type=content_type, as_attachment=as_attachment, filename=filename)
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+@require_GET
+@login_required
+def document_preview(request, kind, pk):
+    """
+    First-page PNG thumbnail of a document, with the same permission checks as download_document.
+
+    A preview that hasn't been rendered yet is queued and a placeholder returned. Previews are
+    keyed by content, so the ETag doubles as the cache key and browsers keep them for a day.
+    """
+    obj, file, can_view = _get_document(kind, pk)
+    if not can_view(request.user, obj):
+        return HttpResponseForbidden("You do not have permission to view this document.")
+    if not can_preview(file):
+        raise Http404("No preview available")
+
+    path = schedule_preview(file)
+    if path is None:
+        raise Http404("Document not found")
+    if not os.path.exists(path):
+        return HttpResponse(PREVIEW_PLACEHOLDER_SVG, content_type='image/svg+xml', headers={'Cache-Control': 'no-store'})
+
+    etag = '"%s"' % os.path.splitext(os.path.basename(path))[0]
+    headers = {'ETag': etag, 'Cache-Control': 'private, max-age=86400'}
+    touch_preview(path)
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match and etag in parse_etags(if_none_match):
+        return HttpResponse(status=304, headers=headers)
+
+    response = FileResponse(open(path, 'rb'), content_type='image/png')
+    for header, value in headers.items():
+        response[header] = value
+    return response
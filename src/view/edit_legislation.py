@@ -4,7 +4,9 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponseForbidden
+from ..upload_handlers import stream_validated_uploads
 
+@stream_validated_uploads
 @login_required
 @officer_required
 @log_function_call
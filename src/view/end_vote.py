@@ -1,6 +1,5 @@
 from ..decorators import *
 from ..models import *
-from django.db.models import Count
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponseForbidden
@@ -13,87 +12,56 @@ def end_vote(request, legislation_id):
     if request.user != legislation.posted_by:
         return HttpResponseForbidden("Only the uploader can end the vote.")
 
-    # Close voting
-    legislation.voting_closed = True
-    legislation.save()
+    # Close voting, decide the outcome and freeze the result snapshot in one transaction
+    legislation = legislation.close_voting()
 
-    # Gather votes
-    votes = Vote.objects.filter(legislation=legislation)
-    vote_summary = votes.values('vote_choice').annotate(count=Count('id'))
+    return render(request, 'vote_result.html', vote_result_context(legislation, legislation.result_snapshot))
 
-    # Count totals
-    yes_votes = votes.filter(vote_choice='yes').count()
-    no_votes = votes.filter(vote_choice='no').count()
-    abstain_votes = votes.filter(vote_choice='abstain').count()
-    total_votes = votes.exclude(vote_choice='abstain').count()
+
+def vote_result_context(legislation, snapshot):
+    """Build the vote_result.html context from a result snapshot (no vote queries)"""
+    tallies = snapshot['tallies']
 
     if legislation.vote_mode == 'plurality':
-        vote_breakdown_dict = {str(option): votes.filter(vote_choice=option).count() for option in legislation.plurality_options}
-        winner = max(vote_breakdown_dict, key=vote_breakdown_dict.get) if vote_breakdown_dict else None
-        vote_breakdown = {'keys': list(vote_breakdown_dict.keys()), 'values': list(vote_breakdown_dict.values())}
+        vote_breakdown = {'keys': list(tallies.keys()), 'values': list(tallies.values())}
     else:
         vote_breakdown = {
-            'yes': yes_votes,
-            'no': no_votes,
-            'abstain': abstain_votes,
-        }
-        winner = None
-
-    vote_passed = False
-    required_pct = None
-    yes_percentage = None
-    if legislation.vote_mode == 'percentage':
-        required_pct = int(legislation.required_percentage or 51)
-        yes_percentage = (yes_votes / total_votes) * 100 if total_votes > 0 else 0
-        vote_passed = yes_percentage >= required_pct
-    elif legislation.vote_mode == 'piecewise':
-        required_number = legislation.required_number or 0
-        vote_passed = yes_votes >= required_number
-    elif legislation.vote_mode == 'plurality':
-        plurality_counts = {
-            option: votes.filter(vote_choice=option).count()
-            for option in legislation.plurality_options
+            'yes': tallies.get('yes', 0),
+            'no': tallies.get('no', 0),
+            'abstain': tallies.get('abstain', 0),
         }
-        most_voted = max(plurality_counts, key=plurality_counts.get, default=None)
-        vote_passed = True if most_voted else False
-        winner = most_voted
 
-    # Update status based on vote outcome
-    if vote_passed:
-        legislation.status = 'passed'
-    else:
-        legislation.status = 'removed'
-    legislation.save()
+    yes_percentage = snapshot['yes_percentage']
+    required_pct = snapshot['required_percentage']
 
     context = {
         'legislation': legislation,
-        'summary': vote_summary,
+        'summary': [{'vote_choice': choice, 'count': count} for choice, count in tallies.items() if count],
         'anonymous': legislation.anonymous_vote,
         'remove_abstain': not legislation.allow_abstain,
-        'in_favor': votes.filter(vote_choice='yes'),
-        'against': votes.filter(vote_choice='no'),
-        'abstain': votes.filter(vote_choice='abstain'),
-        'passed': vote_passed,
-        'total_votes': total_votes,
-        'yes_votes': yes_votes,
+        'passed': snapshot['passed'],
+        'total_votes': snapshot['counted_votes'],
+        'yes_votes': tallies.get('yes', 0),
         'yes_percentage': f"{yes_percentage:.0f}%" if yes_percentage is not None else "N/A",
         'required_percentage': required_pct if required_pct is not None else 'N/A',
         'vote_breakdown': vote_breakdown,
-        'winner': winner,
+        'winner': snapshot['winner'],
+        'present_count': snapshot['present_count'],
     }
 
-    #legislation.set_passed()
+    # Voter names are only stored for non-anonymous votes
+    voters = snapshot['voters']
+    if voters is not None:
+        context['in_favor'] = voters.get('yes', [])
+        context['against'] = voters.get('no', [])
+        context['abstain'] = voters.get('abstain', [])
 
-    if legislation.vote_mode == 'plurality':
-        context['plurality_results'] = {
-            'results': [
-                {
-                    'option': option,
-                    'count': vote_breakdown.get(option, 0),
-                    'voters': [v.user.name for v in votes.filter(vote_choice=option).select_related('user')]
-                }
-                for option in legislation.plurality_options
-            ]
-        }
+        if legislation.vote_mode == 'plurality':
+            context['plurality_results'] = {
+                'results': [
+                    {'option': option, 'count': count, 'voters': voters.get(option, [])}
+                    for option, count in tallies.items()
+                ]
+            }
 
-    return render(request, 'vote_result.html', context)
\ No newline at end of file
+    return context
@@ -0,0 +1,18 @@
+from django.db import DatabaseError, connection
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+
+
+@require_GET
+def health(request):
+    """
+    Liveness check for nginx and container health probes.
+
+    /health/ is on the middleware fast path, so this never loads a session or user; it only
+    checks that the database connection is usable.
+    """
+    try:
+        connection.ensure_connection()
+    except DatabaseError:
+        return HttpResponse('database unavailable', status=503, content_type='text/plain')
+    return HttpResponse('ok', content_type='text/plain')
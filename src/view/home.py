@@ -6,6 +6,7 @@ from django.contrib.auth.decorators import login_required
 from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
+from ..dashboard_cache import dashboard_cache_timeout, dashboard_versions
 
 @login_required
 @log_function_call
@@ -13,35 +14,43 @@ def home(request):
     # Get the last two passed legislations
     print(f"🔐 User: {request.user} | Authenticated: {request.user.is_authenticated}")
     logger.info(f"User: {request.user} | Authenticated: {request.user.is_authenticated} | IP: {request.META.get('REMOTE_ADDR')} | Page accessed: home")
-    recently_passed_legislation = Legislation.objects.annotate(
-        total_votes=Count('vote'),
-        yes_votes=Count('vote', filter=Q(vote__vote_choice='yes'))
-    ).filter(
-        voting_closed=True,
-        status='passed'
-    ).order_by('-available_at')[:2]  # Change field name as per your model
+    def legislation_previews():
+        # Only evaluated if the template uses it, so dashboard cache hits skip the vote-count query
+        recently_passed_legislation = Legislation.objects.annotate(
+            total_votes=Count('vote'),
+            yes_votes=Count('vote', filter=Q(vote__vote_choice='yes'))
+        ).filter(
+            voting_closed=True,
+            status='passed'
+        ).order_by('-available_at')[:2]  # Change field name as per your model
 
-    # Preparing data to display
-    legislation_previews = [
-        {
-            'title': leg.title,
-            'yes_percentage': "{:.0%}".format(leg.yes_votes / leg.total_votes) if leg.total_votes > 0 else "0%",
-            'detail_url': reverse('passed_legislation_detail', kwargs={'pk': leg.pk})
-        } for leg in recently_passed_legislation
-    ]
+        # Preparing data to display
+        return [
+            {
+                'title': leg.title,
+                'yes_percentage': "{:.0%}".format(leg.yes_votes / leg.total_votes) if leg.total_votes > 0 else "0%",
+                'detail_url': reverse('passed_legislation_detail', kwargs={'pk': leg.pk})
+            } for leg in recently_passed_legislation
+        ]
 
     # Get the 3 most recent active announcements for preview
     now = timezone.now()
+    # Lazy: only queried when the cached announcements fragment has to be re-rendered. The fragment
+    # is cached per member_type, so it only shows announcements visible to that member type.
     announcements = Announcement.objects.filter(
         is_active=True
     ).filter(
         Q(publish_at__isnull=True) | Q(publish_at__lte=now)
-    ).order_by('-posted_at')[:3]
+    ).filter(
+        Q(visible_to__isnull=True) | Q(visible_to=[]) | Q(visible_to__contains=[request.user.member_type])
+    ).select_related('posted_by').order_by('-posted_at')[:3]
 
     context = {
         'user': request.user,
         'legislation_previews': legislation_previews,
         'announcements': announcements,
+        'dashboard_cache_timeout': dashboard_cache_timeout(),
+        'dashboard_versions': dashboard_versions('home_announcements'),
     }
 
     return render(request, 'home.html', context)
\ No newline at end of file
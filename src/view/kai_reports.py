@@ -9,8 +9,10 @@ import csv
 from src.models import KaiReport, Committee, ParliamentUser, KaiReportActivity, KaiReportTemplate
 from src.forms import KaiReportForm
 from src.decorators import log_function_call
+from src.upload_handlers import stream_validated_uploads
 
 
+@stream_validated_uploads
 @login_required
 @log_function_call
 def submit_kai_report(request):
@@ -12,4 +12,6 @@ from .view_all_reports import *
 from .view_all_activity import *
 from .view_archived_events import *
 from .archive_event import *
-from .manage_resolutions import *
\ No newline at end of file
+from .manage_resolutions import *
+from .cache_stats import *
+from .meeting_display import *
\ No newline at end of file
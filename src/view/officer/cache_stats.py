@@ -0,0 +1,35 @@
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import redirect, render
+from django.views.decorators.http import require_POST
+
+from src.caching import backend_info, cache_stats, get_namespace, reset_cache_stats
+from src.decorators import officer_or_advisor_required, officer_required
+
+
+@login_required
+@officer_or_advisor_required
+def view_cache_stats(request):
+    """Cache backend details plus hit/miss counts and versions for each cache namespace"""
+    return render(request, 'officer/cache_stats.html', {
+        'backend': backend_info(),
+        'namespaces': cache_stats(),
+    })
+
+
+@require_POST
+@login_required
+@officer_required
+def clear_cache_namespace(request):
+    """Invalidate one namespace (or reset the counters) from the stats page"""
+    if request.POST.get('action') == 'reset_stats':
+        reset_cache_stats()
+        messages.success(request, 'Cache statistics reset.')
+    else:
+        namespace = get_namespace(request.POST.get('namespace', ''))
+        if namespace is None:
+            messages.error(request, 'Unknown cache namespace.')
+        else:
+            namespace.invalidate()
+            messages.success(request, f'Cache namespace "{namespace.name}" invalidated.')
+    return redirect('view_cache_stats')
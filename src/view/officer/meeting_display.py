@@ -0,0 +1,74 @@
+import json
+import time
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.shortcuts import render
+from django.views.decorators.http import require_GET
+
+from src.decorators import officer_or_advisor_required
+from src.meeting_display import current_snapshot, snapshot_key
+
+# Seconds a display stream stays open before the browser reconnects
+DEFAULT_STREAM_SECONDS = 60
+
+# Seconds between checks for a new snapshot
+DEFAULT_POLL_INTERVAL = 1
+
+KEEPALIVE_SECONDS = 15
+
+
+@require_GET
+@login_required
+@officer_or_advisor_required
+def meeting_display(request):
+    """Read-only, full-screen meeting display for a projector or kiosk"""
+    key, snapshot = current_snapshot()
+    return render(request, 'officer/meeting_display.html', {'snapshot': snapshot, 'snapshot_key': key})
+
+
+def _stream(last_key):
+    stream_seconds = getattr(settings, 'MEETING_DISPLAY_STREAM_SECONDS', DEFAULT_STREAM_SECONDS)
+    poll_interval = getattr(settings, 'MEETING_DISPLAY_POLL_INTERVAL', DEFAULT_POLL_INTERVAL)
+
+    yield f"retry: {int(poll_interval * 1000)}\n\n"
+
+    deadline = time.monotonic() + stream_seconds
+    last_write = time.monotonic()
+    while True:
+        # One cache read per poll; the snapshot itself is only fetched (or rebuilt) when it changed
+        if snapshot_key() != last_key:
+            last_key, snapshot = current_snapshot()
+            if not connection.in_atomic_block:
+                connection.close()
+            yield f"id: {last_key}\nevent: snapshot\ndata: {json.dumps(snapshot)}\n\n"
+            last_write = time.monotonic()
+        elif time.monotonic() - last_write >= KEEPALIVE_SECONDS:
+            yield ": keepalive\n\n"
+            last_write = time.monotonic()
+
+        if time.monotonic() >= deadline:
+            return
+        time.sleep(poll_interval)
+
+
+@require_GET
+@login_required
+@officer_or_advisor_required
+def meeting_display_stream(request):
+    """
+    Server-sent `snapshot` events carrying the display's rendered HTML.
+
+    A reconnecting display sends the key it last rendered as Last-Event-ID and only gets a new
+    snapshot once there is one.
+    """
+    response = StreamingHttpResponse(
+        _stream(request.headers.get('Last-Event-ID')),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Don't let nginx buffer the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
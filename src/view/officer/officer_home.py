@@ -3,10 +3,12 @@ from django.contrib.auth.decorators import login_required
 from django.utils import timezone
 from src.models import CommitteeDocument, Event, Legislation, CommitteeLegislation
 from src.decorators import officer_or_advisor_required
+from src.dashboard_cache import dashboard_cache_timeout, dashboard_versions
 
 @login_required
 @officer_or_advisor_required
 def officer_home(request):
+    # Querysets stay lazy: each widget's fragment is cached per member_type, so a hit skips its query
     # Get recent reports (last 5)
     recent_reports = CommitteeDocument.objects.filter(
         document_type='report'
@@ -40,6 +42,10 @@ def officer_home(request):
         'recent_legislation': recent_legislation,
         'recent_committee_docs': recent_committee_docs,
         'recent_committee_legislation': recent_committee_legislation,
+        'dashboard_cache_timeout': dashboard_cache_timeout(),
+        'dashboard_versions': dashboard_versions(
+            'officer_recent_reports', 'officer_upcoming_events', 'officer_recent_activity'
+        ),
     }
 
     return render(request, 'officer_home.html', context)
\ No newline at end of file
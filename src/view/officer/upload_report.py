@@ -3,7 +3,9 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from src.forms import CommitteeDocumentForm
 from src.decorators import officer_required
+from src.upload_handlers import stream_validated_uploads
 
+@stream_validated_uploads
 @login_required
 @officer_required
 def upload_report(request):
@@ -1,47 +1,89 @@
 from src.decorators import officer_or_advisor_required
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.db.models import CharField, Count, Value
+from django.utils.http import urlencode
 from src.models import Legislation, CommitteeLegislation, CommitteeDocument
+from src.view.officer.view_all_reports import paginate_with_count
+
+ACTIVITY_PAGE_SIZE = 25
+
+LEGISLATION_STATUSES = [('draft', 'Draft'), ('passed', 'Passed'), ('removed', 'Removed')]
+
+# section -> (label, listing queryset, ordering field)
+ACTIVITY_SECTIONS = {
+    'chapter': ('Chapter Legislation', lambda: Legislation.objects.select_related('posted_by'), '-created_at'),
+    'committee': ('Committee Legislation', lambda: CommitteeLegislation.objects.select_related('committee', 'posted_by'), '-created_at'),
+    'documents': ('Committee Documents', lambda: CommitteeDocument.objects.select_related('committee', 'uploaded_by'), '-uploaded_at'),
+}
+
+
+def activity_facets():
+    """
+    Counts per (section, status) for all three activity lists in a single UNION ALL query.
+
+    Documents have no status, so they are grouped by document_type and summed.
+    """
+    def grouped(model, section, column):
+        return model.objects.order_by().values_list(
+            Value(section, output_field=CharField()), column
+        ).annotate(count=Count('id'))
+
+    rows = grouped(Legislation, 'chapter', 'status').union(
+        grouped(CommitteeLegislation, 'committee', 'status'),
+        grouped(CommitteeDocument, 'documents', 'document_type'),
+        all=True,
+    )
+
+    facets = {section: {'total': 0} for section in ACTIVITY_SECTIONS}
+    for section, status, count in rows:
+        facets[section]['total'] += count
+        if section != 'documents':
+            facets[section][status] = count
+    return facets
+
 
 @login_required
 @officer_or_advisor_required
 def view_all_activity(request):
-    """View all recent member activity for officers"""
-
-    # Get all chapter legislation
-    all_chapter_legislation = Legislation.objects.select_related(
-        'posted_by'
-    ).order_by('-created_at')
-
-    # Get all committee legislation
-    all_committee_legislation = CommitteeLegislation.objects.select_related(
-        'committee', 'posted_by'
-    ).order_by('-created_at')
+    """
+    View all recent member activity for officers.
 
-    # Get all committee documents
-    all_committee_docs = CommitteeDocument.objects.select_related(
-        'committee', 'uploaded_by'
-    ).order_by('-uploaded_at')
+    Tab and status counts come from one aggregate query; only a page of the selected list is loaded.
+    """
+    facets = activity_facets()
 
-    # Filter by status
-    draft_chapter_leg = all_chapter_legislation.filter(status='draft')
-    passed_chapter_leg = all_chapter_legislation.filter(status='passed')
-    removed_chapter_leg = all_chapter_legislation.filter(status='removed')
+    section = request.GET.get('section', 'chapter')
+    if section not in ACTIVITY_SECTIONS:
+        section = 'chapter'
+    status = request.GET.get('status', '')
+    if section == 'documents' or status not in dict(LEGISLATION_STATUSES):
+        status = ''
 
-    draft_committee_leg = all_committee_legislation.filter(status='draft')
-    passed_committee_leg = all_committee_legislation.filter(status='passed')
-    removed_committee_leg = all_committee_legislation.filter(status='removed')
+    label, listing, ordering = ACTIVITY_SECTIONS[section]
+    items = listing().order_by(ordering, '-id')
+    if status:
+        items = items.filter(status=status)
+    page_obj = paginate_with_count(
+        request, items, ACTIVITY_PAGE_SIZE, facets[section].get(status or 'total', 0)
+    )
 
     context = {
-        'all_chapter_legislation': all_chapter_legislation,
-        'all_committee_legislation': all_committee_legislation,
-        'all_committee_docs': all_committee_docs,
-        'draft_chapter_leg': draft_chapter_leg,
-        'passed_chapter_leg': passed_chapter_leg,
-        'removed_chapter_leg': removed_chapter_leg,
-        'draft_committee_leg': draft_committee_leg,
-        'passed_committee_leg': passed_committee_leg,
-        'removed_committee_leg': removed_committee_leg,
+        'sections': [
+            {'key': key, 'label': section_label, 'count': facets[key]['total']}
+            for key, (section_label, _, _) in ACTIVITY_SECTIONS.items()
+        ],
+        'statuses': [
+            {'key': '', 'label': 'All', 'count': facets[section]['total']}
+        ] + [
+            {'key': key, 'label': status_label, 'count': facets[section].get(key, 0)}
+            for key, status_label in LEGISLATION_STATUSES
+        ],
+        'section': section,
+        'section_label': label,
+        'status': status,
+        'page_obj': page_obj,
+        'filter_query': urlencode({key: value for key, value in (('section', section), ('status', status)) if value}),
     }
 
     return render(request, 'officer/view_all_activity.html', context)
@@ -1,32 +1,83 @@
 from src.decorators import officer_or_advisor_required
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.core.paginator import Paginator
+from django.db.models import Count, Q
+from django.utils.http import urlencode
 from src.models import CommitteeDocument
 
+REPORTS_PAGE_SIZE = 25
+
+# (document_type, tab label, list title) in tab order
+DOCUMENT_TYPE_TABS = [
+    ('report', 'Reports', 'Reports'),
+    ('minutes', 'Minutes', 'Meeting Minutes'),
+    ('agenda', 'Agendas', 'Meeting Agendas'),
+    ('policy', 'Policies', 'Policy Documents'),
+    ('general', 'General', 'General Documents'),
+]
+
+
+def paginate_with_count(request, queryset, page_size, count=None):
+    """
+    Paginate queryset, reusing a count that a facet query already computed.
+
+    Paginator would otherwise run its own COUNT(*) over the listing.
+    """
+    paginator = Paginator(queryset, page_size)
+    if count is not None:
+        paginator.count = count
+    return paginator.get_page(request.GET.get('page'))
+
+
 @login_required
 @officer_or_advisor_required
 def view_all_reports(request):
-    """View all committee documents for officers, including unpublished ones"""
+    """
+    View all committee documents for officers, including unpublished ones.
+
+    Tab counts come from one GROUP BY over document_type and only one page of the selected
+    tab's documents is loaded, so the page stays the same size as the archive grows.
+    """
+    # order_by() drops the model's default ordering, which would otherwise be added to the GROUP BY
+    type_counts = dict(
+        CommitteeDocument.objects.order_by().values_list('document_type').annotate(count=Count('id'))
+    )
+    total_documents = sum(type_counts.values())
 
-    # Get all committee documents, including those not published to chapter
-    all_documents = CommitteeDocument.objects.select_related(
+    selected_type = request.GET.get('type', '')
+    if selected_type not in {doc_type for doc_type, _, _ in DOCUMENT_TYPE_TABS}:
+        selected_type = ''
+    query = request.GET.get('q', '').strip()
+
+    documents = CommitteeDocument.objects.select_related(
         'committee', 'uploaded_by'
-    ).order_by('-uploaded_at')
+    ).order_by('-uploaded_at', '-id')
+    if selected_type:
+        documents = documents.filter(document_type=selected_type)
+    if query:
+        documents = documents.filter(Q(title__icontains=query) | Q(committee__code__iexact=query))
+
+    # Without a text filter the facet counts are exactly the listing sizes
+    count = None
+    if not query:
+        count = type_counts.get(selected_type, 0) if selected_type else total_documents
+    page_obj = paginate_with_count(request, documents, REPORTS_PAGE_SIZE, count)
 
-    # Group by document type for easier viewing
-    reports = all_documents.filter(document_type='report')
-    minutes = all_documents.filter(document_type='minutes')
-    agendas = all_documents.filter(document_type='agenda')
-    policies = all_documents.filter(document_type='policy')
-    general_docs = all_documents.filter(document_type='general')
+    tabs = [{'type': '', 'label': 'All Documents', 'count': total_documents}] + [
+        {'type': doc_type, 'label': label, 'count': type_counts.get(doc_type, 0)}
+        for doc_type, label, _ in DOCUMENT_TYPE_TABS
+    ]
+    list_title = next((title for doc_type, _, title in DOCUMENT_TYPE_TABS if doc_type == selected_type), 'All Documents')
 
     context = {
-        'all_documents': all_documents,
-        'reports': reports,
-        'minutes': minutes,
-        'agendas': agendas,
-        'policies': policies,
-        'general_docs': general_docs,
+        'tabs': tabs,
+        'selected_type': selected_type,
+        'query': query,
+        'documents': page_obj,
+        'page_obj': page_obj,
+        'list_title': list_title,
+        'filter_query': urlencode({key: value for key, value in (('type', selected_type), ('q', query)) if value}),
     }
 
     return render(request, 'officer/view_all_reports.html', context)
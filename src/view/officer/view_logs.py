@@ -1,39 +1,162 @@
 from src.decorators import officer_or_advisor_required
+from django.apps import apps
 from django.shortcuts import render
-from django.contrib.auth.decorators import login_required, user_passes_test
-from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime, time, timedelta
 from django.conf import settings
+from src.models import AuditEvent
+from src.logging_utils import read_log_tail, parse_log_line
 import os
 
+AUDIT_PAGE_SIZE = 50
+
 LOG_FILE_PATH = os.path.join(settings.BASE_DIR, 'logs', 'django_actions.log')
+LOG_TAIL_LINES = 200
+
+AUDIT_FILTER_FIELDS = ('user', 'action', 'resource_type', 'resource_id', 'status', 'date_from', 'date_to')
+
+# Statuses written by format_log_entry callers (model events, document actions, security severities)
+AUDIT_STATUSES = ('success', 'failure', 'unauthorized', 'info', 'warning', 'error', 'critical')
+
+
+def _parse_filter_date(value):
+    try:
+        return parse_date(value) if value else None
+    except ValueError:
+        return None
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def search_audit_events(params):
+    """
+    Filter AuditEvent rows from request GET parameters.
+
+    Returns (queryset, filters) where filters holds the cleaned values for re-populating the form.
+    Every filter has an index behind it (see AuditEvent.Meta.indexes): the user filter ORs the
+    UPPER(username) pattern index with the (user_id, -timestamp) index, and the action prefix
+    uses the UPPER(action) pattern index.
+    """
+    filters = {field: params.get(field, '').strip() for field in AUDIT_FILTER_FIELDS}
+    events = AuditEvent.objects.all()
+
+    if filters['user']:
+        events = events.filter(Q(username__istartswith=filters['user']) | Q(user_id=filters['user']))
+    if filters['action']:
+        events = events.filter(action__istartswith=filters['action'])
+    if filters['resource_type']:
+        events = events.filter(resource_type=filters['resource_type'])
+    if filters['resource_id']:
+        events = events.filter(resource_id=filters['resource_id'])
+    if filters['status']:
+        events = events.filter(status=filters['status'])
+
+    # Date bounds are turned into timestamp ranges (not __date lookups) so the index is usable
+    date_from = _parse_filter_date(filters['date_from'])
+    if date_from:
+        events = events.filter(timestamp__gte=_start_of_day(date_from))
+    date_to = _parse_filter_date(filters['date_to'])
+    if date_to:
+        events = events.filter(timestamp__lt=_start_of_day(date_to + timedelta(days=1)))
+
+    return events.order_by('-timestamp', '-id'), filters
+
+
+def _audit_cursor(event):
+    return f'{event.timestamp.isoformat()}_{event.pk}'
+
+
+def _parse_audit_cursor(value):
+    """(timestamp, id) from an _audit_cursor value, or None"""
+    timestamp, _, pk = (value or '').rpartition('_')
+    try:
+        timestamp = parse_datetime(timestamp)
+        pk = int(pk)
+    except ValueError:
+        return None
+    return (timestamp, pk) if timestamp else None
+
+
+def audit_page(events, before=None, after=None):
+    """
+    One page of events (ordered newest first) by keyset on (timestamp, id).
+
+    `before` pages to older events and `after` to newer ones; both are cursors from a previous
+    page. Returns (rows, newer cursor or None, older cursor or None). Only AUDIT_PAGE_SIZE + 1
+    rows are read, and never a COUNT(*) over the whole history.
+    """
+    before, after = _parse_audit_cursor(before), _parse_audit_cursor(after)
+    if after:
+        timestamp, pk = after
+        rows = list(events.filter(Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, id__gt=pk))
+                    .order_by('timestamp', 'id')[:AUDIT_PAGE_SIZE + 1])
+        has_newer, has_older = len(rows) > AUDIT_PAGE_SIZE, True
+        rows = rows[:AUDIT_PAGE_SIZE][::-1]
+    else:
+        if before:
+            timestamp, pk = before
+            events = events.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=pk))
+        rows = list(events[:AUDIT_PAGE_SIZE + 1])
+        has_newer, has_older = before is not None, len(rows) > AUDIT_PAGE_SIZE
+        rows = rows[:AUDIT_PAGE_SIZE]
+
+    if not rows:
+        return rows, None, None
+    return (
+        rows,
+        _audit_cursor(rows[0]) if has_newer else None,
+        _audit_cursor(rows[-1]) if has_older else None,
+    )
+
+
+def audit_search_context(request):
+    """One page of search results plus the values needed to render the filter form"""
+    events, filters = search_audit_events(request.GET)
+    logs, newer, older = audit_page(events, request.GET.get('before'), request.GET.get('after'))
+
+    # Keep the active filters on the paging links
+    query = request.GET.copy()
+    query.pop('before', None)
+    query.pop('after', None)
+
+    return {
+        'logs': logs,
+        'newer_cursor': newer,
+        'older_cursor': older,
+        'filters': filters,
+        'filter_query': query.urlencode(),
+        # Resource types are model names; listing them from the app avoids a DISTINCT over the whole table
+        'resource_types': sorted(model.__name__ for model in apps.get_app_config('src').get_models()),
+        'statuses': AUDIT_STATUSES,
+    }
+
+
+def log_tail_context(request, path, parse=True):
+    """
+    Last LOG_TAIL_LINES lines of a raw log file (newest first), read backwards from EOF.
+    The `before` GET parameter pages further back, into rotated files when needed.
+    """
+    try:
+        lines, before = read_log_tail(path, LOG_TAIL_LINES, request.GET.get('before'))
+    except OSError as e:
+        lines, before = [f"Error reading log file: {e}"], None
+
+    return {
+        'source': 'file',
+        'logs': [parse_log_line(line) for line in lines] if parse else lines,
+        'before': before,
+    }
+
 
 @login_required
 @officer_or_advisor_required
 def view_logs(request):
-    logs = []
-
-    try:
-        if os.path.exists(LOG_FILE_PATH):
-            with open(LOG_FILE_PATH, 'r') as f:
-                log_lines = f.readlines()[-200:]  # Show last 200 lines for performance
-                for line in reversed(log_lines):
-                    parts = line.strip().split(" - ")
-                    if len(parts) >= 3:
-                        timestamp, logger_name, message = parts[0], parts[1], " - ".join(parts[2:])
-                        logs.append({
-                            'timestamp': timestamp,
-                            'logger': logger_name,
-                            'message': message,
-                        })
-                    else:
-                        logs.append({
-                            'timestamp': '',
-                            'logger': '',
-                            'message': line.strip()
-                        })
-        else:
-            messages.warning(request, "Log file not found.")
-    except Exception as e:
-        messages.error(request, f"Error reading log file: {e}")
-
-    return render(request, 'admin/view_logs.html', {'logs': logs})
+    """Search the structured audit log (AuditEvent), or page through the raw action log file"""
+    if request.GET.get('source') == 'file':
+        return render(request, 'officer/view_logs.html', log_tail_context(request, LOG_FILE_PATH))
+    return render(request, 'officer/view_logs.html', audit_search_context(request))
@@ -2,53 +2,43 @@ from django.contrib.auth.decorators import login_required
 from ..decorators import *
 from ..models import *
 from django.shortcuts import render
+from django.urls import reverse
 from django.views.generic import DetailView
-import pytz
-from datetime import timedelta
 
 @login_required
 @log_function_call
 def passed_legislation(request):
     closed_legislation = Legislation.objects.filter(voting_closed=True)
     passed = []
-    passed_legs = Legislation.objects.filter(passed=True)
-    print("Passed Legislation:", passed_legs)
 
     for leg in closed_legislation:
-        votes = Vote.objects.filter(legislation=leg)
-        yes = votes.filter(vote_choice='yes').count()
-        no = votes.filter(vote_choice='no').count()
-        abstain = votes.filter(vote_choice='abstain').count()
+        # Results come from the snapshot frozen by end_vote; bills closed before snapshots
+        # existed are computed on the fly (without saving)
+        snapshot = leg.get_result_snapshot()
+        tallies = snapshot['tallies']
+        yes = tallies.get('yes', 0)
+        no = tallies.get('no', 0)
+        abstain = tallies.get('abstain', 0)
         total_non_abstain = yes + no
 
         # Skip only if not passed AND has no votes
         if total_non_abstain == 0 and not leg.passed:
             continue
 
-        vote_passed = False
         yes_pct = 0
 
-        # If there are no votes, use the stored passed status
-        if total_non_abstain == 0:
+        # If there are no votes, or for plurality, use the stored passed status
+        if total_non_abstain == 0 or leg.vote_mode == 'plurality':
             vote_passed = leg.passed
-            yes_pct = 0
-        elif leg.vote_mode == 'piecewise':
-            vote_passed = yes >= leg.required_yes_votes
-        elif leg.vote_mode == 'plurality':
-            # For plurality, use the stored passed status
-            vote_passed = leg.passed
-        else:  # percentage mode
-            yes_pct = (yes / total_non_abstain) * 100
-            required_pct = int(leg.required_percentage)
-            vote_passed = yes_pct >= required_pct
+        else:
+            vote_passed = snapshot['passed']
+            if leg.vote_mode == 'percentage':
+                yes_pct = (yes / total_non_abstain) * 100
 
         # Calculate vote breakdown based on mode
         if leg.vote_mode == 'plurality' and leg.plurality_options:
-            # For plurality, get counts for each option
-            vote_breakdown = {}
-            for option in leg.plurality_options:
-                vote_breakdown[option] = votes.filter(vote_choice=option).count()
-            winner = max(vote_breakdown, key=vote_breakdown.get) if vote_breakdown else None
+            vote_breakdown = {option: tallies.get(option, 0) for option in leg.plurality_options}
+            winner = snapshot['winner']
         else:
             # For yes/no votes
             vote_breakdown = {
@@ -58,26 +48,8 @@ def passed_legislation(request):
             }
             winner = None
 
-
-        # Determine time range for attendance window (only if there were votes)
-        present_members = []
-        if total_non_abstain > 0:
-            local_tz = pytz.timezone("America/Chicago")
-            vote_end = leg.voting_ended_at or leg.available_at
-            vote_start = vote_end - timedelta(hours=3)
-
-            # Convert to local time and back to UTC to simulate attendance in UTC-6 window
-            vote_start_local = vote_start.astimezone(local_tz)
-            vote_end_local = vote_end.astimezone(local_tz)
-
-            vote_start_utc = vote_start_local.astimezone(pytz.UTC)
-            vote_end_utc = vote_end_local.astimezone(pytz.UTC)
-
-            # Only get the latest attendance record per user in the window
-            present_members = Attendance.objects.filter(
-                present=True,
-                created_at__range=(vote_start_utc, vote_end_utc)
-            ).order_by('user_id', '-created_at').distinct('user_id').select_related('user')
+        # Members present in the 3-hour window before voting closed (only if there were votes)
+        present_members = snapshot['present_members'] if total_non_abstain > 0 else []
 
         # Calculate percentages for display
         if leg.vote_mode != 'plurality':
@@ -99,19 +71,39 @@ def passed_legislation(request):
             'vote_mode': leg.vote_mode,
             'vote_passed': vote_passed,
             'present_members': present_members,
-            'document_url': leg.document.url if leg.document else None,
+            'present_count': snapshot['present_count'],
+            'document_url': reverse('download_document', args=['legislation', leg.id]) if leg.document else None,
             'vote_breakdown': vote_breakdown,
             'winner': winner,
         })
 
-        if present_members:
-            logger.info(f"{leg.title} present members: {[a.user.name for a in present_members]}")
+    return render(request, 'passed_legislation.html', {'passed_legislation': passed})
 
-            print("Present members for:", leg.title)
-            for pm in present_members:
-                print(f"- {pm.user.name} @ {pm.created_at}")
 
-    return render(request, 'passed_legislation.html', {'passed_legislation': passed})
+def legislation_vote_result(legislation):
+    """Build the legislation detail vote_result dict from the result snapshot"""
+    snapshot = legislation.get_result_snapshot()
+    tallies = snapshot['tallies']
+
+    if legislation.vote_mode == 'plurality':
+        return {
+            'mode': 'plurality',
+            'options': tallies,
+            'winner': snapshot['winner'],
+            'total': snapshot['total_votes']
+        }
+
+    total_votes = snapshot['total_votes']
+    yes_pct = (tallies.get('yes', 0) / total_votes * 100) if total_votes > 0 else 0
+    return {
+        'mode': 'percentage',
+        'yes': tallies.get('yes', 0),
+        'no': tallies.get('no', 0),
+        'abstain': tallies.get('abstain', 0),
+        'yes_percentage': "{:.0f}%".format(yes_pct),
+        'required_percentage': legislation.required_percentage,
+        'total': total_votes
+    }
 
 
 class PassedLegislationDetailView(DetailView):
@@ -121,32 +113,5 @@ class PassedLegislationDetailView(DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        legislation = self.object
-        votes = Vote.objects.filter(legislation=legislation)
-        total_votes = votes.count()
-
-        if legislation.vote_mode == 'plurality':
-            vote_counts = {option: votes.filter(vote_choice=option).count() for option in legislation.plurality_options}
-            winner = max(vote_counts, key=vote_counts.get) if vote_counts else None
-            context['vote_result'] = {
-                'mode': 'plurality',
-                'options': vote_counts,
-                'winner': winner,
-                'total': total_votes
-            }
-        else:
-            yes_votes = votes.filter(vote_choice='yes').count()
-            no_votes = votes.filter(vote_choice='no').count()
-            abstain_votes = votes.filter(vote_choice='abstain').count()
-            yes_pct = (yes_votes / total_votes * 100) if total_votes > 0 else 0
-            context['vote_result'] = {
-                'mode': 'percentage',
-                'yes': yes_votes,
-                'no': no_votes,
-                'abstain': abstain_votes,
-                'yes_percentage': "{:.0f}%".format(yes_pct),
-                'required_percentage': legislation.required_percentage,
-                'total': total_votes
-            }
-
-        return context
\ No newline at end of file
+        context['vote_result'] = legislation_vote_result(self.object)
+        return context
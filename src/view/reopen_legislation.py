@@ -20,6 +20,10 @@ def reopen_legislation(request, legislation_id):
         return HttpResponseForbidden("Only the uploader can reopen this legislation.")
 
     legislation.voting_closed = False  # Reopen the voting
+    # The frozen result no longer applies; end_vote decides it again when voting closes
+    legislation.passed = False
+    legislation.voting_ended_at = None
+    legislation.result_snapshot = None
     legislation.save()
 
     messages.success(request, "Legislation has been reopened.")
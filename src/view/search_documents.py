@@ -0,0 +1,70 @@
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.http import JsonResponse
+from django.shortcuts import render
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from src.document_search import INDEXED_DOCUMENTS, search_documents as run_search
+
+SEARCH_PAGE_SIZE = 20
+
+DOCUMENT_KIND_LABELS = {
+    'legislation': 'Legislation',
+    'committee_document': 'Committee Document',
+    'committee_minutes': 'Committee Minutes',
+    'passed_resolution': 'Passed Resolution',
+}
+
+
+def _safe_headline(headline):
+    """Escape extracted document text, keeping only the <mark> tags added by ts_headline"""
+    escaped = escape(headline or '')
+    return mark_safe(escaped.replace('&lt;mark&gt;', '<mark>').replace('&lt;/mark&gt;', '</mark>'))
+
+
+@login_required
+def search_documents(request):
+    """
+    Unified full-text search over legislation, committee documents, minutes and resolutions.
+
+    Results are ranked by relevance and limited to documents the user may open.
+    ?format=json returns the same page as JSON.
+    """
+    query = request.GET.get('q', '').strip()
+    kinds = [kind for kind in request.GET.getlist('kind') if kind in INDEXED_DOCUMENTS]
+
+    page_obj = None
+    results = []
+    if query:
+        page_obj = Paginator(run_search(request.user, query, kinds), SEARCH_PAGE_SIZE).get_page(request.GET.get('page'))
+        results = [
+            {
+                'kind': entry.kind,
+                'kind_label': DOCUMENT_KIND_LABELS[entry.kind],
+                'id': entry.object_id,
+                'title': entry.title,
+                'description': entry.description,
+                'headline': _safe_headline(entry.headline),
+                'rank': round(entry.rank, 4),
+                'url': reverse('download_document', args=[entry.kind, entry.object_id]),
+            }
+            for entry in page_obj
+        ]
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'query': query,
+            'results': results,
+            'page': page_obj.number if page_obj else 1,
+            'num_pages': page_obj.paginator.num_pages if page_obj else 0,
+            'count': page_obj.paginator.count if page_obj else 0,
+        })
+
+    return render(request, 'search_documents.html', {
+        'query': query,
+        'kinds': kinds,
+        'kind_choices': DOCUMENT_KIND_LABELS.items(),
+        'results': results,
+        'page_obj': page_obj,
+    })
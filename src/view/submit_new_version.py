@@ -5,7 +5,9 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponseForbidden
 from django.shortcuts import render, get_object_or_404, redirect
+from ..upload_handlers import stream_validated_uploads
 
+@stream_validated_uploads
 @login_required
 @officer_required
 @log_function_call
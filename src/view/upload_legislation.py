@@ -3,7 +3,9 @@ from django.contrib import messages
 from ..forms import *
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
+from ..upload_handlers import stream_validated_uploads
 
+@stream_validated_uploads
 @login_required
 @officer_required
 @log_function_call
@@ -1,31 +1,47 @@
 from django.shortcuts import render
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.db.models import Count, Q
 from ..models import *
 
+HISTORY_PAGE_SIZE = 20
+
 @login_required
 def view_legislation_history(request):
     user = request.user
 
-    # Fetch all legislation submitted by the logged-in user (both past and present)
-    user_legislation = Legislation.objects.filter(posted_by=user).order_by('-available_at')
+    # Fetch all legislation submitted by the logged-in user (both past and present) with vote
+    # tallies annotated in the same query. Pass/fail is frozen by end_vote, so viewing history
+    # never recounts or writes.
+    user_legislation = Legislation.objects.filter(posted_by=user).annotate(
+        yes_votes=Count('vote', filter=Q(vote__vote_choice='yes')),
+        no_votes=Count('vote', filter=Q(vote__vote_choice='no')),
+        abstain_votes=Count('vote', filter=Q(vote__vote_choice='abstain')),
+        total_votes=Count('vote'),
+    ).order_by('-available_at', '-id')
+
+    page_obj = Paginator(user_legislation, HISTORY_PAGE_SIZE).get_page(request.GET.get('page'))
 
     legislation_history = []
 
-    for leg in user_legislation:
-        votes = Vote.objects.filter(legislation=leg)
-        yes_votes = votes.filter(vote_choice='yes').count()
-        no_votes = votes.filter(vote_choice='no').count()
-        abstain_votes = votes.filter(vote_choice='abstain').count()
-        total_votes = votes.count()
+    for leg in page_obj:
+        yes_votes = leg.yes_votes
+        no_votes = leg.no_votes
+        abstain_votes = leg.abstain_votes
+        total_votes = leg.total_votes
+
+        # Closed bills report the tallies frozen in their result snapshot
+        if leg.voting_closed and leg.result_snapshot:
+            tallies = leg.result_snapshot['tallies']
+            yes_votes = tallies.get('yes', 0)
+            no_votes = tallies.get('no', 0)
+            abstain_votes = tallies.get('abstain', 0)
+            total_votes = leg.result_snapshot['total_votes']
 
         # Calculate the yes percentage
         yes_percentage = (yes_votes / total_votes) * 100 if total_votes > 0 else 0
 
-        # Update the passed status based on votes
-        if leg.voting_closed:
-            leg.set_passed()
-        passed = leg.passed
-
         is_legislation_active = leg.is_available() and not leg.voting_closed
 
         # Adding legislation history with voting results for closed ones
@@ -41,14 +57,17 @@ def view_legislation_history(request):
             'is_active': is_legislation_active,
             'voting_closed': leg.voting_closed,
             'available_at': leg.available_at,
-            'voting_ended_at': leg.voting_ended_at,  # assuming you store the end time
+            'voting_ended_at': leg.voting_ended_at,
             'anonymous_vote': leg.anonymous_vote,
             'allow_abstain': leg.allow_abstain,
             'description': leg.description,
             'title': leg.title,
-            'document_url': leg.document.url if leg.document else None,
+            'document_url': reverse('download_document', args=['legislation', leg.id]) if leg.document else None,
             'legislation_id': leg.id,
-            'passed': passed,
+            'passed': leg.passed,
         })
 
-    return render(request, 'legislation_history.html', {'legislation_history': legislation_history})
+    return render(request, 'legislation_history.html', {
+        'legislation_history': legislation_history,
+        'page_obj': page_obj,
+    })
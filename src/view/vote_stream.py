@@ -0,0 +1,107 @@
+import json
+import time
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.db import connection
+from django.http import Http404, HttpResponseForbidden, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+
+from src.live_tally import LIVE_TALLY_SOURCES, TallyChannel, tally_payload
+
+# Seconds a stream stays open; the browser's EventSource reconnects with Last-Event-ID
+DEFAULT_STREAM_SECONDS = 30
+
+# Seconds between checks of the channel's sequence number in the cache
+DEFAULT_POLL_INTERVAL = 1
+
+KEEPALIVE_SECONDS = 15
+
+
+def _can_watch(user, kind, bill):
+    """The uploader, officers, and (for committee bills) the committee's chairs"""
+    if bill.posted_by_id == user.pk or user.can_view_officer_pages:
+        return True
+    return kind == 'committee_legislation' and bill.committee.is_chair(user)
+
+
+def _sse(event, seq):
+    return f"id: {seq}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+def _last_event_id(request):
+    try:
+        return int(request.headers.get('Last-Event-ID', ''))
+    except ValueError:
+        return None
+
+
+def _stream(kind, bill, channel, last_seq):
+    stream_seconds = getattr(settings, 'LIVE_TALLY_STREAM_SECONDS', DEFAULT_STREAM_SECONDS)
+    poll_interval = getattr(settings, 'LIVE_TALLY_POLL_INTERVAL', DEFAULT_POLL_INTERVAL)
+
+    yield f"retry: {int(poll_interval * 1000)}\n\n"
+
+    seq = channel.seq()
+    events = channel.events_since(last_seq, seq) if last_seq is not None else None
+    if events is None:
+        # New viewer, or one that fell too far behind: start from the current counts
+        events = [(seq, tally_payload(kind, bill))]
+    if not connection.in_atomic_block:
+        # The rest of the stream only reads the cache; don't hold a database connection open
+        connection.close()
+
+    deadline = time.monotonic() + stream_seconds
+    last_write = time.monotonic()
+    while True:
+        for seq, event in events:
+            yield _sse(event, seq)
+            last_seq = seq
+            last_write = time.monotonic()
+            if event.get('closed'):
+                return
+
+        if time.monotonic() >= deadline:
+            return
+        time.sleep(poll_interval)
+
+        events = []
+        current = channel.seq()
+        if current != last_seq:
+            events = channel.events_since(last_seq, current)
+            if events is None:
+                # Evicted events; the latest one still carries the full counts
+                events = (channel.events_since(current - 1, current) or [])[-1:]
+                last_seq = current
+        elif time.monotonic() - last_write >= KEEPALIVE_SECONDS:
+            yield ": keepalive\n\n"
+            last_write = time.monotonic()
+
+
+@require_GET
+@login_required
+def vote_stream(request, kind, pk):
+    """
+    Server-sent events with a bill's live tally, for its uploader and chairs.
+
+    The first event is the current tally (or the events missed since Last-Event-ID); after
+    that, one `vote` event per ballot with the choice, the voter (null for anonymous votes)
+    and the updated counts. The stream ends after a `tally` event with closed set.
+    """
+    if kind not in LIVE_TALLY_SOURCES:
+        raise Http404("Unknown legislation type")
+    bill_model = LIVE_TALLY_SOURCES[kind][0]
+    queryset = bill_model.objects.select_related('committee') if kind == 'committee_legislation' else bill_model.objects
+    bill = get_object_or_404(queryset, pk=pk)
+    if not _can_watch(request.user, kind, bill):
+        return HttpResponseForbidden("Only the uploader and chairs can watch live results.")
+
+    response = StreamingHttpResponse(
+        _stream(kind, bill, TallyChannel(kind, bill.pk), _last_event_id(request)),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Don't let nginx buffer the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
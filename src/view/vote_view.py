@@ -5,8 +5,11 @@ from django.contrib import messages
 from django.utils import timezone
 from django.utils.timezone import make_aware
 from django.utils.dateparse import parse_datetime
+from django.db import IntegrityError, transaction
 from datetime import timedelta
 from ..models import *
+from ..rate_limit import get_rate_limit
+from ..live_tally import tally_counts
 import logging
 
 @login_required
@@ -79,26 +82,40 @@ def vote_view(request):
 
     # Handle voting
     if request.method == 'POST' and 'vote_choice' in request.POST and can_vote:
+        # Ballots carry the member's password, so limit them like logins
+        if not get_rate_limit('vote').hit(user.pk).allowed:
+            messages.error(request, "Too many vote attempts. Please wait a minute and try again.")
+            return redirect('vote')
+
         password = request.POST.get('password')
         auth_user = authenticate(request, username=user.username, password=password)
 
         if auth_user:
             legislation_id = request.POST.get('legislation_id')
-            legislation = get_object_or_404(Legislation, id=legislation_id)
-
-            if Vote.objects.filter(user=user, legislation=legislation).exists():
-                messages.error(request, "You have already voted on this legislation.")
-                return redirect('vote')
-            if legislation.voting_closed:
-                messages.error(request, "Voting on this legislation has ended.")
-                return redirect('vote')
-
             vote_choice = request.POST.get('vote_choice')
-            if legislation.vote_mode == 'plurality' and vote_choice not in legislation.plurality_options:
-                messages.error(request, "Invalid vote option.")
-                return redirect('vote')
 
-            Vote.objects.create(user=user, legislation=legislation, vote_choice=vote_choice)
+            # A key-share lock lets ballots on the same bill proceed in parallel, but blocks
+            # close_voting's exclusive lock so it can't snapshot the result with this ballot
+            # half-written (and this ballot waits for the snapshot if voting is closing)
+            with transaction.atomic():
+                legislation = get_object_or_404(Legislation.objects.select_for_update(key_share=True), id=legislation_id)
+
+                if legislation.voting_closed:
+                    messages.error(request, "Voting on this legislation has ended.")
+                    return redirect('vote')
+
+                if legislation.vote_mode == 'plurality' and vote_choice not in legislation.plurality_options:
+                    messages.error(request, "Invalid vote option.")
+                    return redirect('vote')
+
+                # The (user, legislation) unique constraint is the source of truth for
+                # duplicate ballots, so concurrent double-submits can't both be counted
+                try:
+                    with transaction.atomic():
+                        Vote.objects.create(user=user, legislation=legislation, vote_choice=vote_choice)
+                except IntegrityError:
+                    messages.error(request, "You have already voted on this legislation.")
+                    return redirect('vote')
 
             logger = logging.getLogger('function_calls')
             logger.info(f"{user.username} voted '{vote_choice}' on '{legislation.title}' (ID: {legislation.id}) at {timezone.now()}")
@@ -115,22 +132,13 @@ def vote_view(request):
         voting_closed=False
     )
 
-    # Build vote data for uploader
+    # Build vote data for uploader; the page then follows it live through vote_stream
     vote_data = {}
     for leg in available_legislation:
-        if leg.posted_by == user:
-            votes = Vote.objects.filter(legislation=leg)
-            if leg.vote_mode == 'plurality':
-                tally = {opt: votes.filter(vote_choice=opt).count() for opt in leg.plurality_options}
-                tally['total'] = votes.count()
-                vote_data[leg.id] = tally
-            else:
-                vote_data[leg.id] = {
-                    'yes': votes.filter(vote_choice='yes').count(),
-                    'no': votes.filter(vote_choice='no').count(),
-                    'abstain': votes.filter(vote_choice='abstain').count(),
-                    'total': votes.count()
-                }
+        if leg.posted_by_id == user.pk:
+            tally = tally_counts('legislation', leg)
+            tally['total'] = sum(tally.values())
+            vote_data[leg.id] = tally
 
     return render(request, 'vote.html', {
         'profile': user,